@@ -0,0 +1,154 @@
+""" telliot_feeds.batch_refresh
+
+Refresh of many feeds at once, fetching each shared source only once.
+"""
+import asyncio
+import time
+from dataclasses import fields
+from typing import Any
+from typing import Dict
+from typing import Hashable
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from telliot_feeds.datafeed import DataFeed
+from telliot_feeds.datasource import DataSource
+from telliot_feeds.dtypes.datapoint import OptionalWeightedDataPoint
+from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.sources.price_aggregator import PriceAggregator
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def _parameter(value: Any) -> Hashable:
+    """A plain value, or the identity of any other object (e.g. a shared transport, or state kept by a service)"""
+    if value is None or isinstance(value, (str, bytes, int, float)):
+        return value
+    if isinstance(value, tuple):
+        return tuple(_parameter(v) for v in value)
+    return id(value)
+
+
+# Fields of every data source, about its history rather than what it fetches
+DATA_SOURCE_FIELDS = {f.name for f in fields(DataSource)}
+
+
+def source_key(source: DataSource[Any]) -> Hashable:
+    """Sources with the same key fetch the same datapoint
+
+    Price sources are the same leaf when they have the same class, asset
+    and currency (in any case) and other fields, and services of the same
+    class with the same attributes (URL, timestamp of historical services,
+    ...). Attributes that are not plain values only match when they are
+    the same object, so sources whose services keep state of their own
+    are not shared. Other sources are only shared when they are the same
+    object.
+    """
+    if isinstance(source, PriceSource):
+        service = source.service
+        source_fields = sorted(
+            (f.name, _parameter(getattr(source, f.name)))
+            for f in fields(source)
+            if f.name not in DATA_SOURCE_FIELDS and f.name not in ("asset", "currency", "service")
+        )
+        service_attributes = sorted((name, _parameter(value)) for name, value in vars(service).items())
+        return (
+            type(source),
+            source.asset.lower(),
+            source.currency.lower(),
+            tuple(source_fields),
+            type(service),
+            tuple(service_attributes),
+        )
+    return id(source)
+
+
+class BatchRefresh:
+    """Dependency graph of a set of feeds, refreshed together
+
+    The leaf sources of the feeds (those of their price aggregators,
+    including nested ones) are grouped by `source_key`. `refresh` fetches
+    each group once, concurrently, and stores its datapoint in every
+    source of the group. Then each aggregator combines the datapoints of
+    its sources, inner aggregators first, and records them in its source
+    health. Deadlines, quorums and circuit breakers of the aggregators
+    are not applied: every leaf is fetched.
+    """
+
+    def __init__(self, feeds: Iterable[DataFeed[Any]]):
+        self.feeds = list(feeds)
+        # Sources of each leaf, the first one is fetched
+        self.leaves: Dict[Hashable, List[DataSource[Any]]] = {}
+        # Aggregators, each after those among its sources
+        self.aggregators: List[PriceAggregator] = []
+        self.fetches = 0
+        seen: Dict[int, DataSource[Any]] = {}
+        for feed in self.feeds:
+            self._add(feed.source, seen)
+
+    def _add(self, source: DataSource[Any], seen: Dict[int, DataSource[Any]]) -> None:
+        if id(source) in seen:
+            return
+        seen[id(source)] = source
+        if isinstance(source, PriceAggregator):
+            for child in source.sources:
+                self._add(child, seen)
+            self.aggregators.append(source)
+        else:
+            self.leaves.setdefault(source_key(source), []).append(source)
+
+    async def refresh(self) -> List[OptionalWeightedDataPoint[Any]]:
+        """Fetch every leaf once, then aggregate
+
+        Returns:
+            The new datapoint of each feed, in the order of `feeds`
+        """
+        keys = list(self.leaves)
+        fetched = await asyncio.gather(*(self._fetch(self.leaves[key][0]) for key in keys))
+        self.fetches += len(keys)
+
+        results: Dict[int, OptionalWeightedDataPoint[Any]] = {}
+        latencies: Dict[int, float] = {}
+        errors: Dict[int, Optional[Exception]] = {}
+        for key, (datapoint, latency, error) in zip(keys, fetched):
+            first, *copies = self.leaves[key]
+            for source in (first, *copies):
+                results[id(source)] = datapoint
+                latencies[id(source)] = latency
+                errors[id(source)] = error
+            v, t = datapoint[0], datapoint[1]
+            if v is not None and t is not None:
+                weight = datapoint[2] if len(datapoint) == 3 else None
+                for source in copies:
+                    source.store_datapoint((v, t), weight=weight)
+
+        for aggregator in self.aggregators:
+            datapoints = []
+            for source in aggregator.sources:
+                datapoint = results[id(source)]
+                if id(source) in latencies:
+                    aggregator.record_source_result(source, datapoint, latencies[id(source)], error=errors[id(source)])
+                datapoints.append(datapoint)
+            aggregator.late_sources = []
+            aggregator.skipped_sources = []
+            results[id(aggregator)] = aggregator.combine(datapoints)
+
+        return [results[id(feed.source)] for feed in self.feeds]
+
+    @staticmethod
+    async def _fetch(source: DataSource[Any]) -> tuple[OptionalWeightedDataPoint[Any], float, Optional[Exception]]:
+        start = time.monotonic()
+        try:
+            datapoint = await source.fetch_new_datapoint()
+        except Exception as e:
+            logger.error(f"Batch refresh: {type(source).__name__} failed: {e!r}")
+            return (None, None), time.monotonic() - start, e  # type: ignore
+        return datapoint, time.monotonic() - start, None
+
+
+async def refresh_feeds(feeds: Iterable[DataFeed[Any]]) -> List[OptionalWeightedDataPoint[Any]]:
+    """Refresh feeds together, fetching the sources they share once"""
+    return await BatchRefresh(feeds).refresh()
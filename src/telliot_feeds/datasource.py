@@ -1,13 +1,16 @@
 """ telliot_feeds.datafeed.data_source
 
 """
+import os
 import random
 from collections import deque
 from dataclasses import dataclass
 from dataclasses import field
+from datetime import datetime
 from typing import Deque
 from typing import Generic
 from typing import List
+from typing import Optional
 from typing import TypeVar
 
 from telliot_core.model.base import Base
@@ -15,10 +18,17 @@ from telliot_core.model.base import Base
 from telliot_feeds.dtypes.datapoint import DataPoint
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.dtypes.history import ColumnarHistory
+from telliot_feeds.dtypes.history import History
+from telliot_feeds.dtypes.history import HistoryArrays
 
 T = TypeVar("T")
 
 
+def compact_history_default() -> bool:
+    return os.getenv("COMPACT_HISTORY", "false").lower() in ("1", "true", "yes")
+
+
 @dataclass
 class DataSource(Generic[T], Base):
     """Base Class for a DataSource
@@ -31,12 +41,24 @@ class DataSource(Generic[T], Base):
 
     max_datapoints: int = 256
 
-    # Private storage for fetched values
-    _history: Deque[DataPoint[T]] = field(default_factory=deque, init=False, repr=False)
+    #: Store float datapoints in a `ColumnarHistory` instead of a deque of tuples
+    compact_history: bool = field(default_factory=compact_history_default)
 
-    def __post_init__(self) -> None:
-        # Overwrite default deque
-        self._history = deque(maxlen=self.max_datapoints)
+    # Private storage for fetched values, created on first use
+    _storage: Optional[History] = field(default=None, init=False, repr=False)
+
+    # Private weights of the datapoints of a deque history (None if unknown), created with the first weight
+    _weights: Optional[Deque[Optional[float]]] = field(default=None, init=False, repr=False)
+
+    @property
+    def _history(self) -> History:
+        # Created here rather than in __post_init__, which subclasses override
+        if getattr(self, "_storage", None) is None:
+            if getattr(self, "compact_history", False):
+                self._storage = ColumnarHistory(maxlen=self.max_datapoints)
+            else:
+                self._storage = deque(maxlen=self.max_datapoints)
+        return self._storage  # type: ignore
 
     @property
     def latest(self) -> OptionalDataPoint[T]:
@@ -46,11 +68,24 @@ class DataSource(Generic[T], Base):
         else:
             return None, None
 
-    def store_datapoint(self, datapoint: DataPoint[T]) -> None:
-        """Store a datapoint"""
+    def store_datapoint(self, datapoint: DataPoint[T], weight: Optional[float] = None) -> None:
+        """Store a datapoint and its weight (e.g. the liquidity behind a price)"""
         v, t = datapoint
-        if v is not None and t is not None:
-            self._history.append(datapoint)
+        if v is None or t is None:
+            return
+        history = self._history
+        if isinstance(history, ColumnarHistory):
+            if isinstance(v, float) and isinstance(t, datetime):
+                history.append(datapoint, weight)  # type: ignore
+                return
+            # Not a float source after all, or timestamped otherwise (e.g. with a block timestamp)
+            history = self._storage = deque(history, maxlen=self.max_datapoints)
+        weights = getattr(self, "_weights", None)
+        if weight is not None and weights is None:
+            weights = self._weights = deque([None] * len(history), maxlen=self.max_datapoints)
+        history.append(datapoint)
+        if weights is not None:
+            weights.append(weight)
 
     def get_all_datapoints(self) -> List[DataPoint[T]]:
         """Get a list of all available data points"""
@@ -60,6 +95,17 @@ class DataSource(Generic[T], Base):
         """Fetch new value and store it for later retrieval"""
         raise NotImplementedError
 
+    def get_history_arrays(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> HistoryArrays:
+        """Values, timestamps and weights of the datapoints stored between `start` and `end`
+
+        Zero-copy views of a compact history, a copy otherwise.
+        """
+        history = self._history
+        if isinstance(history, ColumnarHistory):
+            return history.arrays(start, end)
+        arrays = HistoryArrays.from_datapoints(history, getattr(self, "_weights", None))  # type: ignore
+        return arrays.between(start, end)
+
     @property
     def depth(self) -> int:
         return len(self._history)
@@ -0,0 +1,168 @@
+"""Compact columnar storage for the datapoints of a data source."""
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+from typing import Any
+from typing import Deque
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Union
+
+import numpy as np
+
+from telliot_feeds.dtypes.datapoint import DataPoint
+
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+NS_PER_US = 1000
+
+
+def to_epoch_ns(t: Union[datetime, int, float]) -> int:
+    """Nanoseconds since the Unix epoch (naive datetimes are taken as UTC, numbers as Unix seconds)"""
+    if not isinstance(t, datetime):
+        # e.g. the block timestamps of the PulseX LP services
+        return int(t * 10**9)
+    if t.tzinfo is None:
+        t = t.replace(tzinfo=timezone.utc)
+    return (t - EPOCH) // timedelta(microseconds=1) * NS_PER_US
+
+
+def from_epoch_ns(ns: int) -> datetime:
+    return EPOCH + timedelta(microseconds=int(ns) // NS_PER_US)
+
+
+class HistoryArrays:
+    """Values, epoch-ns timestamps and weights (NaN if unknown) of a range of datapoints
+
+    Arrays taken from a `ColumnarHistory` are read-only views of its
+    buffers, only valid until the next datapoint is appended.
+    """
+
+    __slots__ = ("values", "timestamps", "weights")
+
+    def __init__(self, values: np.ndarray, timestamps: np.ndarray, weights: np.ndarray):
+        self.values = values
+        self.timestamps = timestamps
+        self.weights = weights
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    @classmethod
+    def from_datapoints(
+        cls, datapoints: Iterable[DataPoint[float]], weights: Optional[Iterable[Optional[float]]] = None
+    ) -> "HistoryArrays":
+        """Arrays copied from `(value, datetime or Unix seconds)` datapoints and their weights (None if unknown)"""
+        datapoints = list(datapoints)
+        return cls(
+            np.array([v for v, _ in datapoints], dtype=np.float64),
+            np.array([to_epoch_ns(t) for _, t in datapoints], dtype=np.int64),
+            np.array(
+                [np.nan] * len(datapoints) if weights is None else [np.nan if w is None else w for w in weights],
+                dtype=np.float64,
+            ),
+        )
+
+    def between(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> "HistoryArrays":
+        """Datapoints timestamped in `[start, end]`, as views of these arrays"""
+        lo = 0 if start is None else int(np.searchsorted(self.timestamps, to_epoch_ns(start), side="left"))
+        hi = len(self) if end is None else int(np.searchsorted(self.timestamps, to_epoch_ns(end), side="right"))
+        return HistoryArrays(self.values[lo:hi], self.timestamps[lo:hi], self.weights[lo:hi])
+
+
+class ColumnarHistory:
+    """Ring buffer of the last `maxlen` float datapoints, stored column-wise
+
+    A drop-in replacement for the `deque` of `(value, datetime)` tuples of a
+    `DataSource`: each datapoint takes one float64 value, one int64 epoch-ns
+    timestamp and, once any datapoint has one, one float64 weight, instead
+    of a tuple, a float and a datetime object. Datapoints are kept in
+    contiguous arrays with some spare room at the end. When the room runs
+    out, the last `maxlen - 1` datapoints are moved to the front, so any
+    range of the history is a zero-copy view. Timestamps are expected in
+    increasing order, as sources store them.
+    """
+
+    __slots__ = ("maxlen", "_values", "_timestamps", "_weights", "_start", "_end")
+
+    def __init__(self, maxlen: int, datapoints: Iterable[DataPoint[float]] = ()):
+        if maxlen < 1:
+            raise ValueError("maxlen must be positive")
+        self.maxlen = maxlen
+        # allocated on the first append, sources that never store cost nothing
+        self._values: Optional[np.ndarray] = None
+        self._timestamps: Optional[np.ndarray] = None
+        self._weights: Optional[np.ndarray] = None
+        self._start = 0
+        self._end = 0
+        for datapoint in datapoints:
+            self.append(datapoint)
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __iter__(self) -> Iterator[DataPoint[float]]:
+        for i in range(self._start, self._end):
+            yield self._datapoint(i)
+
+    def __getitem__(self, index: int) -> DataPoint[float]:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("history index out of range")
+        return self._datapoint(self._start + index)
+
+    def _datapoint(self, i: int) -> DataPoint[float]:
+        return float(self._values[i]), from_epoch_ns(self._timestamps[i])  # type: ignore
+
+    def append(self, datapoint: DataPoint[float], weight: Optional[float] = None) -> None:
+        value, t = datapoint
+        if self._values is None:
+            capacity = self.maxlen + max(self.maxlen // 8, 1)
+            self._values = np.empty(capacity, dtype=np.float64)
+            self._timestamps = np.empty(capacity, dtype=np.int64)
+        if weight is not None and self._weights is None:
+            self._weights = np.full(len(self._values), np.nan)
+
+        if self._end == len(self._values):
+            # keep the newest maxlen - 1 datapoints, at the front
+            keep = slice(self._end - self.maxlen + 1, self._end)
+            n = self.maxlen - 1
+            self._values[:n] = self._values[keep]
+            self._timestamps[:n] = self._timestamps[keep]  # type: ignore
+            if self._weights is not None:
+                self._weights[:n] = self._weights[keep]
+            self._start, self._end = 0, n
+
+        self._values[self._end] = value
+        self._timestamps[self._end] = to_epoch_ns(t)  # type: ignore
+        if self._weights is not None:
+            self._weights[self._end] = np.nan if weight is None else weight
+        self._end += 1
+        if self._end - self._start > self.maxlen:
+            self._start += 1
+
+    def clear(self) -> None:
+        self._start = self._end = 0
+
+    def arrays(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> HistoryArrays:
+        """Read-only views of the datapoints timestamped in `[start, end]`"""
+        if self._values is None:
+            empty = np.empty(0)
+            return HistoryArrays(empty, np.empty(0, dtype=np.int64), empty)
+        window = slice(self._start, self._end)
+        weights = self._weights[window] if self._weights is not None else np.full(len(self), np.nan)
+        arrays = HistoryArrays(self._values[window], self._timestamps[window], weights)  # type: ignore
+        for array in (arrays.values, arrays.timestamps, arrays.weights):
+            array.flags.writeable = False
+        return arrays.between(start, end)
+
+    def nbytes(self) -> int:
+        """Memory used by the buffers"""
+        buffers = (self._values, self._timestamps, self._weights)
+        return sum(buffer.nbytes for buffer in buffers if buffer is not None)
+
+
+History = Union[Deque[DataPoint[Any]], ColumnarHistory]
@@ -0,0 +1,108 @@
+"""Aggregation of source prices, with weights kept aligned and outliers rejected."""
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import Optional
+from typing import Sequence
+
+import numpy as np
+
+ALGORITHMS = ("median", "mean", "weighted_average", "weighted_median", "trimmed_mean")
+WEIGHTED_ALGORITHMS = ("weighted_average", "weighted_median")
+
+# Scales the median absolute deviation to a standard deviation for normal data
+MAD_SCALE = 1.4826
+
+# Smallest deviation scale, relative to the median, so that prices agreeing to
+# within 0.01% are never outliers even when most sources return the same price
+MIN_RELATIVE_SCALE = 1e-4
+
+
+@dataclass
+class Aggregate:
+    """Aggregated price and the inputs left out of it"""
+
+    value: Optional[float]
+
+    #: Reason each rejected input was left out, by input index
+    rejected: Dict[int, str] = field(default_factory=dict)
+
+
+def weighted_median(values: np.ndarray, weights: np.ndarray) -> float:
+    """Value splitting the total weight in half (the mean of two values on an exact tie)"""
+    order = np.argsort(values, kind="stable")
+    values, cumulative = values[order], np.cumsum(weights[order])
+    half = cumulative[-1] / 2
+    i = int(np.searchsorted(cumulative, half))
+    if i + 1 < len(values) and np.isclose(cumulative[i], half):
+        return float((values[i] + values[i + 1]) / 2)
+    return float(values[i])
+
+
+def trimmed_mean(values: np.ndarray, proportion: float) -> float:
+    """Mean of the values without the `proportion` lowest and highest ones"""
+    cut = int(proportion * len(values))
+    kept = np.sort(values)[cut : len(values) - cut]  # noqa: E203
+    return float(kept.mean()) if len(kept) else float(np.median(values))
+
+
+def outliers(values: np.ndarray, max_deviation: float) -> np.ndarray:
+    """Mask of the values more than `max_deviation` scaled MADs away from the median"""
+    median = np.median(values)
+    deviations = np.abs(values - median)
+    scale = max(MAD_SCALE * np.median(deviations), MIN_RELATIVE_SCALE * abs(median))
+    return deviations > max_deviation * scale
+
+
+def aggregate(
+    prices: Sequence[float],
+    weights: Sequence[Optional[float]],
+    algorithm: str = "median",
+    max_deviation: Optional[float] = None,
+    trim: float = 0.1,
+) -> Aggregate:
+    """Aggregate prices, `weights[i]` being the weight (or None) of `prices[i]`
+
+    Weighted algorithms leave out the prices without a positive weight,
+    or ignore weights if no price has one. If `max_deviation` is set,
+    prices too far from the median of the others (see `outliers`) are
+    left out before aggregating.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown aggregation algorithm: {algorithm}")
+    values = np.asarray(prices, dtype=np.float64)
+    w = np.array([np.nan if weight is None else weight for weight in weights], dtype=np.float64)
+    if len(values) != len(w):
+        raise ValueError("Each price needs a weight (or None)")
+
+    result = Aggregate(value=None)
+    if not len(values):
+        return result
+
+    used = np.ones(len(values), dtype=bool)
+    if algorithm in WEIGHTED_ALGORITHMS:
+        weighted = np.isfinite(w) & (w > 0)
+        if weighted.any():
+            used = weighted
+            result.rejected.update((int(i), "no weight") for i in np.flatnonzero(~weighted))
+        else:
+            w = np.ones(len(values))
+
+    if max_deviation is not None:
+        far = used.copy()
+        far[used] = outliers(values[used], max_deviation)
+        result.rejected.update((int(i), "outlier") for i in np.flatnonzero(far))
+        used &= ~far
+
+    values, w = values[used], w[used]
+    if algorithm == "median":
+        result.value = float(np.median(values))
+    elif algorithm == "mean":
+        result.value = float(values.mean())
+    elif algorithm == "weighted_average":
+        result.value = float(np.dot(values, w) / w.sum())
+    elif algorithm == "weighted_median":
+        result.value = weighted_median(values, w)
+    else:
+        result.value = trimmed_mean(values, trim)
+    return result
@@ -0,0 +1,173 @@
+"""GraphQL lookups merged into one aliased query per subgraph."""
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+
+from telliot_feeds.pricing.http_transport import get_transport
+from telliot_feeds.pricing.http_transport import HTTPTransport
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+HEADERS = {"Content-Type": "application/json"}
+
+
+@dataclass
+class PendingQuery:
+    future: "asyncio.Future[Dict[str, Dict[str, Any]]]"
+    fields: Set[str] = field(default_factory=set)
+
+
+class GraphQLBatcher:
+    """Top-level query fields of one subgraph, fetched together
+
+    Fields requested within `batch_window` seconds of each other (e.g. by
+    the sources of the feeds refreshed together) are sent as one query,
+    each under its own alias, along with the `_meta` block number of the
+    subgraph. Results are kept for `cache_ttl` seconds, grouped by that
+    block: once a response comes from a newer block, results of older
+    blocks are dropped, so fields returned together always share a block.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        batch_window: float = 0.02,
+        cache_ttl: float = 5.0,
+        transport: Optional[HTTPTransport] = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.cache_ttl = cache_ttl
+        self.transport = transport if transport is not None else get_transport()
+        self.block: Optional[int] = None
+        self.requests = 0
+        self._results: Dict[str, Dict[str, Any]] = {}
+        self._fetched: Dict[str, float] = {}
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PendingQuery]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def query(self, selection: str) -> Dict[str, Any]:
+        """Result of a top-level field, e.g. `'token(id: "0x...") { derivedUSD }'`
+
+        Returns:
+            A dictionary with either `value` (the field's data) and `block`,
+            or `error` and `exception`, like `HTTPTransport.request`
+        """
+        (result,) = await self.query_together([selection])
+        return result
+
+    async def query_together(self, selections: Sequence[str]) -> List[Dict[str, Any]]:
+        """Results of several top-level fields, all from the same block
+
+        They are served from the cache only if all of them are cached,
+        otherwise they are all sent in the same query.
+        """
+        selections = [" ".join(selection.split()) for selection in selections]
+        now = time.monotonic()
+        if all(now - self._fetched.get(selection, float("-inf")) < self.cache_ttl for selection in selections):
+            return [self._results[selection] for selection in selections]
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is not None:
+            batch.fields.update(selections)
+            try:
+                results = await asyncio.shield(batch.future)
+                return [results[selection] for selection in selections]
+            except asyncio.CancelledError:
+                if not batch.future.cancelled():
+                    raise
+            # The batch leader was cancelled, retry in a new batch
+            return await self.query_together(selections)
+
+        batch = PendingQuery(future=loop.create_future(), fields=set(selections))
+        self._pending[loop] = batch
+        try:
+            try:
+                await asyncio.sleep(self.batch_window)
+            finally:
+                if self._pending.get(loop) is batch:
+                    del self._pending[loop]
+            results = await self._fetch(sorted(batch.fields))
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()
+            raise
+        except BaseException:
+            batch.future.cancel()
+            raise
+
+        batch.future.set_result(results)
+        return [results[selection] for selection in selections]
+
+    async def _fetch(self, selections: List[str]) -> Dict[str, Dict[str, Any]]:
+        aliases = {f"q{i}": selection for i, selection in enumerate(selections)}
+        query = "{ _meta { block { number } } " + " ".join(f"{a}: {s}" for a, s in aliases.items()) + " }"
+        self.requests += 1
+        data = await self.transport.post(
+            self.url,
+            json_data={"query": query, "variables": None, "operationName": None},
+            timeout=self.timeout,
+            headers=HEADERS,
+        )
+        if "response" not in data:
+            return {selection: data for selection in selections}
+
+        response = data["response"]
+        errors: Dict[str, Dict[str, Any]] = {}
+        for error in response.get("errors") or []:
+            path = error.get("path") or []
+            failed = [aliases[path[0]]] if path and path[0] in aliases else selections
+            for selection in failed:
+                errors[selection] = {"error": "GraphQL Error", "exception": Exception(error.get("message", error))}
+
+        values = response.get("data") or {}
+        block = (values.get("_meta") or {}).get("block", {}).get("number")
+        results = {}
+        for alias, selection in aliases.items():
+            if selection in errors:
+                results[selection] = errors[selection]
+            elif alias not in values:
+                results[selection] = {"error": "Invalid Response", "exception": KeyError(alias)}
+            else:
+                results[selection] = {"value": values[alias], "block": block}
+        self._store(block, results)
+        return results
+
+    def _store(self, block: Optional[int], results: Dict[str, Dict[str, Any]]) -> None:
+        if block is not None and self.block is not None and block < self.block:
+            # served by a lagging indexer, keep the newer block
+            return
+        if block != self.block:
+            self._results.clear()
+            self._fetched.clear()
+            self.block = block
+        now = time.monotonic()
+        for selection, result in results.items():
+            if "value" in result:
+                self._results[selection] = result
+                self._fetched[selection] = now
+
+
+_batchers: Dict[str, GraphQLBatcher] = {}
+
+
+def get_graphql_batcher(url: str) -> GraphQLBatcher:
+    """Return the process-wide batcher of a subgraph URL, shared by all subgraph sources"""
+    batcher = _batchers.get(url)
+    if batcher is None:
+        batcher = _batchers[url] = GraphQLBatcher(url)
+    return batcher
@@ -0,0 +1,106 @@
+"""Statistics of the datapoints stored by a data source, computed with NumPy."""
+from datetime import datetime
+from typing import Optional
+from typing import Sequence
+from typing import Union
+
+import numpy as np
+
+from telliot_feeds.dtypes.history import HistoryArrays
+from telliot_feeds.dtypes.history import to_epoch_ns
+
+
+def time_weighted_average(
+    history: HistoryArrays, start: Optional[datetime] = None, end: Optional[datetime] = None
+) -> Optional[float]:
+    """Mean of the values over `[start, end]`, each held until the next datapoint
+
+    The value in effect at `start` is the last one stored before it, and the
+    last value is held until `end` (its own timestamp if None).
+    """
+    if not len(history):
+        return None
+    timestamps = history.timestamps
+    if start is not None:
+        timestamps = np.maximum(timestamps, to_epoch_ns(start))
+    last = timestamps[-1] if end is None else to_epoch_ns(end)
+    durations = np.diff(timestamps, append=max(last, timestamps[-1]))
+    total = durations.sum()
+    if total <= 0:
+        return float(history.values[-1])
+    return float(np.dot(history.values, durations) / total)
+
+
+def volume_weighted_average(history: HistoryArrays) -> Optional[float]:
+    """Mean of the values weighted by their volume (or liquidity), ignoring unweighted ones"""
+    known = ~np.isnan(history.weights)
+    weights = history.weights[known]
+    total = weights.sum()
+    if not total > 0:
+        return None
+    return float(np.dot(history.values[known], weights) / total)
+
+
+def returns(values: Union[np.ndarray, Sequence[float]]) -> np.ndarray:
+    """Relative changes between consecutive values (those from a zero value are dropped)"""
+    values = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        changes = np.diff(values) / values[:-1]
+    return changes[np.isfinite(changes)]
+
+
+def returns_stdev(values: Union[np.ndarray, Sequence[float]]) -> Optional[float]:
+    """Sample standard deviation of the returns of the values"""
+    changes = returns(values)
+    if len(changes) < 2:
+        return None
+    return float(np.std(changes, ddof=1))
+
+
+def rolling_returns_stdev(values: Union[np.ndarray, Sequence[float]], window: int) -> np.ndarray:
+    """Sample standard deviation of each `window` consecutive returns"""
+    changes = returns(values)
+    if window < 2 or len(changes) < window:
+        return np.empty(0)
+    return np.std(np.lib.stride_tricks.sliding_window_view(changes, window), axis=1, ddof=1)
+
+
+def percentiles(values: Union[np.ndarray, Sequence[float]], q: Union[float, Sequence[float]]) -> np.ndarray:
+    """Percentiles `q` (0 to 100) of the values, linearly interpolated"""
+    return np.percentile(np.asarray(values, dtype=np.float64), q)
+
+
+class EMA:
+    """Exponential moving average of irregularly spaced values
+
+    A value's weight halves every `halflife` seconds. Each update costs
+    O(1), so the average can follow a history as datapoints are stored.
+    """
+
+    __slots__ = ("halflife", "value", "timestamp")
+
+    def __init__(self, halflife: float):
+        if halflife <= 0:
+            raise ValueError("halflife must be positive")
+        self.halflife = halflife
+        self.value: Optional[float] = None
+        # epoch-ns timestamp of the last value
+        self.timestamp: Optional[int] = None
+
+    def update(self, value: float, timestamp: int) -> float:
+        if self.value is None or self.timestamp is None:
+            self.value = value
+        else:
+            elapsed = max(timestamp - self.timestamp, 0) / 1e9
+            self.value += (1 - 0.5 ** (elapsed / self.halflife)) * (value - self.value)
+        self.timestamp = timestamp
+        return self.value
+
+    def update_from(self, history: HistoryArrays) -> Optional[float]:
+        """Add the datapoints of `history` newer than the last value"""
+        first = 0
+        if self.timestamp is not None:
+            first = int(np.searchsorted(history.timestamps, self.timestamp, side="right"))
+        for value, timestamp in zip(history.values[first:].tolist(), history.timestamps[first:].tolist()):
+            self.update(value, timestamp)
+        return self.value
@@ -0,0 +1,151 @@
+"""Shared asyncio HTTP transport for web price services."""
+import asyncio
+import json
+import weakref
+from typing import Any
+from typing import Dict
+from typing import Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from telliot_feeds.pricing.rate_limit import parse_retry_after
+from telliot_feeds.pricing.rate_limit import RateLimiter
+
+
+class HTTPTransport:
+    """Non-blocking HTTP transport backed by a keep-alive connection pool
+
+    One `aiohttp.ClientSession` is kept per event loop and reused by every
+    request, so price sources gathered concurrently by a `PriceAggregator`
+    share open connections to each host instead of opening a new one per call.
+
+    Requests are paced per host by a `RateLimiter`. A 429 response blocks
+    the host for its Retry-After delay and is retried if the delay fits
+    within the request deadline.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_retries: int = 2,
+    ):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter.from_env()
+        self.max_retries = max_retries
+        self._sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled session for the running event loop, creating it if needed"""
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None or session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+            )
+            session = aiohttp.ClientSession(connector=connector)
+            self._sessions[loop] = session
+        return session
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        timeout: float = 5.0,
+        headers: Optional[Dict[str, str]] = None,
+        json_data: Any = None,
+    ) -> Dict[str, Any]:
+        """Send a request and decode its JSON body while handling exceptions
+
+        Args:
+            method: HTTP method
+            url: Full URL to fetch
+            timeout: Deadline in seconds for the whole request
+            headers: Optional request headers
+            json_data: Optional JSON request body
+
+        Returns:
+            A dictionary with the following (optional) keys:
+                response (dict or list): Decoded JSON, if no error occurred
+                status (int): HTTP status code, if a response was received
+                error (str): A description of the error, if one occurred
+                exception (Exception): The exception, if one occurred
+        """
+        session = self._get_session()
+        host = urlsplit(url).hostname or ""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        attempt = 0
+        while True:
+            try:
+                await asyncio.wait_for(self.rate_limiter.acquire(host), deadline - loop.time())
+                async with session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    json=json_data,
+                    timeout=aiohttp.ClientTimeout(total=max(deadline - loop.time(), 0.001)),
+                ) as r:
+                    status = r.status
+                    retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                    text = await r.text()
+
+            except asyncio.TimeoutError as e:
+                return {"error": "Timeout Error", "exception": e}
+
+            except Exception as e:
+                return {"error": str(type(e)), "exception": e}
+
+            if status != 429:
+                self.rate_limiter.reset(host)
+                break
+
+            delay = self.rate_limiter.penalize(host, retry_after)
+            attempt += 1
+            if attempt > self.max_retries or loop.time() + delay >= deadline:
+                break
+
+        try:
+            return {"response": json.loads(text), "status": status}
+
+        except json.JSONDecodeError as e:
+            return {"error": "JSON Decode Error", "exception": e, "status": status}
+
+    async def get(self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Send a GET request, see `HTTPTransport.request`"""
+        return await self.request("GET", url, timeout=timeout, headers=headers)
+
+    async def post(
+        self, url: str, json_data: Any = None, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Send a POST request with a JSON body, see `HTTPTransport.request`"""
+        return await self.request("POST", url, timeout=timeout, headers=headers, json_data=json_data)
+
+    async def close(self) -> None:
+        """Close the pooled session of the running event loop"""
+        session = self._sessions.pop(asyncio.get_running_loop(), None)
+        if session is not None and not session.closed:
+            await session.close()
+
+
+_default_transport: Optional[HTTPTransport] = None
+
+
+def get_transport() -> HTTPTransport:
+    """Return the process-wide transport shared by all web price services"""
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = HTTPTransport()
+    return _default_transport
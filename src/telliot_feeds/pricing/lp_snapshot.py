@@ -0,0 +1,209 @@
+"""Batched reads of Uniswap V2 style pair state through Multicall3."""
+import asyncio
+import weakref
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Set
+from typing import Tuple
+
+from eth_abi import decode_abi
+from eth_abi import encode_abi
+from multicall.constants import MULTICALL3_ADDRESSES
+from web3 import Web3
+
+import telliot_feeds.utils.multicall  # noqa: F401  (registers Multicall3 for Pulsechain)
+from telliot_feeds.pricing.web3_pool import get_web3_pool
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def selector(signature: str) -> bytes:
+    """4-byte function selector"""
+    return bytes(Web3.keccak(text=signature)[:4])
+
+
+AGGREGATE3 = selector("aggregate3((address,bool,bytes)[])")
+GET_BLOCK_NUMBER = selector("getBlockNumber()")
+GET_CURRENT_BLOCK_TIMESTAMP = selector("getCurrentBlockTimestamp()")
+GET_RESERVES = selector("getReserves()")
+PRICE0_CUMULATIVE_LAST = selector("price0CumulativeLast()")
+PRICE1_CUMULATIVE_LAST = selector("price1CumulativeLast()")
+
+PAIR_CALLS = (GET_RESERVES, PRICE0_CUMULATIVE_LAST, PRICE1_CUMULATIVE_LAST)
+
+
+def get_multicall_address(w3: Web3, address: Optional[str] = None) -> str:
+    """Multicall3 address of the chain `w3` is connected to, unless given"""
+    address = address or MULTICALL3_ADDRESSES.get(w3.eth.chain_id)
+    if address is None:
+        raise ValueError(f"No Multicall3 address known for chain {w3.eth.chain_id}")
+    return Web3.toChecksumAddress(address)
+
+
+def aggregate3(w3: Web3, multicall: str, calls: Sequence[Tuple[str, bool, bytes]]) -> List[Tuple[bool, bytes]]:
+    """Run `(target, allowFailure, calldata)` calls in one `eth_call` to Multicall3
+
+    Returns:
+        `(success, returnData)` of each call
+    """
+    data = AGGREGATE3 + encode_abi(["(address,bool,bytes)[]"], [list(calls)])
+    raw = w3.eth.call({"to": multicall, "data": "0x" + data.hex()}, "latest")
+    (results,) = decode_abi(["(bool,bytes)[]"], bytes(raw))
+    return list(results)
+
+
+@dataclass(frozen=True)
+class PairState:
+    """Reserves and cumulative prices of a pair"""
+
+    reserve0: int
+    reserve1: int
+    block_timestamp_last: int
+    price0_cumulative_last: int
+    price1_cumulative_last: int
+
+
+@dataclass(frozen=True)
+class LPSnapshot:
+    """State of several pairs, all read at the same block"""
+
+    block_number: int
+    timestamp: int
+    pairs: Dict[str, PairState]
+
+    def pair(self, address: str) -> PairState:
+        try:
+            return self.pairs[Web3.toChecksumAddress(address)]
+        except KeyError:
+            raise KeyError(f"Pair {address} missing from snapshot of block {self.block_number}")
+
+
+@dataclass
+class PendingRead:
+    """Pair reads resolved by a single multicall"""
+
+    future: "asyncio.Future[LPSnapshot]"
+    addresses: Set[str] = field(default_factory=set)
+
+
+class LPSnapshotReader:
+    """Reads reserves and cumulative prices of many pairs in one `eth_call`
+
+    All pair reads, plus the block number and timestamp, are batched into
+    a single Multicall3 `aggregate3` call, so every value in a snapshot
+    comes from the same block. Reads requested within `batch_window`
+    seconds of each other (e.g. by the sources of one `PriceAggregator`)
+    share one call.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        batch_window: float = 0.02,
+        multicall_address: Optional[str] = None,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.multicall_address = multicall_address
+        self._pending: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, PendingRead]" = weakref.WeakKeyDictionary()
+        self.reads = 0
+        self.calls = 0
+
+    async def read(self, addresses: Iterable[str]) -> LPSnapshot:
+        """Snapshot of the given pairs, joining the pending batch if there is one"""
+        requested = {Web3.toChecksumAddress(a) for a in addresses}
+        self.reads += 1
+        if self.batch_window <= 0:
+            return await get_web3_pool().run(self.url, self.read_sync, requested)
+
+        loop = asyncio.get_running_loop()
+        batch = self._pending.get(loop)
+        if batch is not None:
+            batch.addresses |= requested
+            try:
+                return await asyncio.shield(batch.future)
+            except asyncio.CancelledError:
+                if not batch.future.cancelled():
+                    raise
+            # The batch leader was cancelled, retry in a new batch
+            return await self.read(requested)
+
+        # Lead a new batch: collect reads for one window, then call for everyone
+        batch = PendingRead(future=loop.create_future(), addresses=requested)
+        self._pending[loop] = batch
+        try:
+            try:
+                await asyncio.sleep(self.batch_window)
+            finally:
+                if self._pending.get(loop) is batch:
+                    del self._pending[loop]
+            snapshot = await get_web3_pool().run(self.url, self.read_sync, batch.addresses)
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()
+            raise
+        except BaseException:
+            batch.future.cancel()
+            raise
+
+        batch.future.set_result(snapshot)
+        return snapshot
+
+    def read_sync(self, addresses: Iterable[str]) -> LPSnapshot:
+        """Blocking snapshot of the given pairs in one multicall"""
+        pairs = sorted(Web3.toChecksumAddress(a) for a in addresses)
+        w3 = get_web3_pool().web3(self.url, self.timeout)
+        multicall = get_multicall_address(w3, self.multicall_address)
+
+        calls: List[Tuple[str, bool, bytes]] = [
+            (multicall, False, GET_BLOCK_NUMBER),
+            (multicall, False, GET_CURRENT_BLOCK_TIMESTAMP),
+        ]
+        for address in pairs:
+            calls.extend((address, True, data) for data in PAIR_CALLS)
+
+        self.calls += 1
+        results = aggregate3(w3, multicall, calls)
+
+        (block_number,) = decode_abi(["uint256"], results[0][1])
+        (timestamp,) = decode_abi(["uint256"], results[1][1])
+        states = {}
+        for i, address in enumerate(pairs):
+            first = 2 + i * len(PAIR_CALLS)
+            last = first + len(PAIR_CALLS)
+            answers = results[first:last]
+            if not all(success for success, _ in answers):
+                logger.warning(f"Multicall: reading pair {address} failed at block {block_number}")
+                continue
+            reserve0, reserve1, block_timestamp_last = decode_abi(["uint112", "uint112", "uint32"], answers[0][1])
+            (price0_cumulative_last,) = decode_abi(["uint256"], answers[1][1])
+            (price1_cumulative_last,) = decode_abi(["uint256"], answers[2][1])
+            states[address] = PairState(
+                reserve0=reserve0,
+                reserve1=reserve1,
+                block_timestamp_last=block_timestamp_last,
+                price0_cumulative_last=price0_cumulative_last,
+                price1_cumulative_last=price1_cumulative_last,
+            )
+
+        return LPSnapshot(block_number=block_number, timestamp=timestamp, pairs=states)
+
+
+_readers: Dict[str, LPSnapshotReader] = {}
+
+
+def get_lp_reader(url: str) -> LPSnapshotReader:
+    """Return the process-wide reader of an RPC URL, shared by all LP sources"""
+    reader = _readers.get(url)
+    if reader is None:
+        reader = _readers[url] = LPSnapshotReader(url)
+    return reader
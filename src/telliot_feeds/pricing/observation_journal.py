@@ -0,0 +1,152 @@
+"""Append-only binary journal of cumulative-price observations."""
+import mmap
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+from typing import Iterable
+from typing import List
+from typing import Optional
+
+from telliot_feeds.pricing.observations import Observation
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+MAGIC = b"TWAPOBS1"
+# timestamp, price0Cumulative and price1Cumulative (256-bit, big-endian), then the CRC32 of those fields
+BODY = struct.Struct(">Q32s32s")
+CHECKSUM = struct.Struct(">I")
+RECORD_SIZE = BODY.size + CHECKSUM.size
+
+
+def encode_record(observation: Observation) -> bytes:
+    body = BODY.pack(
+        observation.timestamp,
+        observation.price0_cumulative.to_bytes(32, "big"),
+        observation.price1_cumulative.to_bytes(32, "big"),
+    )
+    return body + CHECKSUM.pack(zlib.crc32(body))
+
+
+def decode_record(record: bytes) -> Optional[Observation]:
+    """Observation of a record, None if its checksum does not match"""
+    body = record[: BODY.size]
+    (checksum,) = CHECKSUM.unpack_from(record, BODY.size)
+    if zlib.crc32(body) != checksum:
+        return None
+    timestamp, price0, price1 = BODY.unpack(body)
+    return Observation(timestamp, int.from_bytes(price0, "big"), int.from_bytes(price1, "big"))
+
+
+def fsync_directory(path: Path) -> None:
+    """Persist the entries of a directory, e.g. a file renamed into it (where the OS allows opening directories)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class ObservationJournal:
+    """Observations of a pair persisted as fixed-width, checksummed records
+
+    Each observation is appended as one record, so a sample costs one
+    small write. `sync` forces the records appended since the last sync
+    to disk, so callers can sync once per batch of observations, and off
+    the event loop. On load, the file is read through a memory map and
+    cut at the first torn or corrupt record, so a crash loses at most the
+    observations not synced yet. Once the journal holds more than
+    `max_records`, `compact` rewrites it with the given observations into
+    a temporary file that atomically replaces it.
+    """
+
+    def __init__(self, path: Path, max_records: int = 4096):
+        self.path = Path(path)
+        self.max_records = max_records
+        self.records = 0
+        self.unsynced = 0
+        self._file: Optional[BinaryIO] = None
+
+    def load(self) -> List[Observation]:
+        """Valid observations in the journal, oldest first"""
+        if not self.path.exists() or self.path.stat().st_size < len(MAGIC):
+            self.records = 0
+            return []
+
+        observations = []
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[: len(MAGIC)] != MAGIC:
+                raise ValueError(f"{self.path} is not an observation journal")
+            end = len(MAGIC)
+            while end + RECORD_SIZE <= len(data):
+                start, end = end, end + RECORD_SIZE
+                observation = decode_record(data[start:end])
+                if observation is None:
+                    end = start
+                    break
+                observations.append(observation)
+            size = len(data)
+
+        if end != size:
+            logger.warning(f"Journal {self.path}: dropping {size - end} bytes after the last valid record")
+            self.close()
+            with open(self.path, "r+b") as f:
+                f.truncate(end)
+        self.records = len(observations)
+        return observations
+
+    def append(self, observation: Observation) -> None:
+        """Write one observation, on disk once `sync` returns"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "ab")
+            if self._file.tell() == 0:
+                self._file.write(MAGIC)
+        self._file.write(encode_record(observation))
+        self._file.flush()
+        self.records += 1
+        self.unsynced += 1
+
+    def sync(self) -> None:
+        """Force the observations appended so far to disk
+
+        The journal is opened again rather than syncing the append file, so
+        this can run in another thread while observations are appended or
+        the journal is compacted.
+        """
+        if not self.unsynced:
+            return
+        self.unsynced = 0
+        with open(self.path, "rb") as f:
+            os.fsync(f.fileno())
+
+    def needs_compaction(self) -> bool:
+        return self.records > self.max_records
+
+    def compact(self, observations: Iterable[Observation]) -> None:
+        """Replace the journal with the given observations"""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        records = 0
+        with open(tmp, "wb") as f:
+            f.write(MAGIC)
+            for observation in observations:
+                f.write(encode_record(observation))
+                records += 1
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        fsync_directory(self.path.parent)
+        self.records = records
+        self.unsynced = 0
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
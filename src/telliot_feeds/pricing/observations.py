@@ -0,0 +1,97 @@
+"""Ring buffer of cumulative-price observations of a Uniswap V2 style pair."""
+from array import array
+from dataclasses import dataclass
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class Observation:
+    """Cumulative prices of a pair at a block timestamp"""
+
+    timestamp: int
+    price0_cumulative: int
+    price1_cumulative: int
+
+
+class ObservationRing:
+    """Fixed-capacity buffer of observations ordered by timestamp
+
+    Timestamps are kept in an `array` (cumulative prices are 256-bit, so
+    they are kept in preallocated lists), and once the buffer is full each
+    new observation overwrites the oldest one. Observations must be added
+    in increasing timestamp order, which makes lookups a binary search.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity < 1:
+            raise ValueError("Observation ring capacity must be positive")
+        self.capacity = capacity
+        self._timestamps = array("q", [0]) * capacity
+        self._price0: List[int] = [0] * capacity
+        self._price1: List[int] = [0] * capacity
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Observation]:
+        for i in range(self._size):
+            yield self[i]
+
+    def __getitem__(self, i: int) -> Observation:
+        """Observation `i`, oldest first"""
+        if i < 0:
+            i += self._size
+        if not 0 <= i < self._size:
+            raise IndexError("Observation index out of range")
+        j = (self._start + i) % self.capacity
+        return Observation(self._timestamps[j], self._price0[j], self._price1[j])
+
+    def append(self, timestamp: int, price0_cumulative: int, price1_cumulative: int) -> bool:
+        """Add an observation, returning False if it is not newer than the latest one"""
+        if self._size and timestamp <= self._timestamp(self._size - 1):
+            return False
+        if self._size < self.capacity:
+            j = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            j = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._timestamps[j] = timestamp
+        self._price0[j] = price0_cumulative
+        self._price1[j] = price1_cumulative
+        return True
+
+    def latest(self) -> Optional[Observation]:
+        return self[-1] if self._size else None
+
+    def oldest(self) -> Optional[Observation]:
+        return self[0] if self._size else None
+
+    def nearest(self, timestamp: int) -> Optional[Observation]:
+        """Observation with the timestamp closest to `timestamp`, the older one on ties"""
+        if not self._size:
+            return None
+        i = self._bisect(timestamp)
+        if i == self._size:
+            return self[-1]
+        if i > 0 and timestamp - self._timestamp(i - 1) <= self._timestamp(i) - timestamp:
+            return self[i - 1]
+        return self[i]
+
+    def _timestamp(self, i: int) -> int:
+        return self._timestamps[(self._start + i) % self.capacity]
+
+    def _bisect(self, timestamp: int) -> int:
+        """Index of the first observation at or after `timestamp`"""
+        lo, hi = 0, self._size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._timestamp(mid) < timestamp:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
@@ -0,0 +1,252 @@
+"""Token prices from a graph of Uniswap V2 style pairs."""
+import asyncio
+import math
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+from eth_abi import decode_abi
+from web3 import Web3
+
+from telliot_feeds.pricing.lp_snapshot import aggregate3
+from telliot_feeds.pricing.lp_snapshot import get_multicall_address
+from telliot_feeds.pricing.lp_snapshot import LPSnapshot
+from telliot_feeds.pricing.lp_snapshot import selector
+from telliot_feeds.pricing.reserve_tracker import get_reserve_tracker
+from telliot_feeds.pricing.web3_pool import get_web3_pool
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+TOKEN0 = selector("token0()")
+TOKEN1 = selector("token1()")
+DECIMALS = selector("decimals()")
+
+# Pair tokens and token decimals never change, they are read once per RPC URL.
+# Addresses that are not pairs map to None and are left out of the graph.
+_pair_tokens: Dict[Tuple[str, str], Optional[Tuple[str, str]]] = {}
+_decimals: Dict[Tuple[str, str], int] = {}
+
+
+def get_amount_out(amount_in: int, reserve_in: int, reserve_out: int) -> int:
+    """Output amount of a swap, after the 0.3% fee, like `UniswapV2Library.getAmountOut`"""
+    if amount_in <= 0:
+        raise ValueError("Swap amount must be positive")
+    if reserve_in <= 0 or reserve_out <= 0:
+        raise ValueError("Pair has no liquidity")
+    amount_in_with_fee = amount_in * 997
+    return amount_in_with_fee * reserve_out // (reserve_in * 1000 + amount_in_with_fee)
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Price of a token along a path of pairs
+
+    Args:
+        price: Product of the output of each hop for one whole input token, in whole quote tokens
+        liquidity: Smallest value locked in a pair of the path, in quote tokens
+        path: Pair addresses from the priced token to the quote token
+        timestamp: Timestamp of the block the reserves were read at
+    """
+
+    price: float
+    liquidity: float
+    path: Tuple[str, ...]
+    timestamp: int
+
+
+class PairGraph:
+    """Tokens connected by Uniswap V2 style pairs
+
+    The tokens and decimals of every pair are read once, in one multicall,
+    and reserves of all pairs come from one reserve snapshot, so prices of
+    any number of tokens and routes are computed from the same block.
+    """
+
+    def __init__(self, url: str, pairs: Iterable[str], max_hops: int = 3, timeout: float = 10.0):
+        self.url = url
+        self.pairs = sorted({Web3.toChecksumAddress(p) for p in pairs})
+        self.max_hops = max_hops
+        self.timeout = timeout
+        self._loading: Optional["asyncio.Task[None]"] = None
+
+    def tokens(self, pair: str) -> Tuple[str, str]:
+        """`(token0, token1)` of a pair"""
+        tokens = _pair_tokens[(self.url, Web3.toChecksumAddress(pair))]
+        if tokens is None:
+            raise KeyError(f"{pair} is not a pair")
+        return tokens
+
+    def decimals(self, token: str) -> int:
+        return _decimals[(self.url, Web3.toChecksumAddress(token))]
+
+    def label_tokens(self, pair: str, order: str) -> Dict[str, str]:
+        """Token addresses of a pair by the lowercased names of an `"TOKEN0/TOKEN1"` label"""
+        names = [name.strip().lower() for name in order.split("/")]
+        return dict(zip(names, self.tokens(pair)))
+
+    def known_pairs(self) -> List[str]:
+        """Pairs whose tokens were read"""
+        return [p for p in self.pairs if _pair_tokens.get((self.url, p))]
+
+    def _is_loaded(self) -> bool:
+        if any((self.url, p) not in _pair_tokens for p in self.pairs):
+            return False
+        return all((self.url, t) in _decimals for p in self.known_pairs() for t in self.tokens(p))
+
+    async def load(self) -> None:
+        """Read the tokens and decimals not known yet
+
+        Concurrent callers share one read.
+        """
+        if self._is_loaded():
+            return
+        loop = asyncio.get_running_loop()
+        if self._loading is None or self._loading.done() or self._loading.get_loop() is not loop:
+            self._loading = loop.create_task(get_web3_pool().run(self.url, self._load_sync))
+        await asyncio.shield(self._loading)
+
+    def _load_sync(self) -> None:
+        w3 = get_web3_pool().web3(self.url, self.timeout)
+        multicall = get_multicall_address(w3)
+        pairs = [p for p in self.pairs if (self.url, p) not in _pair_tokens]
+        if pairs:
+            results = aggregate3(w3, multicall, [(p, True, data) for p in pairs for data in (TOKEN0, TOKEN1)])
+            for i, pair in enumerate(pairs):
+                (ok0, data0), (ok1, data1) = results[2 * i], results[2 * i + 1]
+                if not (ok0 and ok1 and len(data0) == len(data1) == 32):
+                    logger.warning(f"Pair graph: {pair} is not a Uniswap V2 pair, leaving it out")
+                    _pair_tokens[(self.url, pair)] = None
+                    continue
+                (token0,) = decode_abi(["address"], data0)
+                (token1,) = decode_abi(["address"], data1)
+                _pair_tokens[(self.url, pair)] = (Web3.toChecksumAddress(token0), Web3.toChecksumAddress(token1))
+
+        tokens = sorted({t for p in self.known_pairs() for t in self.tokens(p) if (self.url, t) not in _decimals})
+        if tokens:
+            results = aggregate3(w3, multicall, [(t, False, DECIMALS) for t in tokens])
+            for token, (_, data) in zip(tokens, results):
+                (_decimals[(self.url, token)],) = decode_abi(["uint8"], data)
+        logger.info(f"Pair graph: read tokens of {len(pairs)} pairs and decimals of {len(tokens)} tokens")
+
+    async def snapshot(self) -> "GraphSnapshot":
+        """Reserves of every pair of the graph at one block"""
+        await self.load()
+        lp_snapshot = await get_reserve_tracker(self.url).snapshot(self.known_pairs())
+        return GraphSnapshot(self, lp_snapshot)
+
+
+@dataclass
+class GraphSnapshot:
+    """Prices from the reserves of a graph at one block"""
+
+    graph: PairGraph
+    lp_snapshot: LPSnapshot
+    _best: Dict[str, Dict[str, Quote]] = field(default_factory=dict, init=False, repr=False)
+
+    def _reserves(self, pair: str, token_in: str) -> Tuple[int, int]:
+        state = self.lp_snapshot.pair(pair)
+        token0, _ = self.graph.tokens(pair)
+        if token_in == token0:
+            return state.reserve0, state.reserve1
+        return state.reserve1, state.reserve0
+
+    def _hop(self, pair: str, token_in: str, token_out: str, out_price: float) -> Tuple[float, float]:
+        """Price of `token_in` and value locked in the pair, in the quote token `token_out` is priced in"""
+        reserve_in, reserve_out = self._reserves(pair, token_in)
+        out_decimals = 10 ** self.graph.decimals(token_out)
+        amount_out = get_amount_out(10 ** self.graph.decimals(token_in), reserve_in, reserve_out)
+        return amount_out / out_decimals * out_price, 2 * reserve_out / out_decimals * out_price
+
+    def _neighbours(self, token: str) -> Iterable[Tuple[str, str]]:
+        for pair in self.graph.known_pairs():
+            if pair not in self.lp_snapshot.pairs:
+                continue
+            token0, token1 = self.graph.tokens(pair)
+            if token == token0:
+                yield pair, token1
+            elif token == token1:
+                yield pair, token0
+
+    def quote(self, route: Sequence[str]) -> Quote:
+        """Price of `route[0]` in `route[-1]`, swapping through the tokens of the route in order
+
+        Between two consecutive tokens the pair with the most liquidity is used.
+        """
+        route = [Web3.toChecksumAddress(t) for t in route]
+        price, liquidity, path = 1.0, math.inf, []
+        # Priced from the quote token backwards, so each hop's liquidity is in quote tokens
+        for token_in, token_out in reversed(list(zip(route, route[1:]))):
+            pairs = [pair for pair, token in self._neighbours(token_out) if token == token_in]
+            if not pairs:
+                raise KeyError(f"No pair between {token_in} and {token_out}")
+            hops = [self._hop(pair, token_in, token_out, price) + (pair,) for pair in pairs]
+            hop_price, hop_liquidity, pair = max(hops, key=lambda hop: hop[1])
+            price, liquidity = hop_price, min(liquidity, hop_liquidity)
+            path.insert(0, pair)
+        return Quote(price=price, liquidity=liquidity, path=tuple(path), timestamp=self.lp_snapshot.timestamp)
+
+    def best_quotes(self, quote_token: str) -> Dict[str, Quote]:
+        """Price of every token reachable from `quote_token`, each along its path with the most liquidity
+
+        The liquidity of a path is that of its shallowest pair, and paths
+        are limited to `max_hops` pairs: the widest path with each number
+        of hops is found from those one hop shorter, so a token reached
+        first by a wide path that used up its hops is still reached by
+        shorter paths through it.
+        """
+        quote_token = Web3.toChecksumAddress(quote_token)
+        if quote_token in self._best:
+            return self._best[quote_token]
+
+        best: Dict[str, Tuple[float, float, Tuple[str, ...]]] = {quote_token: (1.0, math.inf, ())}
+        # Widest path of the current number of hops to each token
+        layer = dict(best)
+        for _ in range(self.graph.max_hops):
+            next_layer: Dict[str, Tuple[float, float, Tuple[str, ...]]] = {}
+            for token, (price, liquidity, path) in layer.items():
+                for pair, other in self._neighbours(token):
+                    if other == quote_token:
+                        continue
+                    try:
+                        other_price, hop_liquidity = self._hop(pair, other, token, price)
+                    except ValueError:
+                        continue
+                    other_liquidity = min(liquidity, hop_liquidity)
+                    if other not in next_layer or other_liquidity > next_layer[other][1]:
+                        next_layer[other] = (other_price, other_liquidity, (pair,) + path)
+            for token, quote in next_layer.items():
+                # shorter paths win ties
+                if token not in best or quote[1] > best[token][1]:
+                    best[token] = quote
+            layer = next_layer
+
+        timestamp = self.lp_snapshot.timestamp
+        self._best[quote_token] = {
+            token: Quote(price=price, liquidity=liquidity, path=path, timestamp=timestamp)
+            for token, (price, liquidity, path) in best.items()
+            if token != quote_token
+        }
+        return self._best[quote_token]
+
+    def price(self, token: str, quote_token: str) -> Optional[Quote]:
+        """Price of `token` in `quote_token` along the path with the most liquidity"""
+        return self.best_quotes(quote_token).get(Web3.toChecksumAddress(token))
+
+
+_graphs: Dict[Tuple[str, Tuple[str, ...]], PairGraph] = {}
+
+
+def get_pair_graph(url: str, pairs: Iterable[str]) -> PairGraph:
+    """Return the process-wide graph of the given pairs on an RPC URL"""
+    key = (url, tuple(sorted({Web3.toChecksumAddress(p) for p in pairs})))
+    graph = _graphs.get(key)
+    if graph is None:
+        graph = _graphs[key] = PairGraph(url, key[1])
+    return graph
@@ -0,0 +1,140 @@
+"""Recent prices of feeds, for checks that do not need a price fetched just now."""
+import asyncio
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+from telliot_feeds.datafeed import DataFeed
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def feed_label(feed: DataFeed[Any]) -> str:
+    """`asset/currency` of a price feed (lowercase), the query type otherwise"""
+    asset = getattr(feed.query, "asset", None)
+    currency = getattr(feed.query, "currency", None)
+    if asset and currency:
+        return f"{asset}/{currency}".lower()
+    return type(feed.query).__name__
+
+
+def parse_max_ages(value: str) -> Dict[str, float]:
+    """Parse `asset/currency=seconds` entries, e.g. `"pls/usd=30,fetch/usd=120"`
+
+    Malformed entries are logged and left out.
+    """
+    max_ages = {}
+    for entry in value.split(","):
+        if entry.strip():
+            try:
+                label, seconds = entry.split("=")
+                max_ages[label.strip().lower()] = float(seconds)
+            except ValueError:
+                logger.error(
+                    f"Price cache: ignoring malformed maximum age {entry.strip()!r}, expected asset/currency=seconds"
+                )
+    return max_ages
+
+
+def default_max_age() -> float:
+    """`PRICE_CACHE_MAX_AGE` seconds, 60 if it is not set or malformed"""
+    value = os.getenv("PRICE_CACHE_MAX_AGE", "60")
+    try:
+        return float(value)
+    except ValueError:
+        logger.error(f"Price cache: ignoring malformed PRICE_CACHE_MAX_AGE {value!r}, using 60 seconds")
+        return 60.0
+
+
+@dataclass
+class CachedPrice:
+    feed: DataFeed[Any]
+    value: Optional[float] = None
+    fetched: float = float("-inf")
+    task: "Optional[asyncio.Task[Optional[float]]]" = None
+
+
+class PriceCache:
+    """Latest price of each feed, reused until it is older than the feed's maximum age
+
+    A price older than `refresh_ahead` times its maximum age is still
+    returned, but is fetched again in the background, so callers rarely
+    wait for the network. Callers that find no fresh price share a single
+    fetch. A failed fetch keeps the previous price until it expires.
+    """
+
+    def __init__(
+        self,
+        max_age: Optional[float] = None,
+        max_ages: Optional[Dict[str, float]] = None,
+        refresh_ahead: float = 0.75,
+    ):
+        self.max_age = max_age if max_age is not None else default_max_age()
+        self.max_ages = max_ages if max_ages is not None else parse_max_ages(os.getenv("PRICE_CACHE_MAX_AGES", ""))
+        self.refresh_ahead = refresh_ahead
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[int, CachedPrice] = {}
+
+    def max_age_of(self, feed: DataFeed[Any]) -> float:
+        return self.max_ages.get(feed_label(feed), self.max_age)
+
+    async def price(self, feed: DataFeed[float]) -> Optional[float]:
+        """Price of a feed at most its maximum age old, or None if it cannot be fetched"""
+        entry = self._entries.get(id(feed))
+        if entry is None:
+            entry = self._entries[id(feed)] = CachedPrice(feed=feed)
+
+        age = time.monotonic() - entry.fetched
+        max_age = self.max_age_of(feed)
+        if entry.value is not None and age < max_age:
+            self.hits += 1
+            if age >= self.refresh_ahead * max_age:
+                self._refresh(entry)
+            return entry.value
+
+        self.misses += 1
+        return await asyncio.shield(self._refresh(entry))
+
+    def _refresh(self, entry: CachedPrice) -> "asyncio.Task[Optional[float]]":
+        loop = asyncio.get_running_loop()
+        if entry.task is None or entry.task.done() or entry.task.get_loop() is not loop:
+            entry.task = loop.create_task(self._fetch(entry))
+        return entry.task
+
+    async def _fetch(self, entry: CachedPrice) -> Optional[float]:
+        label = feed_label(entry.feed)
+        try:
+            datapoint = await entry.feed.source.fetch_new_datapoint()
+        except Exception as e:
+            logger.warning(f"Price cache: failed to fetch {label} price: {e!r}")
+            return None
+        value = datapoint[0]
+        if value is None:
+            logger.warning(f"Price cache: no {label} price")
+            return None
+        entry.value = value
+        entry.fetched = time.monotonic()
+        return value
+
+
+_default_price_cache: Optional[PriceCache] = None
+
+
+def get_price_cache() -> PriceCache:
+    """Return the process-wide price cache"""
+    global _default_price_cache
+    if _default_price_cache is None:
+        _default_price_cache = PriceCache()
+    return _default_price_cache
+
+
+def reset_price_cache() -> None:
+    """Drop the process-wide price cache, so the next one reads its configuration again (e.g. between tests)"""
+    global _default_price_cache
+    _default_price_cache = None
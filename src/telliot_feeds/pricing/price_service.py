@@ -1,11 +1,15 @@
+import json
 from abc import ABC
 from abc import abstractmethod
 from typing import Any
 from typing import Dict
-
-import requests
+from typing import Optional
 
 from telliot_feeds.dtypes.datapoint import OptionalWeightedDataPoint
+from telliot_feeds.pricing.http_transport import get_transport
+from telliot_feeds.pricing.http_transport import HTTPTransport
+from telliot_feeds.pricing.response_cache import get_response_cache
+from telliot_feeds.pricing.response_cache import ResponseCache
 
 
 class PriceServiceInterface(ABC):
@@ -35,19 +39,39 @@ class PriceServiceInterface(ABC):
 
 
 class WebPriceService(PriceServiceInterface):
-    """Abstract Base CLass for a Web-based Pricing Service"""
+    """Abstract Base CLass for a Web-based Pricing Service
+
+    Requests go through a shared, non-blocking `HTTPTransport`, so
+    concurrently gathered services do not block the event loop
+    and reuse pooled keep-alive connections.
+
+    Responses are kept in a process-wide `ResponseCache` for `cache_ttl`
+    seconds, and identical concurrent requests share a single fetch.
+    """
 
-    def __init__(self, name: str, url: str, timeout: float = 5.0):
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        timeout: float = 5.0,
+        transport: Optional[HTTPTransport] = None,
+        cache_ttl: float = 5.0,
+        cache: Optional[ResponseCache] = None,
+    ):
 
         self.name = name
         self.url = url
         self.timeout = timeout
+        self.transport = transport if transport is not None else get_transport()
+        self.cache_ttl = cache_ttl
+        self.cache = cache if cache is not None else get_response_cache()
 
-    def get_url(self, url: str = "") -> Dict[str, Any]:
+    async def get_url(self, url: str = "", headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
         """Helper function to get URL JSON response while handling exceptions
 
         Args:
             url: URL to fetch
+            headers: Optional request headers
 
         Returns:
             A dictionary with the following (optional) keys:
@@ -57,18 +81,36 @@ class WebPriceService(PriceServiceInterface):
         """
 
         request_url = self.url + url
+        key = ("GET", request_url, _freeze(headers))
+
+        return await self.cache.get_or_fetch(
+            key, self.cache_ttl, lambda: self.transport.get(request_url, timeout=self.timeout, headers=headers)
+        )
+
+    async def post_url(
+        self, url: str = "", json_data: Any = None, headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """Helper function to POST a JSON body and get the JSON response while handling exceptions
 
-        with requests.Session() as s:
-            try:
-                r = s.get(request_url, timeout=self.timeout)
-                json_data = r.json()
-                return {"response": json_data}
+        Args:
+            url: URL to post to
+            json_data: JSON request body
+            headers: Optional request headers
+
+        Returns:
+            Same as `WebPriceService.get_url`
+        """
+
+        request_url = self.url + url
+        key = ("POST", request_url, _freeze(headers), _freeze(json_data))
 
-            except requests.exceptions.ConnectTimeout as e:
-                return {"error": "Timeout Error", "exception": e}
+        return await self.cache.get_or_fetch(
+            key,
+            self.cache_ttl,
+            lambda: self.transport.post(request_url, json_data=json_data, timeout=self.timeout, headers=headers),
+        )
 
-            except requests.exceptions.JSONDecodeError as e:
-                return {"error": "JSON Decode Error", "exception": e}
 
-            except Exception as e:
-                return {"error": str(type(e)), "exception": e}
+def _freeze(data: Any) -> str:
+    """Serialize request headers or body into a cache key component"""
+    return json.dumps(data, sort_keys=True, default=str)
@@ -33,6 +33,6 @@ class PriceSource(DataSource[float]):
         v = datapoint[0]
         t = datapoint[1]
         if v is not None and t is not None:
-            self.store_datapoint((v, t))
+            self.store_datapoint((v, t), weight=datapoint[2] if len(datapoint) == 3 else None)
 
         return datapoint
@@ -0,0 +1,241 @@
+"""Streaming price services backed by persistent WebSocket subscriptions."""
+import asyncio
+import json
+import time
+from abc import abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+import websockets
+
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.price_service import WebPriceService
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+# Upper bound of the exponential reconnect delay, in seconds
+MAX_RECONNECT_DELAY = 30.0
+
+
+@dataclass(frozen=True)
+class Quote:
+    """Last traded price of a market"""
+
+    price: float
+
+    #: Time the update was received
+    timestamp: datetime
+
+    #: Monotonic receive time, used for staleness checks
+    received: float
+
+
+class PriceBook:
+    """Last price per market
+
+    The book is written only by the stream reader task. Each update swaps
+    in a new immutable `Quote`, so a read is a single dict lookup and needs
+    no locking.
+    """
+
+    def __init__(self) -> None:
+        self._quotes: Dict[str, Quote] = {}
+
+    def __len__(self) -> int:
+        return len(self._quotes)
+
+    def __contains__(self, market: str) -> bool:
+        return market in self._quotes
+
+    def update(self, market: str, price: float) -> Quote:
+        quote = Quote(price=price, timestamp=datetime_now_utc(), received=time.monotonic())
+        self._quotes[market] = quote
+        return quote
+
+    def get(self, market: str, max_age: Optional[float] = None) -> Optional[Quote]:
+        """Return the last quote of a market, or None if missing or older than `max_age` seconds"""
+        quote = self._quotes.get(market)
+        if quote is None:
+            return None
+        if max_age is not None and time.monotonic() - quote.received > max_age:
+            return None
+        return quote
+
+
+class StreamingPriceService(WebPriceService):
+    """Price service reading prices from a WebSocket subscription
+
+    Mix in before a REST price service. The first request for a market
+    subscribes to it on a persistent connection, later requests read the
+    last price from the in-memory `PriceBook`. When no price younger than
+    `max_age` seconds is available (stream warming up, disconnected or a
+    quiet market) the REST service is used instead, unless `rest_fallback`
+    is disabled.
+
+    Subclasses map asset/currency pairs to exchange markets and implement
+    the exchange's subscribe and message formats.
+    """
+
+    #: Default WebSocket endpoint
+    ws_url: str = ""
+
+    def __init__(
+        self,
+        ws_url: Optional[str] = None,
+        max_age: float = 10.0,
+        warmup_timeout: float = 2.0,
+        reconnect_delay: float = 1.0,
+        rest_fallback: bool = True,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(**kwargs)
+        if ws_url is not None:
+            self.ws_url = ws_url
+        self.max_age = max_age
+        self.warmup_timeout = warmup_timeout
+        self.reconnect_delay = reconnect_delay
+        self.rest_fallback = rest_fallback
+
+        self.book = PriceBook()
+        self.markets: Set[str] = set()
+        self.reconnects = 0
+        self._ready: Dict[str, asyncio.Event] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._ws: Optional[Any] = None
+
+    @classmethod
+    def shared(cls) -> "StreamingPriceService":
+        """Return the process-wide instance, so sources share one connection per exchange"""
+        service = _shared_services.get(cls)
+        if service is None:
+            service = cls()
+            _shared_services[cls] = service
+        return service
+
+    @abstractmethod
+    def market(self, asset: str, currency: str) -> str:
+        """Exchange market symbol of an asset/currency pair"""
+
+    @abstractmethod
+    def subscribe_messages(self, markets: List[str]) -> List[Any]:
+        """Messages subscribing to price updates of `markets`"""
+
+    @abstractmethod
+    def parse_message(self, message: Any) -> List[Tuple[str, float]]:
+        """Extract `(market, price)` updates from a decoded stream message"""
+
+    async def get_price(self, asset: str, currency: str) -> OptionalDataPoint[float]:
+        """Implement PriceServiceInterface
+
+        This implementation reads the last streamed price."""
+
+        market = self.market(asset, currency)
+        quote = self.book.get(market, self.max_age)
+        if quote is None:
+            await self._subscribe(market)
+            quote = await self._wait_for_quote(market)
+
+        if quote is not None:
+            return quote.price, quote.timestamp
+
+        if self.rest_fallback:
+            logger.info(f"{self.name}: no recent streamed price for {market}, using REST API")
+            return await super().get_price(asset, currency)  # type: ignore
+
+        logger.warning(f"{self.name}: no streamed price for {market} in the last {self.max_age} seconds")
+        return None, None
+
+    async def close(self) -> None:
+        """Stop the stream"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _subscribe(self, market: str) -> None:
+        self._ensure_stream()
+        if market in self.markets:
+            return
+        self.markets.add(market)
+        self._ready[market] = asyncio.Event()
+        # Otherwise the market is subscribed to once connected
+        if self._ws is not None:
+            await self._send(self._ws, [market])
+
+    async def _wait_for_quote(self, market: str) -> Optional[Quote]:
+        """Wait for the first price of a new subscription"""
+        event = self._ready[market]
+        if not event.is_set():
+            try:
+                await asyncio.wait_for(event.wait(), self.warmup_timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.book.get(market, self.max_age)
+
+    def _ensure_stream(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Subscriptions of a previous event loop are gone
+            self.markets = set()
+            self._ready = {}
+            self._ws = None
+        elif self._task is not None and not self._task.done():
+            return
+        self._loop = loop
+        self._task = loop.create_task(self._run())
+
+    async def _send(self, ws: Any, markets: List[str]) -> None:
+        for message in self.subscribe_messages(markets):
+            await ws.send(json.dumps(message))
+
+    async def _run(self) -> None:
+        """Keep the connection open, reconnecting with exponential backoff"""
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, close_timeout=1) as ws:
+                    self._ws = ws
+                    if self.markets:
+                        await self._send(ws, sorted(self.markets))
+                    async for raw in ws:
+                        self._handle(raw)
+                        delay = self.reconnect_delay
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"{self.name}: stream error: {e!r}")
+            finally:
+                self._ws = None
+
+            self.reconnects += 1
+            logger.info(f"{self.name}: reconnecting to {self.ws_url} in {delay} seconds")
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MAX_RECONNECT_DELAY)
+
+    def _handle(self, raw: Any) -> None:
+        try:
+            updates = self.parse_message(json.loads(raw))
+        except Exception as e:
+            logger.warning(f"{self.name}: could not parse stream message {raw!r}: {e!r}")
+            return
+
+        for market, price in updates:
+            if market not in self.markets:
+                continue
+            self.book.update(market, price)
+            event = self._ready.get(market)
+            if event is not None:
+                event.set()
+
+
+_shared_services: Dict[type, StreamingPriceService] = {}
@@ -0,0 +1,199 @@
+"""Per-host token-bucket rate limiting for web price services."""
+import asyncio
+import math
+import os
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+# Public API quotas as (requests, period in seconds)
+DEFAULT_RATE_LIMITS: Dict[str, Tuple[float, float]] = {
+    "api.binance.com": (1200, 60),
+    "api.pro.coinbase.com": (10, 1),
+    "api.exchange.coinbase.com": (10, 1),
+    "api.coinbase.com": (10, 1),
+    "api.coingecko.com": (25, 60),
+    "api.kraken.com": (1, 1),
+    "api-pub.bitfinex.com": (30, 60),
+    "api.gemini.com": (2, 1),
+    "api.bitflyer.com": (500, 300),
+    "api.bittrex.com": (60, 60),
+}
+
+# Backoff applied on a 429 response without a usable Retry-After header
+MIN_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """Parse rate limits from a string like ``host=30/60,other.host=5/1``
+
+    Each entry is ``host=requests/seconds``.
+    """
+    limits = {}
+    for entry in spec.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        try:
+            host, quota = entry.split("=")
+            requests, period = quota.split("/")
+            limits[host.strip().lower()] = (float(requests), float(period))
+        except ValueError:
+            raise ValueError(f"Invalid rate limit '{entry}', expected host=requests/seconds")
+    return limits
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class TokenBucket:
+    """Token bucket allowing `requests` per `period` seconds with bursts up to `requests`"""
+
+    def __init__(self, requests: float, period: float):
+        self.rate = requests / period
+        self.capacity = max(requests, 1.0)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.backoff = 0.0
+
+        #: Metrics
+        self.queued = 0
+        self.max_queue_depth = 0
+        self.acquired = 0
+        self.throttled = 0
+        self.rate_limited = 0
+
+    def _refill(self, now: float) -> None:
+        if math.isinf(self.rate):
+            self.tokens = self.capacity
+        else:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        self.queued += 1
+        self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        waited = False
+        try:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        self.acquired += 1
+                        if waited:
+                            self.throttled += 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+                waited = True
+                await asyncio.sleep(wait)
+        finally:
+            self.queued -= 1
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        """Block the bucket after a rate-limited response
+
+        Honours the server's Retry-After delay when present, otherwise
+        backs off exponentially until a request succeeds.
+
+        Returns:
+            Seconds until requests are allowed again
+        """
+        self.rate_limited += 1
+        if retry_after is None:
+            self.backoff = min(max(self.backoff * 2, MIN_BACKOFF), MAX_BACKOFF)
+            delay = self.backoff
+        else:
+            delay = retry_after
+        self.blocked_until = max(self.blocked_until, time.monotonic() + delay)
+        # Drain the burst so requests resume at the steady rate
+        self.tokens = 0.0
+        return delay
+
+    def reset(self) -> None:
+        """Clear the exponential backoff after a successful request"""
+        self.backoff = 0.0
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "acquired": self.acquired,
+            "throttled": self.throttled,
+            "rate_limited": self.rate_limited,
+            "blocked_for": max(self.blocked_until - time.monotonic(), 0.0),
+        }
+
+
+class RateLimiter:
+    """Token buckets keyed by host
+
+    Hosts without a configured limit are not paced, but are still blocked
+    after a 429 response until their Retry-After delay has passed.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.limits = dict(DEFAULT_RATE_LIMITS if limits is None else limits)
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    @classmethod
+    def from_env(cls) -> "RateLimiter":
+        """Default limits, overridden by the ``HTTP_RATE_LIMITS`` environment variable"""
+        limits = dict(DEFAULT_RATE_LIMITS)
+        limits.update(parse_rate_limits(os.getenv("HTTP_RATE_LIMITS", "")))
+        return cls(limits)
+
+    def bucket(self, host: str) -> TokenBucket:
+        host = host.lower()
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            # Unlimited hosts get a bucket that never runs dry
+            requests, period = self.limits.get(host, (float("inf"), 1.0))
+            bucket = TokenBucket(requests, period)
+            self._buckets[host] = bucket
+        return bucket
+
+    async def acquire(self, host: str) -> None:
+        """Wait for permission to send a request to `host`"""
+        await self.bucket(host).acquire()
+
+    def penalize(self, host: str, retry_after: Optional[float] = None) -> float:
+        """Record a rate-limited response from `host`, see `TokenBucket.penalize`"""
+        delay = self.bucket(host).penalize(retry_after)
+        logger.warning(f"Rate limited by {host}, pausing requests for {delay:.1f} seconds")
+        return delay
+
+    def reset(self, host: str) -> None:
+        self.bucket(host).reset()
+
+    @property
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth and throttling metrics per host"""
+        return {host: bucket.stats for host, bucket in self._buckets.items()}
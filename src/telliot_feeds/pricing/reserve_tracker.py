@@ -0,0 +1,197 @@
+"""In-memory reserves of Uniswap V2 style pairs, kept current from their `Sync` events."""
+import asyncio
+import os
+from typing import Dict
+from typing import Iterable
+from typing import Optional
+from typing import Set
+
+from eth_abi import decode_abi
+from web3 import Web3
+
+from telliot_feeds.pricing.lp_snapshot import get_lp_reader
+from telliot_feeds.pricing.lp_snapshot import LPSnapshot
+from telliot_feeds.pricing.lp_snapshot import PairState
+from telliot_feeds.pricing.sync_backfill import SYNC_TOPIC
+from telliot_feeds.pricing.sync_backfill import uq112_price
+from telliot_feeds.pricing.web3_pool import get_web3_pool
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+def apply_sync(pair: PairState, reserve0: int, reserve1: int, timestamp: int) -> PairState:
+    """State of a pair after a reserve update, like `UniswapV2Pair._update`"""
+    price0, price1 = pair.price0_cumulative_last, pair.price1_cumulative_last
+    elapsed = (timestamp - pair.block_timestamp_last) % 2**32
+    if elapsed > 0 and pair.reserve0 and pair.reserve1:
+        price0 = (price0 + uq112_price(pair.reserve1, pair.reserve0) * elapsed) % 2**256
+        price1 = (price1 + uq112_price(pair.reserve0, pair.reserve1) * elapsed) % 2**256
+    return PairState(
+        reserve0=reserve0,
+        reserve1=reserve1,
+        block_timestamp_last=timestamp % 2**32,
+        price0_cumulative_last=price0,
+        price1_cumulative_last=price1,
+    )
+
+
+class ReserveTracker:
+    """Reserves and cumulative prices of pairs, followed block by block
+
+    Pairs are tracked from the first time they are requested. A background
+    task polls for new blocks and applies the `Sync` events of the tracked
+    pairs to the in-memory table, so `snapshot` is served without any RPC
+    call. When the chain was reorganized, too many blocks were missed or
+    the table is older than `max_staleness` seconds, the table is read
+    again with one multicall (`LPSnapshotReader`).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        poll_interval: Optional[float] = None,
+        max_staleness: Optional[float] = None,
+        max_gap: int = 50,
+    ):
+        self.url = url
+        self.timeout = timeout
+        self.poll_interval = poll_interval or float(os.getenv("RESERVE_POLL_INTERVAL", 2.0))
+        self.max_staleness = max_staleness or float(os.getenv("RESERVE_MAX_STALENESS", 30.0))
+        self.max_gap = max_gap
+        self.block_number: Optional[int] = None
+        self.timestamp: Optional[int] = None
+        self.updated: Optional[float] = None
+        self.resyncs = 0
+        # Bumped on each change of the table, so a poll can tell it was read again meanwhile
+        self._generation = 0
+        self._hash: Optional[bytes] = None
+        self._pairs: Dict[str, PairState] = {}
+        self._tracked: Set[str] = set()
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    async def snapshot(self, addresses: Iterable[str]) -> LPSnapshot:
+        """State of the given pairs at the latest block followed"""
+        requested = {Web3.toChecksumAddress(a) for a in addresses}
+        self._tracked |= requested
+        self._ensure_polling()
+        if requested <= self._pairs.keys() and self.is_fresh():
+            return LPSnapshot(
+                block_number=self.block_number,  # type: ignore
+                timestamp=self.timestamp,  # type: ignore
+                pairs={address: self._pairs[address] for address in requested},
+            )
+        return await self.resync()
+
+    def is_fresh(self) -> bool:
+        if self.updated is None:
+            return False
+        return asyncio.get_running_loop().time() - self.updated <= self.max_staleness
+
+    async def resync(self) -> LPSnapshot:
+        """Read all tracked pairs again"""
+        snapshot = await get_lp_reader(self.url).read(self._tracked)
+        if self.block_number is None or snapshot.block_number >= self.block_number:
+            self.resyncs += 1
+            if snapshot.block_number == self.block_number:
+                # Concurrent resyncs may read different pairs at the same block, keep them all
+                self._pairs.update(snapshot.pairs)
+            else:
+                self._pairs = dict(snapshot.pairs)
+            self.block_number = snapshot.block_number
+            self.timestamp = snapshot.timestamp
+            self._hash = None
+            self.updated = asyncio.get_running_loop().time()
+            self._generation += 1
+        return snapshot
+
+    async def poll(self) -> None:
+        """Apply the Sync events of blocks mined since the last poll"""
+        if self.block_number is None:
+            return
+        pool = get_web3_pool()
+        w3 = pool.web3(self.url, self.timeout)
+        start, generation = self.block_number, self._generation
+        head = await pool.run(self.url, w3.eth.get_block, "latest")
+        if head["number"] < start or head["number"] - start > self.max_gap:
+            logger.info(f"Reserve tracker: head moved from block {start} to {head['number']}, reading reserves again")
+            await self.resync()
+            return
+
+        # Hash of our latest block on the current chain
+        if head["number"] == start:
+            last_hash = head["hash"]
+        elif head["number"] == start + 1:
+            last_hash = head["parentHash"]
+        else:
+            last_hash = (await pool.run(self.url, w3.eth.get_block, start))["hash"]
+        if self._generation != generation:
+            return
+        if self._hash is None:
+            self._hash = last_hash
+        if last_hash != self._hash:
+            logger.info(f"Reserve tracker: block {start} was reorganized, reading reserves again")
+            await self.resync()
+            return
+        if head["number"] == start:
+            self.updated = asyncio.get_running_loop().time()
+            return
+
+        params = {
+            "address": sorted(self._pairs),
+            "topics": [SYNC_TOPIC],
+            "fromBlock": start + 1,
+            "toBlock": head["number"],
+        }
+        logs = await pool.run(self.url, w3.eth.get_logs, params)
+        timestamps = {head["number"]: head["timestamp"]}
+        for block in {log["blockNumber"] for log in logs} - timestamps.keys():
+            timestamps[block] = (await pool.run(self.url, w3.eth.get_block, block))["timestamp"]
+        if self._generation != generation:
+            # Read again while this poll was waiting (maybe with more pairs at the same block), its state is newer
+            return
+
+        pairs = dict(self._pairs)
+        for log in sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"])):
+            reserve0, reserve1 = decode_abi(["uint112", "uint112"], Web3.toBytes(hexstr=log["data"]))
+            address = Web3.toChecksumAddress(log["address"])
+            pairs[address] = apply_sync(pairs[address], reserve0, reserve1, timestamps[log["blockNumber"]])
+
+        self._pairs = pairs
+        self.block_number = head["number"]
+        self.timestamp = head["timestamp"]
+        self._hash = head["hash"]
+        self.updated = asyncio.get_running_loop().time()
+        self._generation += 1
+
+    def _ensure_polling(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.warning(f"Reserve tracker: polling {self.url} failed: {e}")
+
+    def close(self) -> None:
+        """Stop following new blocks"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+_trackers: Dict[str, ReserveTracker] = {}
+
+
+def get_reserve_tracker(url: str) -> ReserveTracker:
+    """Return the process-wide tracker of an RPC URL, shared by all LP sources"""
+    tracker = _trackers.get(url)
+    if tracker is None:
+        tracker = _trackers[url] = ReserveTracker(url)
+    return tracker
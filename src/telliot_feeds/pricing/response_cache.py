@@ -0,0 +1,134 @@
+"""Process-wide TTL response cache with request coalescing."""
+import asyncio
+import copy
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Optional
+from typing import Tuple
+
+
+def is_success(result: Dict[str, Any]) -> bool:
+    """Whether a response is worth caching: no transport error and a 2xx status"""
+    return "error" not in result and 200 <= result.get("status", 200) < 300
+
+
+class ResponseCache:
+    """Size-bounded LRU cache of web responses
+
+    Successful (2xx) responses are kept for a caller-provided TTL.
+    Concurrent requests for the same key share one in-flight fetch
+    (single-flight), so identical requests issued while another is
+    pending never reach the network twice. Every caller gets its own
+    copy of a successful response, so one caller modifying it cannot
+    change what the others see.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[Hashable, "asyncio.Future[Dict[str, Any]]"] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Hit, miss and coalesced request counters"""
+        return {"hits": self.hits, "misses": self.misses, "coalesced": self.coalesced, "size": len(self._entries)}
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        """Return a cached response if it has not expired"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Dict[str, Any], ttl: float) -> None:
+        """Store a response for `ttl` seconds, evicting the least recently used entries"""
+        self._entries[key] = (time.monotonic() + ttl, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached responses and reset counters"""
+        self._entries.clear()
+        self.hits = self.misses = self.coalesced = 0
+
+    async def get_or_fetch(
+        self, key: Hashable, ttl: float, fetch: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return a cached response, join a pending fetch, or fetch it
+
+        Args:
+            key: Hashable request identifier
+            ttl: Seconds to keep a successful response, 0 disables caching
+                (concurrent requests are still coalesced)
+            fetch: Coroutine function performing the request
+
+        Returns:
+            The response dictionary, see `HTTPTransport.request`
+        """
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        pending = self._inflight.get(key)
+        if pending is not None and not pending.done():
+            self.coalesced += 1
+            try:
+                result = await asyncio.shield(pending)
+                return copy.deepcopy(result) if is_success(result) else dict(result)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+            # The caller that started the fetch was cancelled, fetch again
+            return await self.get_or_fetch(key, ttl, fetch)
+
+        self.misses += 1
+        future: "asyncio.Future[Dict[str, Any]]" = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+        # Waiters resume after the caller got `result` back, share a snapshot
+        future.set_result(copy.deepcopy(result) if is_success(result) else dict(result))
+        if ttl > 0 and is_success(result):
+            self.put(key, result, ttl)
+        return result
+
+
+_default_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """Return the process-wide cache shared by all web price services"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
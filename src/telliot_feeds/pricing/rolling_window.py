@@ -0,0 +1,43 @@
+"""Running mean of the values reported over a sliding time window."""
+from collections import deque
+from decimal import Decimal
+from typing import Deque
+from typing import Optional
+from typing import Tuple
+
+
+class RollingMean:
+    """Sum and count of the values added in the last `timespan` seconds
+
+    Values must be added in increasing time order. Each value is added to
+    the running sum once and subtracted once when it expires, so keeping
+    the mean current costs O(1) per value instead of summing the window
+    again. Sums are kept as `Decimal`, so expiring values leaves no
+    rounding error behind.
+    """
+
+    def __init__(self, timespan: int):
+        self.timespan = timespan
+        self.total = Decimal(0)
+        self._values: Deque[Tuple[int, Decimal]] = deque()
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def add(self, time: int, value: Decimal) -> None:
+        if self._values and time < self._values[-1][0]:
+            raise ValueError(f"Value at {time} is older than the latest one at {self._values[-1][0]}")
+        self._values.append((time, value))
+        self.total += value
+
+    def expire(self, now: int) -> None:
+        """Drop the values older than `now - timespan`"""
+        cutoff = now - self.timespan
+        while self._values and self._values[0][0] < cutoff:
+            _, value = self._values.popleft()
+            self.total -= value
+
+    def mean(self) -> Optional[Decimal]:
+        if not self._values:
+            return None
+        return self.total / len(self._values)
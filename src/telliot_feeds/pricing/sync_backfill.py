@@ -0,0 +1,146 @@
+"""Rebuild the cumulative-price history of a Uniswap V2 style pair from its `Sync` events."""
+import asyncio
+import math
+import os
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from eth_abi import decode_abi
+from web3 import Web3
+from web3.types import LogReceipt
+
+from telliot_feeds.pricing.lp_snapshot import get_lp_reader
+from telliot_feeds.pricing.observations import Observation
+from telliot_feeds.pricing.web3_pool import get_web3_pool
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+SYNC_TOPIC = Web3.keccak(text="Sync(uint112,uint112)").hex()
+
+# Blocks sampled to estimate the block time
+BLOCK_TIME_SAMPLE = 1000
+
+
+def uq112_price(numerator: int, denominator: int) -> int:
+    """Price as accumulated by the pair contract (UQ112x112)"""
+    return (numerator << 112) // denominator
+
+
+class SyncBackfill:
+    """Cumulative-price observations of a pair, reconstructed from `Sync` events
+
+    A pair emits `Sync(reserve0, reserve1)` whenever its reserves change,
+    and accumulates the price of its previous reserves for the time since
+    the previous update. Starting from the current cumulative prices and
+    walking the events backwards, subtracting what each reserve period
+    added, gives the exact cumulative prices at every event in the window.
+
+    Logs are fetched with `eth_getLogs` in chunks of `chunk_size` blocks,
+    and a chunk the node refuses (too many results or too wide a range) is
+    split in half until it goes through.
+    """
+
+    def __init__(self, url: str, timeout: float = 10.0, chunk_size: Optional[int] = None, max_lookback: int = 8):
+        self.url = url
+        self.timeout = timeout
+        self.chunk_size = chunk_size or int(os.getenv("TWAP_BACKFILL_CHUNK", 2000))
+        self.max_lookback = max_lookback
+        self._timestamps: Dict[int, int] = {}
+
+    async def observations(self, address: str, window: int) -> List[Observation]:
+        """Observations of a pair, oldest first, back to at least `window` seconds ago if it had any event"""
+        address = Web3.toChecksumAddress(address)
+        snapshot = await get_lp_reader(self.url).read([address])
+        pair = snapshot.pair(address)
+        latest = Observation(pair.block_timestamp_last, pair.price0_cumulative_last, pair.price1_cumulative_last)
+        window_start = snapshot.timestamp - window
+        if pair.block_timestamp_last <= window_start:
+            # No reserve update within the window, the current state covers it
+            return [latest]
+
+        to_block = snapshot.block_number
+        span = math.ceil(window / await self._estimate_block_time(to_block) * 1.2)
+        from_block = max(to_block - span, 0)
+        logs = await self.get_logs(address, from_block, to_block)
+        lookback = 1
+        while from_block > 0 and lookback < self.max_lookback:
+            if logs and await self._timestamp(logs[0]["blockNumber"]) <= window_start:
+                break
+            earlier = max(from_block - span, 0)
+            logs = await self.get_logs(address, earlier, from_block - 1) + logs
+            from_block = earlier
+            lookback += 1
+
+        if not logs:
+            logger.warning(f"Backfill: no Sync events of pair {address} since block {from_block}")
+            return [latest]
+
+        blocks = sorted({log["blockNumber"] for log in logs})
+        timestamps = await asyncio.gather(*[self._timestamp(block) for block in blocks])
+        block_timestamps = dict(zip(blocks, timestamps))
+
+        reserves = [decode_abi(["uint112", "uint112"], bytes(Web3.toBytes(hexstr=log["data"]))) for log in logs]
+        if reserves[-1] != (pair.reserve0, pair.reserve1) or (
+            block_timestamps[logs[-1]["blockNumber"]] != pair.block_timestamp_last
+        ):
+            raise ValueError(f"Sync events of pair {address} do not match its state at block {to_block}")
+
+        # Walk back from the latest update, undoing what each reserve period accumulated
+        observations = [latest]
+        price0, price1 = pair.price0_cumulative_last, pair.price1_cumulative_last
+        after = pair.block_timestamp_last
+        for log, (reserve0, reserve1) in zip(reversed(logs[:-1]), reversed(reserves[:-1])):
+            timestamp = block_timestamps[log["blockNumber"]]
+            elapsed = after - timestamp
+            if elapsed > 0 and reserve0 and reserve1:
+                price0 = (price0 - uq112_price(reserve1, reserve0) * elapsed) % 2**256
+                price1 = (price1 - uq112_price(reserve0, reserve1) * elapsed) % 2**256
+                observations.append(Observation(timestamp, price0, price1))
+            after = timestamp
+
+        observations.reverse()
+        logger.info(
+            f"Backfill: rebuilt {len(observations)} observations of pair {address} "
+            f"from {len(logs)} Sync events in blocks {from_block}-{to_block}"
+        )
+        return observations
+
+    async def get_logs(self, address: str, from_block: int, to_block: int) -> List[LogReceipt]:
+        """`Sync` logs of a pair, fetched in chunks that are split when the node refuses them"""
+        w3 = get_web3_pool().web3(self.url, self.timeout)
+        logs: List[LogReceipt] = []
+        chunk = self.chunk_size
+        start = from_block
+        while start <= to_block:
+            end = min(start + chunk - 1, to_block)
+            params = {"address": address, "topics": [SYNC_TOPIC], "fromBlock": start, "toBlock": end}
+            try:
+                logs.extend(await get_web3_pool().run(self.url, w3.eth.get_logs, params))
+            except ValueError as e:
+                if end == start:
+                    raise
+                chunk = max((end - start + 1) // 2, 1)
+                logger.debug(f"Backfill: getLogs {start}-{end} refused ({e}), retrying {chunk} blocks at a time")
+                continue
+            start = end + 1
+            chunk = min(chunk * 2, self.chunk_size)
+
+        return sorted(logs, key=lambda log: (log["blockNumber"], log["logIndex"]))
+
+    async def _estimate_block_time(self, block_number: int) -> float:
+        earlier = max(block_number - BLOCK_TIME_SAMPLE, 0)
+        if earlier == block_number:
+            return 1.0
+        elapsed = await self._timestamp(block_number) - await self._timestamp(earlier)
+        return max(elapsed / (block_number - earlier), 1e-3)
+
+    async def _timestamp(self, block_number: int) -> int:
+        timestamp = self._timestamps.get(block_number)
+        if timestamp is None:
+            w3 = get_web3_pool().web3(self.url, self.timeout)
+            block = await get_web3_pool().run(self.url, w3.eth.get_block, block_number)
+            timestamp = self._timestamps[block_number] = block["timestamp"]
+        return timestamp
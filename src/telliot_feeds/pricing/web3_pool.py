@@ -0,0 +1,180 @@
+"""Process-wide pool of Web3 providers and contract instances."""
+import asyncio
+import functools
+import json
+import os
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+from typing import TypeVar
+
+import requests
+from requests.adapters import HTTPAdapter
+from web3 import Web3
+from web3.contract import Contract
+from web3.middleware import construct_simple_cache_middleware
+
+# Static RPC answers cached per client (web3 validates the chain id before every call)
+CACHED_RPC_METHODS = {"eth_chainId", "net_version"}
+
+T = TypeVar("T")
+
+
+class Web3Pool:
+    """Web3 clients and contracts shared by on-chain price sources
+
+    Each RPC URL gets one `requests.Session`, so calls reuse keep-alive
+    connections instead of paying for TCP/TLS setup, and contract objects
+    are built (and their ABI parsed) once per RPC URL, address and ABI.
+    The chain id is fetched once per client instead of before every call.
+
+    Blocking web3 calls are run with `run` in a bounded thread pool, at
+    most `max_concurrency` at a time per endpoint, so async price sources
+    gathered together wait for their RPC calls concurrently.
+    """
+
+    def __init__(self, max_concurrency: Optional[int] = None, max_workers: Optional[int] = None):
+        self.max_concurrency = max_concurrency or int(os.getenv("RPC_MAX_CONCURRENCY", 8))
+        self.max_workers = max_workers or int(os.getenv("RPC_MAX_WORKERS", 32))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._sessions: Dict[str, requests.Session] = {}
+        self._clients: Dict[Tuple[str, float], Web3] = {}
+        self._contracts: Dict[Tuple[str, float, str, str], Contract] = {}
+        self._lock = threading.Lock()
+        self.contract_hits = 0
+        self.contract_misses = 0
+
+    def session(self, url: str) -> requests.Session:
+        """Keep-alive session of an RPC URL"""
+        with self._lock:
+            session = self._sessions.get(url)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.max_concurrency)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[url] = session
+            return session
+
+    def web3(self, url: str, timeout: float = 10.0) -> Web3:
+        """Web3 client of an RPC URL"""
+        key = (url, timeout)
+        client = self._clients.get(key)
+        if client is None:
+            provider = Web3.HTTPProvider(url, request_kwargs={"timeout": timeout}, session=self.session(url))
+            client = Web3(provider)
+            # Innermost, so the chain id lookups of the validation middleware go through it
+            cache = construct_simple_cache_middleware(dict, CACHED_RPC_METHODS)  # type: ignore
+            client.middleware_onion.inject(cache, name="static_cache", layer=0)
+            with self._lock:
+                client = self._clients.setdefault(key, client)
+        return client
+
+    def contract(self, url: str, address: str, abi: Any, timeout: float = 10.0) -> Contract:
+        """Contract instance at `address` with the given ABI (JSON string or list)"""
+        abi_key = abi if isinstance(abi, str) else json.dumps(abi, sort_keys=True)
+        key = (url, timeout, address, abi_key)
+        contract = self._contracts.get(key)
+        if contract is not None:
+            self.contract_hits += 1
+            return contract
+
+        self.contract_misses += 1
+        contract = self.web3(url, timeout).eth.contract(address=address, abi=abi)
+        with self._lock:
+            return self._contracts.setdefault(key, contract)
+
+    async def run(self, endpoint: str, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Run a blocking call in the thread pool
+
+        Args:
+            endpoint: RPC URL (or other endpoint key) the call is limited by
+            fn: Blocking function, e.g. `contract.functions.getReserves().call`
+            args: Positional arguments of `fn`
+            kwargs: Keyword arguments of `fn`
+
+        Returns:
+            The result of `fn`
+        """
+        async with self._semaphore(endpoint):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), functools.partial(fn, *args, **kwargs))
+
+    def _semaphore(self, endpoint: str) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphores = self._semaphores.setdefault(loop, {})
+        semaphore = semaphores.get(endpoint)
+        if semaphore is None:
+            semaphore = semaphores[endpoint] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="web3")
+            return self._executor
+
+    def stats(self, url: Optional[str] = None) -> Dict[str, Any]:
+        """Connection reuse and contract cache statistics
+
+        Returns:
+            Contract cache counters and, per RPC URL, the number of requests
+            sent, connections opened and requests that reused a connection
+        """
+        with self._lock:
+            sessions = dict(self._sessions) if url is None else {url: self._sessions[url]}
+
+        endpoints = {}
+        for endpoint, session in sessions.items():
+            requests_sent = connections = 0
+            for adapter in set(session.adapters.values()):
+                pools = adapter.poolmanager.pools
+                for pool_key in pools.keys():
+                    pool = pools[pool_key]
+                    if pool is not None:
+                        requests_sent += pool.num_requests
+                        connections += pool.num_connections
+            endpoints[endpoint] = {
+                "requests": requests_sent,
+                "connections": connections,
+                "reused": max(requests_sent - connections, 0),
+            }
+
+        return {
+            "endpoints": endpoints,
+            "contracts": len(self._contracts),
+            "contract_hits": self.contract_hits,
+            "contract_misses": self.contract_misses,
+        }
+
+    def clear(self) -> None:
+        """Close all sessions, drop cached clients and contracts and stop the thread pool"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._clients.clear()
+            self._contracts.clear()
+            self.contract_hits = self.contract_misses = 0
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+
+
+_default_pool: Optional[Web3Pool] = None
+
+
+def get_web3_pool() -> Web3Pool:
+    """Return the process-wide pool shared by all on-chain price sources"""
+    global _default_pool
+    if _default_pool is None:
+        _default_pool = Web3Pool()
+    return _default_pool
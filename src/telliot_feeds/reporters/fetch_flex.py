@@ -19,6 +19,7 @@ from telliot_core.utils.response import ResponseStatus
 from telliot_feeds.datafeed import DataFeed
 from telliot_feeds.feeds import CATALOG_FEEDS
 from telliot_feeds.feeds.fetch_usd_feed import fetch_usd_median_feed
+from telliot_feeds.pricing.price_cache import get_price_cache
 from telliot_feeds.reporters.interval import IntervalReporter
 from telliot_feeds.reporters.reporter_autopay_utils import autopay_suggested_report
 from telliot_feeds.reporters.reporter_autopay_utils import CATALOG_QUERY_IDS
@@ -298,12 +299,12 @@ class FetchFlexReporter(IntervalReporter):
             return status
 
         tip = self.autopaytip
-        # Fetch token prices in USD
+        # Fetch token prices in USD, or reuse those fetched recently
         native_token_feed = get_native_token_feed(self.chain_id)
-        price_feeds = [native_token_feed, fetch_usd_median_feed]
-        _ = await asyncio.gather(*[feed.source.fetch_new_datapoint() for feed in price_feeds])
-        price_native_token = native_token_feed.source.latest[0]
-        price_fetch_usd = fetch_usd_median_feed.source.latest[0]
+        price_cache = get_price_cache()
+        price_native_token, price_fetch_usd = await asyncio.gather(
+            price_cache.price(native_token_feed), price_cache.price(fetch_usd_median_feed)
+        )
 
         if price_native_token is None or price_fetch_usd is None:
             return error_status("Unable to fetch token price", log=logger.warning)
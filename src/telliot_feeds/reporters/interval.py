@@ -23,6 +23,7 @@ from telliot_feeds.datafeed import DataFeed
 from telliot_feeds.feeds import CATALOG_FEEDS
 from telliot_feeds.feeds.eth_usd_feed import eth_usd_median_feed
 from telliot_feeds.feeds.fetch_usd_feed import fetch_usd_median_feed
+from telliot_feeds.pricing.price_cache import get_price_cache
 from telliot_feeds.utils.log import get_logger
 from telliot_feeds.utils.reporter_utils import has_native_token_funds
 from telliot_feeds.utils.reporter_utils import is_online
@@ -204,12 +205,11 @@ class IntervalReporter:
             status.e = read_status.e
             return status
 
-        # Fetch token prices
-        price_feeds = [self.eth_usd_median_feed, self.fetch_usd_median_feed]
-        _ = await asyncio.gather(*[feed.source.fetch_new_datapoint() for feed in price_feeds])
-
-        price_eth_usd = self.eth_usd_median_feed.source.latest[0]
-        price_fetch_usd = self.fetch_usd_median_feed.source.latest[0]
+        # Fetch token prices, or reuse those fetched recently
+        price_cache = get_price_cache()
+        price_eth_usd, price_fetch_usd = await asyncio.gather(
+            price_cache.price(self.eth_usd_median_feed), price_cache.price(self.fetch_usd_median_feed)
+        )
 
         if price_eth_usd is None:
             note = "Unable to fetch ETH/USD price for profit calculation"
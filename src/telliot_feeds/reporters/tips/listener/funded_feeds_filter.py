@@ -9,6 +9,7 @@ from web3 import Web3 as w3
 from telliot_feeds.feeds import CATALOG_FEEDS
 from telliot_feeds.reporters.tips import CATALOG_QUERY_IDS
 from telliot_feeds.reporters.tips.listener.dtypes import QueryIdandFeedDetails
+from telliot_feeds.utils.decode import decode_uint256_floats
 from telliot_feeds.utils.log import get_logger
 
 logger = get_logger(__name__)
@@ -121,14 +122,16 @@ class FundedFeedFilter:
             # in case a query id has has none or too few to compare
             if len(feed.queryid_timestamps_values_list) < 2:
                 continue
-            for current, previous in zip(
-                feed.queryid_timestamps_values_list[::-1], feed.queryid_timestamps_values_list[-2::-1]
-            ):
+            entries = list(feed.queryid_timestamps_values_list)
+            # decode all the values of the feed at once, NaN where a value isn't a uint256
+            values = decode_uint256_floats([entry.value for entry in entries]) if feed.params.priceThreshold else None
+            for i in range(len(entries) - 1, 0, -1):
+                current, previous = entries[i], entries[i - 1]
                 # if current timestamp is before feed start then no need to check
                 if feed.params.startTime > current.timestamp:
                     feed.queryid_timestamps_values_list.remove(current)
                     continue
-                in_eligibile_window = self.is_timestamp_first_in_window(
+                in_eligibile_window, _ = self.is_timestamp_first_in_window(
                     timestamp_before=previous.timestamp,
                     timestamp_to_check=current.timestamp,
                     feed_start_timestamp=feed.params.startTime,
@@ -136,16 +139,15 @@ class FundedFeedFilter:
                     feed_interval=feed.params.interval,
                 )
                 if not in_eligibile_window:
-                    if feed.params.priceThreshold == 0:
+                    if values is None:
                         feed.queryid_timestamps_values_list.remove(current)
                     else:
-                        try:
-                            previous_value = int(int(previous.value.hex(), 16) / 1e18)
-                        except ValueError:
+                        previous_value, current_value = values[i - 1], values[i]
+                        if math.isnan(previous_value) or math.isnan(current_value):
                             _ = error_status("Error decoding current query id value")
                             continue
 
-                        price_change = _get_price_change(previous_val=previous_value, current_val=current.value)
+                        price_change = _get_price_change(previous_val=previous_value, current_val=current_value)
 
                         if price_change < feed.params.priceThreshold:
                             feed.queryid_timestamps_values_list.remove(current)
@@ -9,6 +9,7 @@ from web3 import Web3
 from telliot_feeds.datasource import DataSource
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.web3_pool import get_web3_pool
 from telliot_feeds.utils.log import get_logger
 
 
@@ -79,14 +80,17 @@ class EVMCallSource(DataSource[Any]):
         Returns:
             Current time-stamped value
         """
+        # Blocking RPC calls run in the shared thread pool, limited per chain
+        pool = get_web3_pool()
+        endpoint = f"chain_id={self.chainId}"
         try:
-            self.update_web3()
+            await pool.run(endpoint, self.update_web3)
         except Exception as e:
             logger.warning(f"Error occurred while updating web3 instance: {e}")
             return None, None
 
         try:
-            val = self.get_response()
+            val = await pool.run(endpoint, self.get_response)
         except Exception as e:
             logger.warning(f"Error occurred while getting response: {e}")
             return None, None
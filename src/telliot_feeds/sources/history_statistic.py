@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from typing import Literal
+from typing import Optional
+
+from telliot_feeds.datasource import DataSource
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.history_stats import EMA
+from telliot_feeds.pricing.history_stats import returns_stdev
+from telliot_feeds.pricing.history_stats import time_weighted_average
+from telliot_feeds.pricing.history_stats import volume_weighted_average
+from telliot_feeds.utils.log import get_logger
+
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class HistoryStatisticSource(DataSource[float]):
+    """Statistic of the datapoints stored by another source
+
+    Derives a TWAP, VWAP, volatility or EMA feed from prices the reporter
+    already fetched, without any upstream call. The wrapped source is
+    refreshed by the feeds it belongs to, or here if `refresh` is set.
+    Its `max_datapoints` must cover the window. The VWAP weighs prices
+    with the weights stored along them (e.g. the liquidity returned by
+    LP price services), and ignores prices stored without one.
+    """
+
+    #: Source whose history is summarized
+    source: DataSource[float] = field(default_factory=DataSource)  # type: ignore
+
+    #: Time-weighted or volume-weighted average, standard deviation of
+    #: returns or exponential moving average
+    statistic: Literal["twap", "vwap", "volatility", "ema"] = "twap"
+
+    #: Seconds of history used (the half-life of the EMA)
+    window: float = 3600.0
+
+    #: Fetch a new datapoint from the source first
+    refresh: bool = False
+
+    #: Private EMA state, updated with the datapoints stored since the last call
+    _ema: Optional[EMA] = field(default=None, init=False, repr=False)
+
+    async def fetch_new_datapoint(self) -> OptionalDataPoint[float]:
+        """Compute the statistic over the source's history
+
+        Returns:
+            Current time-stamped value, or (None, None) without enough history
+        """
+        if self.refresh:
+            await self.source.fetch_new_datapoint()
+
+        now = datetime_now_utc()
+        start = now - timedelta(seconds=self.window)
+        if self.statistic == "twap":
+            value = time_weighted_average(self.source.get_history_arrays(), start=start, end=now)
+        elif self.statistic == "vwap":
+            value = volume_weighted_average(self.source.get_history_arrays(start=start))
+        elif self.statistic == "volatility":
+            value = returns_stdev(self.source.get_history_arrays(start=start).values)
+        else:
+            if self._ema is None:
+                self._ema = EMA(self.window)
+            value = self._ema.update_from(self.source.get_history_arrays())
+
+        if value is None:
+            logger.warning(f"Not enough history to compute the {self.statistic} of {self.source}")
+            return None, None
+
+        datapoint = (value, now)
+        self.store_datapoint(datapoint)
+        return datapoint
@@ -38,7 +38,7 @@ class CoingeckoDailyHistoricalPriceService(CoinGeckoSpotPriceService):
         url_params = urlencode({"vs_currency": currency, "days": self.days, "interval": "daily"})
         request_url = f"/api/v3/coins/{coin_id}/market_chart?{url_params}"
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
 
         if "error" in d:
             if "api.coingecko.com used Cloudflare to restrict access" in str(d["exception"]):
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
@@ -36,11 +37,12 @@ class CryptowatchHistoricalPriceService(WebPriceService):
         self.ts = ts
         self.timeout = timeout
 
-    def get_url(self, url: str = "") -> dict[str, Any]:
+    async def get_url(self, url: str = "", headers: Optional[dict[str, str]] = None) -> dict[str, Any]:
         """Helper function to get URL JSON response while handling exceptions
 
         Args:
             url: URL to fetch
+            headers: Optional request headers
 
         Returns:
             A dictionary with the following (optional) keys:
@@ -50,10 +52,12 @@ class CryptowatchHistoricalPriceService(WebPriceService):
         """
 
         request_url = self.url + url
+        return await asyncio.to_thread(self._get_url, request_url, headers)
 
+    def _get_url(self, request_url: str, headers: Optional[dict[str, str]]) -> dict[str, Any]:
         with requests.Session() as s:
             try:
-                r = s.get(request_url, timeout=self.timeout)
+                r = s.get(request_url, timeout=self.timeout, headers=headers)
                 json_data = r.json()
                 return {"response": json_data}
 
@@ -100,7 +104,7 @@ class CryptowatchHistoricalPriceService(WebPriceService):
 
         request_url = f"markets/coinbase-pro/{pair}/ohlc?{url_params}"
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
         candles = None
 
         if "error" in d:
@@ -1,3 +1,4 @@
+import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
@@ -39,11 +40,12 @@ class KrakenHistoricalPriceService(WebPriceService):
         self.ts = ts
         self.timeout = timeout
 
-    def get_url(self, url: str = "") -> dict[str, Any]:
+    async def get_url(self, url: str = "", headers: Optional[dict[str, str]] = None) -> dict[str, Any]:
         """Helper function to get URL JSON response while handling exceptions
 
         Args:
             url: URL to fetch
+            headers: Optional request headers
 
         Returns:
             A dictionary with the following (optional) keys:
@@ -53,10 +55,12 @@ class KrakenHistoricalPriceService(WebPriceService):
         """
 
         request_url = self.url + url
+        return await asyncio.to_thread(self._get_url, request_url, headers)
 
+    def _get_url(self, request_url: str, headers: Optional[dict[str, str]]) -> dict[str, Any]:
         with requests.Session() as s:
             try:
-                r = s.get(request_url, timeout=self.timeout)
+                r = s.get(request_url, timeout=self.timeout, headers=headers)
                 json_data = r.json()
                 return {"response": json_data}
 
@@ -163,7 +167,7 @@ class KrakenHistoricalPriceService(WebPriceService):
 
         req_url = self.get_request_url(asset, currency, period_start)
 
-        d = self.get_url(req_url)
+        d = await self.get_url(req_url)
 
         if "error" in d:
             logger.error(d)
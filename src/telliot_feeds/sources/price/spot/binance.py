@@ -1,12 +1,15 @@
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import List
+from typing import Tuple
 from urllib.parse import urlencode
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.price_stream import StreamingPriceService
 from telliot_feeds.utils.log import get_logger
 
 
@@ -33,7 +36,7 @@ class BinanceSpotPriceService(WebPriceService):
 
         request_url = f"/api/v1/klines?{url_params}"
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
 
         if "error" in d:
             logger.error(d)
@@ -67,3 +70,30 @@ class BinanceSpotPriceSource(PriceSource):
     asset: str = ""
     currency: str = ""
     service: BinanceSpotPriceService = field(default_factory=BinanceSpotPriceService, init=False)
+
+
+class BinanceStreamingPriceService(StreamingPriceService, BinanceSpotPriceService):
+    """Binance trade stream, falling back to the REST API"""
+
+    ws_url = "wss://stream.binance.com:9443/ws"
+
+    def market(self, asset: str, currency: str) -> str:
+        return f"{asset}{currency}".upper()
+
+    def subscribe_messages(self, markets: List[str]) -> List[Any]:
+        return [{"method": "SUBSCRIBE", "params": [f"{m.lower()}@trade" for m in markets], "id": 1}]
+
+    def parse_message(self, message: Any) -> List[Tuple[str, float]]:
+        # {"e": "trade", "E": 123456789, "s": "ETHUSDT", "t": 12345, "p": "1800.01", ...}
+        if isinstance(message, dict) and message.get("e") == "trade":
+            return [(message["s"], float(message["p"]))]
+        return []
+
+
+@dataclass
+class BinanceStreamingPriceSource(PriceSource):
+    asset: str = ""
+    currency: str = ""
+    service: BinanceStreamingPriceService = field(
+        default_factory=BinanceStreamingPriceService.shared, init=False  # type: ignore
+    )
@@ -44,7 +44,7 @@ class BittrexSpotPriceService(WebPriceService):
 
         request_url = "/api/v1.1/public/getticker?market={}-{}".format(currency.lower(), asset.lower())
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
 
         if "error" in d:
 
@@ -1,11 +1,14 @@
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import List
+from typing import Tuple
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.price_stream import StreamingPriceService
 from telliot_feeds.utils.log import get_logger
 
 
@@ -36,7 +39,7 @@ class CoinbaseSpotPriceService(WebPriceService):
 
         request_url = "/products/{}-{}/ticker".format(asset.lower(), currency.lower())
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
         if "error" in d:
             logger.error(d)
             return None, None
@@ -60,3 +63,32 @@ class CoinbaseSpotPriceSource(PriceSource):
     asset: str = ""
     currency: str = ""
     service: CoinbaseSpotPriceService = field(default_factory=CoinbaseSpotPriceService, init=False)
+
+
+class CoinbaseStreamingPriceService(StreamingPriceService, CoinbaseSpotPriceService):
+    """Coinbase ticker stream, falling back to the REST API"""
+
+    ws_url = "wss://ws-feed.exchange.coinbase.com"
+
+    def market(self, asset: str, currency: str) -> str:
+        return f"{asset}-{currency}".upper()
+
+    def subscribe_messages(self, markets: List[str]) -> List[Any]:
+        return [{"type": "subscribe", "product_ids": markets, "channels": ["ticker"]}]
+
+    def parse_message(self, message: Any) -> List[Tuple[str, float]]:
+        # {"type": "ticker", "product_id": "ETH-USD", "price": "1800.01", "best_bid": ..., ...}
+        if message.get("type") == "ticker":
+            return [(message["product_id"], float(message["price"]))]
+        if message.get("type") == "error":
+            logger.error(f"API ERROR ({self.name}): {message.get('message')}")
+        return []
+
+
+@dataclass
+class CoinbaseStreamingPriceSource(PriceSource):
+    asset: str = ""
+    currency: str = ""
+    service: CoinbaseStreamingPriceService = field(
+        default_factory=CoinbaseStreamingPriceService.shared, init=False  # type: ignore
+    )
@@ -1,8 +1,11 @@
+import asyncio
 import os
-
+import weakref
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import Dict
+from typing import Set
 from urllib.parse import urlencode
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
@@ -55,14 +58,89 @@ coingecko_coin_id = {
 }
 
 
+# Maximum number of coin ids resolved by a single batched request
+MAX_BATCH_IDS = 100
+
+
+@dataclass
+class CoinGeckoPriceBatch:
+    """Pending `/simple/price` lookups resolved by a single request"""
+
+    future: "asyncio.Future[Dict[str, Any]]"
+    ids: Set[str] = field(default_factory=set)
+    currencies: Set[str] = field(default_factory=set)
+
+
+# Batch currently collecting lookups, per event loop
+_pending_batches: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, CoinGeckoPriceBatch]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
 class CoinGeckoSpotPriceService(WebPriceService):
-    """CoinGecko Price Service"""
+    """CoinGecko Price Service
+
+    Lookups made within `batch_window` seconds of each other, by any
+    instance, are merged into one `ids=a,b&vs_currencies=x,y` request.
+    Set `COINGECKO_BATCH_WINDOW=0` to request each asset separately.
+    """
 
     def __init__(self, **kwargs: Any) -> None:
         kwargs["name"] = "CoinGecko Price Service"
         kwargs["url"] = os.getenv("COINGECKO_MOCK_URL", "https://api.coingecko.com/api/v3")
+        # Public API prices refresh about once a minute and requests are rate limited
+        kwargs.setdefault("cache_ttl", 30.0)
+        self.batch_window = float(kwargs.pop("batch_window", os.getenv("COINGECKO_BATCH_WINDOW", 0.05)))
         super().__init__(**kwargs)
 
+    @staticmethod
+    def _simple_price_url(ids: Set[str], currencies: Set[str]) -> str:
+        url_params = urlencode({"ids": ",".join(sorted(ids)), "vs_currencies": ",".join(sorted(currencies))})
+        return "/simple/price?{}".format(url_params)
+
+    async def get_simple_price(self, coin_id: str, currency: str) -> Dict[str, Any]:
+        """Fetch `/simple/price`, joining the pending batch if there is one
+
+        Returns:
+            The `get_url` result of the (possibly shared) request
+        """
+        if self.batch_window <= 0:
+            return await self.get_url(self._simple_price_url({coin_id}, {currency}))
+
+        loop = asyncio.get_running_loop()
+        batch = _pending_batches.get(loop)
+        if batch is not None and (coin_id in batch.ids or len(batch.ids) < MAX_BATCH_IDS):
+            batch.ids.add(coin_id)
+            batch.currencies.add(currency)
+            try:
+                return await asyncio.shield(batch.future)
+            except asyncio.CancelledError:
+                if not batch.future.cancelled():
+                    raise
+            # The batch leader was cancelled, retry in a new batch
+            return await self.get_simple_price(coin_id, currency)
+
+        # Lead a new batch: collect lookups for one window, then fetch for everyone
+        batch = CoinGeckoPriceBatch(future=loop.create_future(), ids={coin_id}, currencies={currency})
+        _pending_batches[loop] = batch
+        try:
+            try:
+                await asyncio.sleep(self.batch_window)
+            finally:
+                if _pending_batches.get(loop) is batch:
+                    del _pending_batches[loop]
+            d = await self.get_url(self._simple_price_url(batch.ids, batch.currencies))
+        except Exception as e:
+            batch.future.set_exception(e)
+            batch.future.exception()
+            raise
+        except BaseException:
+            batch.future.cancel()
+            raise
+
+        batch.future.set_result(d)
+        return d
+
     async def get_price(self, asset: str, currency: str) -> OptionalDataPoint[float]:
         """Implement PriceServiceInterface
 
@@ -79,10 +157,7 @@ class CoinGeckoSpotPriceService(WebPriceService):
         if not coin_id:
             raise Exception("Asset not supported: {}".format(asset))
 
-        url_params = urlencode({"ids": coin_id, "vs_currencies": currency})
-        request_url = "/simple/price?{}".format(url_params)
-
-        d = self.get_url(request_url)
+        d = await self.get_simple_price(coin_id, currency)
 
         if "error" in d:
             if "api.coingecko.com used Cloudflare to restrict access" in str(d["exception"]):
@@ -103,7 +178,7 @@ class CoinGeckoSpotPriceService(WebPriceService):
                     f"""
 
                     Please either check the COINGECKO_MOCK_URL in the .env file or Coingecko service can be unavailable.
-                    Request URL: {self.url}{request_url}
+                    Request URL: {self.url}{self._simple_price_url({coin_id}, {currency})}
                     API response: {response}
                     """
                 )
@@ -2,11 +2,14 @@ from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
 from typing import Dict
+from typing import List
+from typing import Tuple
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.price_stream import StreamingPriceService
 from telliot_feeds.utils.log import get_logger
 
 
@@ -48,7 +51,7 @@ class GeminiSpotPriceService(WebPriceService):
 
         request_url = "/v1/pubticker/{}{}".format(asset.lower(), currency.lower())
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
         if d is None:
             logger.warning("No data returned from Gemini")
             return None, None
@@ -79,3 +82,34 @@ class GeminiSpotPriceSource(PriceSource):
     asset: str = ""
     currency: str = ""
     service: GeminiSpotPriceService = field(default_factory=GeminiSpotPriceService, init=False)
+
+
+class GeminiStreamingPriceService(StreamingPriceService, GeminiSpotPriceService):
+    """Gemini market data stream, falling back to the REST API"""
+
+    ws_url = "wss://api.gemini.com/v2/marketdata"
+
+    def market(self, asset: str, currency: str) -> str:
+        return f"{asset}{currency}".upper()
+
+    def subscribe_messages(self, markets: List[str]) -> List[Any]:
+        return [{"type": "subscribe", "subscriptions": [{"name": "l2", "symbols": markets}]}]
+
+    def parse_message(self, message: Any) -> List[Tuple[str, float]]:
+        # {"type": "trade", "symbol": "ETHUSD", "price": "1800.01", "timestamp": 1631636700000, ...}
+        # The initial l2_updates snapshot carries the recent "trades"
+        if message.get("type") == "trade":
+            return [(message["symbol"], float(message["price"]))]
+        if message.get("type") == "l2_updates" and message.get("trades"):
+            last = max(message["trades"], key=lambda trade: trade["timestamp"])
+            return [(message["symbol"], float(last["price"]))]
+        return []
+
+
+@dataclass
+class GeminiStreamingPriceSource(PriceSource):
+    asset: str = ""
+    currency: str = ""
+    service: GeminiStreamingPriceService = field(
+        default_factory=GeminiStreamingPriceService.shared, init=False  # type: ignore
+    )
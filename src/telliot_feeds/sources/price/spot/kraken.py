@@ -1,12 +1,15 @@
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import List
+from typing import Tuple
 from urllib.parse import urlencode
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.price_stream import StreamingPriceService
 from telliot_feeds.utils.log import get_logger
 
 
@@ -44,7 +47,7 @@ class KrakenSpotPriceService(WebPriceService):
 
         request_url = f"/0/public/Ticker?{url_params}"
 
-        d = self.get_url(request_url)
+        d = await self.get_url(request_url)
 
         if "error" in d:
             logger.error(d)
@@ -75,3 +78,32 @@ class KrakenSpotPriceSource(PriceSource):
     asset: str = ""
     currency: str = ""
     service: KrakenSpotPriceService = field(default_factory=KrakenSpotPriceService, init=False)
+
+
+class KrakenStreamingPriceService(StreamingPriceService, KrakenSpotPriceService):
+    """Kraken ticker stream, falling back to the REST API"""
+
+    ws_url = "wss://ws.kraken.com"
+
+    def market(self, asset: str, currency: str) -> str:
+        return f"{asset}/{currency}".upper()
+
+    def subscribe_messages(self, markets: List[str]) -> List[Any]:
+        return [{"event": "subscribe", "pair": markets, "subscription": {"name": "ticker"}}]
+
+    def parse_message(self, message: Any) -> List[Tuple[str, float]]:
+        # [channelID, {"a": [...], "b": [...], "c": ["1800.01", "0.5"], ...}, "ticker", "ETH/USD"]
+        if isinstance(message, list) and len(message) >= 4 and message[-2] == "ticker":
+            return [(message[-1], float(message[1]["c"][0]))]
+        if isinstance(message, dict) and message.get("status") == "error":
+            logger.error(f"API ERROR ({self.name}): {message.get('errorMessage')}")
+        return []
+
+
+@dataclass
+class KrakenStreamingPriceSource(PriceSource):
+    asset: str = ""
+    currency: str = ""
+    service: KrakenStreamingPriceService = field(
+        default_factory=KrakenStreamingPriceService.shared, init=False  # type: ignore
+    )
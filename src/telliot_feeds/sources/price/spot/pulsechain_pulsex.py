@@ -8,6 +8,7 @@ from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.pair_graph import get_pair_graph
 from telliot_feeds.utils.log import get_logger
 
 from web3 import Web3
@@ -36,23 +37,6 @@ if os.getenv("PLS_LPS_ORDER") and os.getenv("PLS_CURRENCY_SOURCES"):
 logger = get_logger(__name__)
 
 
-def get_amount_out(amount_in, reserve_in, reserve_out):
-    """
-    Given an input asset amount, returns the maximum output amount of the
-    other asset (accounting for fees) given reserves.
-
-    :param amount_in: Amount of input asset.
-    :param reserve_in: Reserve of input asset in the pair contract.
-    :param reserve_out: Reserve of input asset in the pair contract.
-    :return: Maximum amount of output asset.
-    """
-    assert amount_in > 0
-    assert reserve_in > 0 and reserve_out > 0
-    amount_in_with_fee = amount_in*997
-    numerator = amount_in_with_fee*reserve_out
-    denominator = reserve_in*1000 + amount_in_with_fee
-    return int(numerator/denominator)
-
 class PulsechainPulseXService(WebPriceService):
     """Pulsechain PulseX Price Service for PLS/USD feed"""
 
@@ -82,34 +66,18 @@ class PulsechainPulseXService(WebPriceService):
             logger.error(f"Asset not supported: {asset}")
             return None, None
 
-        getReservesAbi = '[{"inputs":[],"name":"getReserves","outputs":[{"internalType":"uint112","name":"reserve0","type":"uint112"},{"internalType":"uint112","name":"reserve1","type":"uint112"},{"internalType":"uint32","name":"blockTimestampLast","type":"uint32"}],"stateMutability":"view","type":"function"}]'
-        w3 = Web3(Web3.HTTPProvider(self.url, request_kwargs={'timeout': self.timeout}))
         try:
-            contract = w3.eth.contract(address=contract_addr, abi=getReservesAbi)
-            [reserve0, reserve1, timestamp] = contract.functions.getReserves().call()
-            token0, _ = pls_lps_order[currency].split('/')
-            if "pls" not in token0.strip():
-                reserve0, reserve1 = reserve1, reserve0
-
-            val = get_amount_out(1e18, reserve0, reserve1)
-
-            vl0 = ((1e18 * reserve1) / (reserve0 + 1e18)) * reserve0 #value locked token0 without fees
-            vl1 = ((1e18 * reserve0) / (reserve1 + 1e18)) * reserve1 #value locked token0 without fees
-            tvl = vl0 + vl1 #total value locked of the pool
-
+            # All LP sources price from one reserve snapshot of the pair graph
+            snapshot = await get_pair_graph(self.url, addrs.values()).snapshot()
+            tokens = snapshot.graph.label_tokens(contract_addr, pls_lps_order[currency])
+            wpls = next(address for name, address in tokens.items() if "pls" in name)
+            stable = next(address for address in tokens.values() if address != wpls)
+            quote = snapshot.quote([wpls, stable])
         except Exception as e:
             logger.warning(f"No prices retrieved from Pulsechain Sec Oracle with Exception {e}")
             return None, None
 
-        try:
-            price = float(val / 1e18)
-            if currency == 'usdc' or currency == 'usdt':
-                price = price * 1e12 #scale usdc 
-            return price, timestamp, float(tvl)
-        except Exception as e:
-            msg = f"Error parsing Pulsechain Sec Oracle response: KeyError: {e}"
-            logger.critical(msg)
-            return None, None
+        return quote.price, quote.timestamp, quote.liquidity
 
 @dataclass
 class PulsechainPulseXSource(PriceSource):
@@ -3,12 +3,11 @@ from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
 
-import requests
-
 from dotenv import load_dotenv
 
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.graphql_batch import get_graphql_batcher
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
 from telliot_feeds.utils.log import get_logger
@@ -48,51 +47,22 @@ class PulsechainSupgraphService(WebPriceService):
             logger.error(f"Asset not supported: {asset}")
             return None, None
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        query = "{ pls:tokenDataDAIs(orderBy: timestamp, orderDirection: desc, first: 1) { PLS2DAI } }"
-
-        json_data = {
-            "query": query,
-            "variables": None,
-            "operationName": None,
-        }
-
-        request_url = self.url + "/subgraphs/name/liquidloans/liquidloans"
-
-        with requests.Session() as s:
-            try:
-                r = s.post(request_url, headers=headers, json=json_data, timeout=self.timeout)
-                res = r.json()
-                data = {"response": res}
-
-            except requests.exceptions.ConnectTimeout:
-                logger.warning("Timeout Error, No prices retrieved from Pulsechain Supgraph")
-                return None, None
-
-            except Exception as e:
-                logger.warning(f"No prices retrieved from Pulsechain Supgraph with Exception {e}")
-                return None, None
+        batcher = get_graphql_batcher(self.url + "/subgraphs/name/liquidloans/liquidloans")
+        data = await batcher.query("tokenDataDAIs(orderBy: timestamp, orderDirection: desc, first: 1) { PLS2DAI }")
 
         if "error" in data:
-            logger.error(data)
+            if data["error"] == "Timeout Error":
+                logger.warning("Timeout Error, No prices retrieved from Pulsechain Supgraph")
+            else:
+                logger.warning(f"No prices retrieved from Pulsechain Supgraph with Exception {data['exception']}")
             return None, None
 
-        elif "response" in data:
-            response = data["response"]
-
-            try:
-                price = float(response["data"][asset][0]["PLS2DAI"])
-                return price, datetime_now_utc()
-            except KeyError as e:
-                msg = f"Error parsing Pulsechain Supgraph response: KeyError: {e}"
-                logger.critical(msg)
-                return None, None
-
-        else:
-            logger.error("Invalid response from get_url")
+        try:
+            price = float(data["value"][0]["PLS2DAI"])
+            return price, datetime_now_utc()
+        except (KeyError, IndexError) as e:
+            msg = f"Error parsing Pulsechain Supgraph response: {type(e).__name__}: {e}"
+            logger.critical(msg)
             return None, None
 
 
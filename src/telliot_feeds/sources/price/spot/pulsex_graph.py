@@ -0,0 +1,80 @@
+import os
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Dict
+from typing import List
+
+from dotenv import load_dotenv
+from web3 import Web3
+
+from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.pair_graph import get_pair_graph
+from telliot_feeds.pricing.price_service import WebPriceService
+from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.utils.log import get_logger
+
+
+load_dotenv()
+logger = get_logger(__name__)
+
+
+def parse_tokens(value: str) -> Dict[str, str]:
+    """Token addresses by lowercased symbol, from `"SYMBOL=0xADDRESS,..."`"""
+    tokens = {}
+    for entry in value.split(","):
+        if entry.strip():
+            symbol, address = entry.split("=")
+            tokens[symbol.strip().lower()] = Web3.toChecksumAddress(address.strip())
+    return tokens
+
+
+def parse_pairs(value: str) -> List[str]:
+    return [Web3.toChecksumAddress(address.strip()) for address in value.split(",") if address.strip()]
+
+
+# PulseX pairs priced through and the tokens that can be requested, e.g.
+# PULSEX_TOKENS="pls=0xA107...,plsx=0x95B3...,dai=0xefD7..."
+pairs = parse_pairs(os.getenv("PULSEX_PAIRS", ""))
+tokens = parse_tokens(os.getenv("PULSEX_TOKENS", ""))
+
+
+class PulseXGraphService(WebPriceService):
+    """Prices of any token connected by PulseX pairs, along the path with the most liquidity"""
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs["name"] = "PulseX Pair Graph Price Service"
+        kwargs["url"] = os.getenv("LP_PULSE_NETWORK_URL", "https://rpc.v4.testnet.pulsechain.com")
+        kwargs["timeout"] = 10.0
+        super().__init__(**kwargs)
+
+    async def get_price(self, asset: str, currency: str) -> OptionalDataPoint[float]:
+        """Implement PriceServiceInterface
+
+        Returns the price of `asset` in `currency` and, as the weight used by
+        aggregations, the value locked in the shallowest pair of its path.
+        """
+        asset = asset.lower()
+        currency = currency.lower()
+        if asset not in tokens or currency not in tokens:
+            logger.error(f"Token not configured in PULSEX_TOKENS: {asset if asset not in tokens else currency}")
+            return None, None
+
+        try:
+            snapshot = await get_pair_graph(self.url, pairs).snapshot()
+            quote = snapshot.price(tokens[asset], tokens[currency])
+        except Exception as e:
+            logger.warning(f"No prices retrieved from PulseX pairs with Exception {e}")
+            return None, None
+
+        if quote is None:
+            logger.error(f"No path between {asset} and {currency} in PULSEX_PAIRS")
+            return None, None
+        return quote.price, quote.timestamp, quote.liquidity
+
+
+@dataclass
+class PulseXGraphSource(PriceSource):
+    asset: str = ""
+    currency: str = ""
+    service: PulseXGraphService = field(default_factory=PulseXGraphService, init=False)
@@ -4,16 +4,16 @@ from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
 
-import requests
-
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.graphql_batch import get_graphql_batcher
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
 from telliot_feeds.utils.log import get_logger
 
 logger = get_logger(__name__)
 pulsex_subgraph_supporten_tokens = {
+    "pls": os.getenv("WPLS_ADDRESS", "0xa1077a294dde1b09bb078844df40758a5d0f9a27"),
     "dai": "0x826e4e896cc2f5b371cd7bb0bd929db3e3db67c0",
     "usdc": "0xa0b86991c6218b36c1d19d4a2e9eb0ce3606eb48",
     "plsx": "0x8a810ea8b121d08342e9e7696f4a9915cbe494b7",
@@ -49,58 +49,28 @@ class PulseXSupgraphService(WebPriceService):
             logger.error(f"Asset not supported: {asset}")
             return None, None
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        query = "{ token(id: \"" + token.lower() + "\") { derivedUSD } }"
-
-        json_data = {
-            "query": query,
-            "variables": None,
-            "operationName": None,
-        }
-
-        request_url = self.url + "/subgraphs/name/pulsechain/pulsex"
-
-        with requests.Session() as s:
-            try:
-                r = s.post(request_url, headers=headers, json=json_data, timeout=self.timeout)
-                res = r.json()
-                data = {"response": res}
-
-            except requests.exceptions.ConnectTimeout:
-                logger.warning("Timeout Error, No prices retrieved from PulseX Supgraph")
-                return None, None
-
-            except Exception as e:
-                logger.warning(f"No prices retrieved from PulseX Supgraph with Exception {e}")
-                return None, None
+        # Merged with the other token lookups of this subgraph into one query
+        batcher = get_graphql_batcher(self.url + "/subgraphs/name/pulsechain/pulsex")
+        data = await batcher.query("token(id: \"" + token.lower() + "\") { derivedUSD }")
 
         if "error" in data:
-            logger.error(data)
+            if data["error"] == "Timeout Error":
+                logger.warning("Timeout Error, No prices retrieved from PulseX Supgraph")
+            else:
+                logger.warning(f"No prices retrieved from PulseX Supgraph with Exception {data['exception']}")
             return None, None
 
-        elif "response" in data:
-            response = data["response"]
-
-            try:
-                if response["data"]["token"] == None:
-                    logger.error(f"No data found for the token {token}")
-                    logger.info(f"It is possible that no Liquidity Pool exists including this token ({token})")
-                    return None, None
-
-                price = float(response["data"]["token"]["derivedUSD"])
-                return price, datetime_now_utc()
-            except KeyError as e:
-                msg = f"Error parsing Pulsechain Supgraph response: KeyError: {e}"
-                if response["data"]["token"] == None:
-                    msg = f"Invalid token address: {token}"
-                logger.critical(msg)
+        try:
+            if data["value"] is None:
+                logger.error(f"No data found for the token {token}")
+                logger.info(f"It is possible that no Liquidity Pool exists including this token ({token})")
                 return None, None
 
-        else:
-            logger.error("Invalid response from get_url")
+            price = float(data["value"]["derivedUSD"])
+            return price, datetime_now_utc()
+        except KeyError as e:
+            msg = f"Error parsing Pulsechain Supgraph response: KeyError: {e}"
+            logger.critical(msg)
             return None, None
 
 
@@ -1,3 +1,4 @@
+import math
 import os
 from decimal import *
 from collections import defaultdict
@@ -6,29 +7,40 @@ from datetime import datetime
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import Optional
 from eth_utils.conversions import to_bytes
 from eth_abi import decode_abi
 
-import requests
-
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.rolling_window import RollingMean
+from telliot_feeds.utils.decode import decode_uint256_floats
 from telliot_feeds.utils.log import get_logger
 
 
 logger = get_logger(__name__)
 
 class TWAPSpotPriceService(WebPriceService):
-    """TWAP Price Service"""
+    """TWAP Price Service
+
+    Reports are read from the subgraph incrementally: a cursor keeps the
+    `_time` and `id` of the last report ingested, and each call only pages
+    through the reports after it, adding them to a rolling window per pair.
+    """
 
     def __init__(self, **kwargs: Any) -> None:
         kwargs["name"] = "TWAP Price Service"
         kwargs["url"] = os.getenv("FETCH_FLEX_SUBGRAPH_URL")
 
         self.timespan = int(os.getenv("TWAP_TIMESPAN", 3600))
-        self.twap: dict[str, dict[Decimal, int]] = defaultdict(lambda: {'total': Decimal('0.0'), 'count': 0})
+        self.page_size = int(os.getenv("TWAP_SUBGRAPH_PAGE_SIZE", 1000))
+        self.windows: dict[str, RollingMean] = defaultdict(lambda: RollingMean(self.timespan))
+        # (_time, id) of the last report ingested
+        self.cursor: Optional[tuple[int, str]] = None
+        # pair of each query data seen, None if it is not a spot price
+        self.pairs: dict[str, Optional[str]] = {}
 
         super().__init__(**kwargs)
     
@@ -43,10 +55,13 @@ class TWAPSpotPriceService(WebPriceService):
         now = datetime.now()
         return int(now.timestamp())
     
-    def _get_last_reports_gte_timestamp(self, timestamp: int) -> list[dict]:
+    async def _query_reports(self, where: str, order_by: str) -> list[dict]:
+        """One page of reports, in increasing `order_by` then `id` order"""
         query_body = f"""
             query newReportEntities {{
-                newReportEntities(where: {{_time_gte: {timestamp} }}) {{
+                newReportEntities(
+                    where: {{ {where} }}, orderBy: {order_by}, orderDirection: asc, first: {self.page_size}
+                ) {{
                     _nonce
                     _queryData
                     _queryId
@@ -58,36 +73,82 @@ class TWAPSpotPriceService(WebPriceService):
                 }}
             }}
         """
-        response = requests.post(url=self.url, json={"query": query_body})
+        data = await self.post_url(json_data={"query": query_body})
+        response = data.get("response")
 
-        if response.status_code != 200 or response.json().get('errors'):
+        if data.get("status") != 200 or not isinstance(response, dict) or response.get('errors'):
             err_msg = f"""
-            Failed to query subgraph {self.url}, status code: {response.status_code}
+            Failed to query subgraph {self.url}, status code: {data.get('status')}
             Error:
-            {response.json()}
+            {response if response is not None else data.get('exception')}
             """
             logger.error(err_msg)
             raise Exception(err_msg)
         
-        return response.json()['data']['newReportEntities']
-    
-    def _get_TWAP_from_reports(self) -> dict[str, float]:
-        timestamp = self._get_current_timestamp() - self.timespan
-        reports = self._get_last_reports_gte_timestamp(timestamp)
-        for report in reports:
-            asset, currency = self._decode_query_data(self._bytes_from_string(string=report['_queryData']))
-            decoded_value, = decode_abi(['uint256',], self._bytes_from_string(report['_value']))
-            decimal_value = Decimal(f'{(decoded_value / 1e18):.18f}')
-        
-            key = f'{asset}-{currency}'
-            self.twap[key]['total'] += decimal_value
-            self.twap[key]['count'] += 1
+        return response['data']['newReportEntities']
+
+    def _get_pair(self, query_data: str) -> Optional[str]:
+        """`asset-currency` of a query, decoded once per distinct query data"""
+        if query_data not in self.pairs:
+            try:
+                asset, currency = self._decode_query_data(self._bytes_from_string(string=query_data))
+                self.pairs[query_data] = f'{asset}-{currency}'
+            except Exception as e:
+                logger.warning(f"Skipping reports of query data that is not a spot price: {e}")
+                self.pairs[query_data] = None
+        return self.pairs[query_data]
+
+    def _ingest_reports(self, reports: list[dict]) -> None:
+        # values of the whole page are decoded at once
+        values = decode_uint256_floats([self._bytes_from_string(report['_value']) for report in reports])
+        for report, value in zip(reports, values.tolist()):
+            key = self._get_pair(report['_queryData'])
+            if key is None or math.isnan(value):
+                continue
+            self.windows[key].add(int(report['_time']), Decimal(f'{value:.18f}'))
+
+    async def _ingest_new_reports(self, start: int) -> int:
+        """Add the reports after the cursor (or from `start` if the cursor is older) to the windows
+
+        The subgraph sorts rows with the same `orderBy` value by `id`, so a
+        full page ordered by `_time` is continued with the reports of its
+        last `_time` after its last `id`, then with the later `_time`s.
+        """
+        ingested = 0
+        ties = False
+        while True:
+            if self.cursor is None or self.cursor[0] < start:
+                where, order_by = f"_time_gte: {start}", "_time"
+            elif ties:
+                where, order_by = f'_time: {self.cursor[0]}, id_gt: "{self.cursor[1]}"', "id"
+            else:
+                where, order_by = f"_time_gt: {self.cursor[0]}", "_time"
+
+            page = await self._query_reports(where, order_by)
+            if page:
+                self._ingest_reports(page)
+                self.cursor = (int(page[-1]['_time']), page[-1]['id'])
+            ingested += len(page)
+
+            if len(page) == self.page_size:
+                # more reports may share the last `_time`
+                ties = True
+            elif order_by == "id":
+                ties = False
+            else:
+                return ingested
+
+    async def _get_TWAP_from_reports(self) -> dict[str, float]:
+        now = self._get_current_timestamp()
+        ingested = await self._ingest_new_reports(now - self.timespan)
+        logger.debug(f"Ingested {ingested} new reports, cursor at {self.cursor}")
 
         means: dict[str, float] = {}
-        for key in self.twap.keys():
-            total, count = self.twap[key]['total'], self.twap[key]['count']
-            mean = (total / count).quantize(Decimal('1e-18'))
-            means[key] = float(mean)
+        for key, window in self.windows.items():
+            window.expire(now)
+            mean = window.mean()
+            if mean is not None:
+                means[key] = float(mean.quantize(Decimal('1e-18')))
         return means
 
     async def get_price(self, asset: str, currency: str) -> OptionalDataPoint[float]:
@@ -97,7 +158,7 @@ class TWAPSpotPriceService(WebPriceService):
         currency = currency.lower()
 
         try:
-            twap_from_reports = self._get_TWAP_from_reports()
+            twap_from_reports = await self._get_TWAP_from_reports()
             price = twap_from_reports[f'{asset}-{currency}']
             logger.info(f"""
             TWAP price found for {asset}-{currency} in the last {self.timespan} seconds: {price}
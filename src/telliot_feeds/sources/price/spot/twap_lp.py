@@ -8,8 +8,10 @@ import asyncio
 from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
+from typing import Optional
 from eth_utils.conversions import to_bytes
 from eth_abi import decode_abi
+from telliot_core.utils.home import default_homedir
 from web3 import Web3
 
 import requests
@@ -19,6 +21,13 @@ from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.pricing.lp_snapshot import LPSnapshot
+from telliot_feeds.pricing.lp_snapshot import PairState
+from telliot_feeds.pricing.observation_journal import ObservationJournal
+from telliot_feeds.pricing.observations import Observation
+from telliot_feeds.pricing.observations import ObservationRing
+from telliot_feeds.pricing.reserve_tracker import get_reserve_tracker
+from telliot_feeds.pricing.sync_backfill import SyncBackfill
 from telliot_feeds.utils.log import get_logger
 
 
@@ -26,52 +35,22 @@ logger = get_logger(__name__)
 
 class TWAPLPSpotPriceService(WebPriceService):
     """TWAP Price Service"""
-    ABI = """
-    [
-        {
-            "inputs": [],
-            "name": "getReserves",
-            "outputs": [
-            { "internalType": "uint112", "name": "reserve0", "type": "uint112" },
-            { "internalType": "uint112", "name": "reserve1", "type": "uint112" },
-            {
-                "internalType": "uint32",
-                "name": "blockTimestampLast",
-                "type": "uint32"
-            }
-            ],
-            "stateMutability": "view",
-            "type": "function"
-        },
-        {
-            "type": "function",
-            "stateMutability": "view",
-            "payable": false,
-            "outputs": [{ "type": "uint256", "name": "", "internalType": "uint256" }],
-            "name": "price0CumulativeLast",
-            "inputs": [],
-            "constant": true
-        },
-        {
-            "type": "function",
-            "stateMutability": "view",
-            "payable": false,
-            "outputs": [{ "type": "uint256", "name": "", "internalType": "uint256" }],
-            "name": "price1CumulativeLast",
-            "inputs": [],
-            "constant": true
-        }
-    ]
-    """
 
     def __init__(self, **kwargs: Any) -> None:
         kwargs["name"] = "TWAP LP Price Service"
         kwargs["url"] = os.getenv("LP_PULSE_NETWORK_URL", "https://rpc.v4.testnet.pulsechain.com")
         kwargs["timeout"] = 10.0
 
-        self.prevPricesPath: Path = Path('./prevPricesCumulative.json') 
+        # Legacy single-observation file, only read to seed observations of pairs without a journal
+        self.prevPricesPath: Path = Path('./prevPricesCumulative.json')
+        self.state_dir: Path = Path(os.getenv('TWAP_STATE_DIR', default_homedir() / 'twap'))
+        self.journals: dict[str, ObservationJournal] = {}
         self.max_retries = int(os.getenv('MAX_RETRIES', 5))
         self.period = int(os.getenv('TWAP_TIMESPAN', 3600*12))
+        self.sample_interval = int(os.getenv('TWAP_SAMPLE_INTERVAL', 60))
+        self.max_observations = int(os.getenv('TWAP_MAX_OBSERVATIONS', 0))
+        self.observations: dict[str, ObservationRing] = {}
+        self.backfill = os.getenv('TWAP_BACKFILL', 'true').lower() not in ('0', 'false', 'no')
 
         self.isSourceInitialized = False
 
@@ -88,32 +67,75 @@ class TWAPLPSpotPriceService(WebPriceService):
         self.lps_order: dict[str, str] = self._get_lps_order()
         self.reporter_event_loop = asyncio.get_running_loop()
         self.reporter_start_time = self.reporter_event_loop.time()
+        if self.backfill and await self._backfill_observations(currency):
+            return
         logger.info(f"Reporter: initial startup waiting TWAP period ({self.period} seconds)")
-        await self._update_cumulative_prices_json_after_time(
+        await self._sample_cumulative_prices(
             self.period,
             self.contract_addresses[currency],
             self._get_pair_json_key(currency)
         )
 
+    async def _backfill_observations(self, currency: str) -> bool:
+        """Rebuild the pair's observations over the TWAP period from its Sync events
+
+        Returns:
+            True if the observations reach back to the start of the TWAP period
+        """
+        key = self._get_pair_json_key(currency)
+        try:
+            observations = await SyncBackfill(self.url, self.timeout).observations(
+                self.contract_addresses[currency], self.period
+            )
+        except Exception as e:
+            logger.error(f"TWAP Service: failed to backfill {key} observations from Sync events")
+            logger.error(e)
+            return False
+
+        ring = self._get_observations(key)
+        last_sampled = None
+        for i, observation in enumerate(observations):
+            # Keep one observation per sample interval, like the TWAP service samples
+            is_last = i == len(observations) - 1
+            if last_sampled is not None and observation.timestamp - last_sampled < self.sample_interval and not is_last:
+                continue
+            if self._add_observation(key, observation):
+                last_sampled = observation.timestamp
+        await self._sync_journal(key)
+
+        snapshot, _ = await self._read_pair(self.contract_addresses[currency])
+        oldest = ring.oldest()
+        covered = oldest is not None and oldest.timestamp <= snapshot.timestamp - self.period
+        logger.info(
+            f"TWAP Service: backfilled {len(ring)} {key} observations, "
+            f"{'covering' if covered else 'not covering'} the TWAP period"
+        )
+        return covered
+
     async def handleActivateTwapService(self, currency: str):
         if self.isTwapServiceActive: return
         self.isTwapServiceActive = True
         asyncio.create_task(self.initializeTwapService(currency))
         await asyncio.sleep(0)
 
-    async def _update_cumulative_prices_json_after_time(self, wait_time: int, contract_address: str, key: str):
-        logger.info(f"TWAP Service: waiting {wait_time:.2f} seconds to update cumulative prices data")
-        await asyncio.sleep(wait_time)
-        price0CumulativeLast, price1CumulativeLast, _blockTimestampLast = self._callPricesCumulativeLast(
-            contract_address
-        )
-        self._update_cumulative_prices_json(
-            price0CumulativeLast,
-            price1CumulativeLast,
-            _blockTimestampLast,
-            key
+    async def _sample_cumulative_prices(self, duration: int, contract_address: str, key: str):
+        """Record an observation every `sample_interval` seconds for `duration` seconds"""
+        logger.info(
+            f"TWAP Service: sampling cumulative prices every {self.sample_interval} seconds for {duration:.2f} seconds"
         )
-        logger.info(f"TWAP Service: updated cumulative prices {key} data in {self.prevPricesPath.resolve()}")
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+        while True:
+            await asyncio.sleep(max(min(self.sample_interval, end - loop.time()), 0))
+            try:
+                _, pair = await self._read_pair(contract_address)
+                self._record_observation(key, pair)
+                await self._sync_journal(key)
+            except Exception as e:
+                logger.error(f"TWAP Service: failed to sample cumulative prices {key}")
+                logger.error(e)
+            if loop.time() >= end:
+                break
 
     async def initializeTwapService(self, currency: str):
         logger.info(
@@ -127,7 +149,7 @@ class TWAPLPSpotPriceService(WebPriceService):
         contract_address = self.contract_addresses[currency]
 
         while True:
-            await self._update_cumulative_prices_json_after_time(self.period, contract_address, key)
+            await self._sample_cumulative_prices(self.period, contract_address, key)
             await asyncio.sleep(0)
 
     def _get_contract_address(self) -> dict[str, str]:
@@ -154,44 +176,24 @@ class TWAPLPSpotPriceService(WebPriceService):
             lps_order[s] = order_list[i].lower()
         return lps_order
     
-    def _callGetReserves(self, contract_address: str):
+    async def _read_pair(self, contract_address: str) -> tuple[LPSnapshot, PairState]:
+        """Reserves and cumulative prices from the reserve tracker, read with the other LP sources if not tracked yet"""
         retry_count = 0
         while retry_count < self.max_retries:
             try:
-                w3 = Web3(Web3.HTTPProvider(self.url, request_kwargs={'timeout': self.timeout}))
-                contract = w3.eth.contract(address=contract_address, abi=self.ABI)
-                return contract.functions.getReserves().call()
+                snapshot = await get_reserve_tracker(self.url).snapshot([contract_address])
+                return snapshot, snapshot.pair(contract_address)
             except Exception as e:
                 retry_count += 1
                 logger.error(
                     f"""
-                    Error calling RPC 'getReserves'
-                    {'' if retry_count == self.max_retries else 'Trying again...'}
-                    """
-                )
-        raise Exception(f"Failed to call RPC 'getReserves', address {contract_address}")
-
-    def _callPricesCumulativeLast(self, contract_address: str) -> tuple[int]:
-        retry_count = 0
-        while retry_count < self.max_retries:
-            try:
-                w3 = Web3(Web3.HTTPProvider(self.url, request_kwargs={'timeout': self.timeout}))
-                contract = w3.eth.contract(address=contract_address, abi=self.ABI)
-                price0CumulativeLast = contract.functions.price0CumulativeLast().call()
-                price1CumulativeLast = contract.functions.price1CumulativeLast().call()
-                _, _, _blockTimestampLast = self._callGetReserves(contract_address)
-                return price0CumulativeLast, price1CumulativeLast, _blockTimestampLast
-            except Exception as e:
-                retry_count += 1
-                logger.error(
-                    f"""
-                    Error calling RPC in '_callPricesCumulativeLast' method
+                    Error reading pair state with multicall
                     {'' if retry_count == self.max_retries else 'Trying again...'}
                     """
                 )
                 logger.error(e)
-        raise Exception(f"Failed to call RPC in '_callPricesCumulativeLast' method, address {contract_address}")
-    
+        raise Exception(f"Failed to read pair state with multicall, address {contract_address}")
+
     def _get_pair_json_key(self, currency: str) -> str:
         token0, token1 = self.lps_order[currency].split('/')
         return f"{token0.upper()}/{token1.upper()}"
@@ -201,51 +203,85 @@ class TWAPLPSpotPriceService(WebPriceService):
             return json.loads(self.prevPricesPath.read_text())
         return {}
 
-    def _update_cumulative_prices_json(
-        self,
-        price0CumulativeLast: int,
-        price1CumulativeLast: int,
-        blockTimestampLast: int,
-        key: str
-    ) -> None:
-        json_data = self._read_cumulative_prices_json()
+    def _get_journal(self, key: str) -> ObservationJournal:
+        journal = self.journals.get(key)
+        if journal is None:
+            address = next(
+                address for currency, address in self.contract_addresses.items()
+                if self._get_pair_json_key(currency) == key
+            )
+            journal = self.journals[key] = ObservationJournal(
+                self.state_dir / f"{address.lower()}.twap",
+                max_records=2 * self._get_observations(key).capacity
+            )
+        return journal
+
+    def _get_observations(self, key: str) -> ObservationRing:
+        ring = self.observations.get(key)
+        if ring is None:
+            # Enough samples for windows of up to two TWAP periods
+            capacity = self.max_observations or 2 * self.period // max(self.sample_interval, 1) + 2
+            ring = self.observations[key] = ObservationRing(capacity)
+            try:
+                for observation in self._get_journal(key).load():
+                    ring.append(observation.timestamp, observation.price0_cumulative, observation.price1_cumulative)
+            except (OSError, ValueError) as e:
+                logger.error(f"TWAP Service: failed to load {key} observations journal")
+                logger.error(e)
+            if len(ring):
+                logger.info(f"TWAP Service: loaded {len(ring)} {key} observations from {self._get_journal(key).path}")
+        return ring
+
+    def _add_observation(self, key: str, observation: Observation) -> bool:
+        """Add an observation to the ring and the journal, returning False if it is not newer than the latest"""
+        ring = self._get_observations(key)
+        if not ring.append(observation.timestamp, observation.price0_cumulative, observation.price1_cumulative):
+            return False
+        journal = self._get_journal(key)
+        try:
+            journal.append(observation)
+            if journal.needs_compaction():
+                journal.compact(ring)
+        except OSError as e:
+            logger.error(f"TWAP Service: failed to persist {key} observation to {journal.path}")
+            logger.error(e)
+        return True
 
-        json_data[key] = {
-            'price0CumulativeLast': str(price0CumulativeLast),
-            'price1CumulativeLast': str(price1CumulativeLast),
-            'blockTimestampLast': str(blockTimestampLast)
-        }
-        self.prevPricesPath.write_text(json.dumps(json_data))
-        logger.info(f'Entry {key} updated in Cumulative prices JSON')
+    async def _sync_journal(self, key: str) -> None:
+        """Force the observations added since the last sync to disk, off the event loop"""
+        journal = self._get_journal(key)
+        try:
+            await asyncio.to_thread(journal.sync)
+        except OSError as e:
+            logger.error(f"TWAP Service: failed to persist {key} observations to {journal.path}")
+            logger.error(e)
 
-    def get_prev_prices_cumulative(self, currency: str) -> tuple[int]:
-        key = self._get_pair_json_key(currency)
+    def _record_observation(self, key: str, pair: PairState) -> None:
+        observation = Observation(pair.block_timestamp_last, pair.price0_cumulative_last, pair.price1_cumulative_last)
+        if self._add_observation(key, observation):
+            logger.debug(f"TWAP Service: recorded {key} observation at {pair.block_timestamp_last}")
 
+    def _load_observation(self, key: str, pair: PairState) -> None:
+        """Seed the observations of a pair from the legacy cumulative prices JSON, or the current pair state"""
         json_data = self._read_cumulative_prices_json()
 
         if key not in json_data.keys():
-            address = self.contract_addresses[currency]
-            price0CumulativeLast, price1CumulativeLast, _blockTimestampLast = self._callPricesCumulativeLast(address)
-            self._update_cumulative_prices_json(
-                price0CumulativeLast,
-                price1CumulativeLast,
-                _blockTimestampLast,
-                key
-            )
-            logger.info(f'Cumulative prices JSON {key} data initialized')
-            return price0CumulativeLast, price1CumulativeLast, _blockTimestampLast
+            self._record_observation(key, pair)
+            logger.info(f'{key} observations initialized from the current pair state')
+            return
 
         logger.info(f'Cumulative prices JSON {key} data found')
         try:
-            prevPrice0CumulativeLast = int(json_data[key]['price0CumulativeLast'])
-            prevPrice1CumulativeLast = int(json_data[key]['price1CumulativeLast'])
-            prevBlockTimestampLast = int(json_data[key]['blockTimestampLast'])
-            return prevPrice0CumulativeLast, prevPrice1CumulativeLast, prevBlockTimestampLast
-        except (json.decoder.JSONDecodeError, ValueError) as e: 
+            self._add_observation(key, Observation(
+                int(json_data[key]['blockTimestampLast']),
+                int(json_data[key]['price0CumulativeLast']),
+                int(json_data[key]['price1CumulativeLast'])
+            ))
+        except (KeyError, ValueError) as e:
             logger.error(f"""
             Error while reading Cumulative Prices JSON file:
             {self.prevPricesPath.resolve()}
-            You can manually delete the file and restart the service to automatically initialize it
+            You can manually delete the file and restart the service to initialize it from the current pair state
 
             The expected JSON format is:
             {{
@@ -257,23 +293,27 @@ class TWAPLPSpotPriceService(WebPriceService):
                 ...
             }}
             """)
-            logger.error(e)
+            raise e
+
+    def get_prev_prices_cumulative(self, currency: str, snapshot: LPSnapshot, window: int) -> tuple[int]:
+        """Cumulative prices observed nearest to the start of the TWAP window"""
+        key = self._get_pair_json_key(currency)
+        ring = self._get_observations(key)
+        if not len(ring):
+            self._load_observation(key, snapshot.pair(self.contract_addresses[currency]))
+
+        observation: Observation = ring.nearest(snapshot.timestamp % 2**32 - window)
+        return observation.price0_cumulative, observation.price1_cumulative, observation.timestamp
 
-    def _get_current_block_timestamp(self):
-        w3 = Web3(Web3.HTTPProvider(self.url))
-        block = w3.eth.getBlock("latest")
-        timestamp = block.timestamp
-        return timestamp % 2**32
-    
     def _calculate_cumulative_price(
-        self, address: str,
+        self, pair: PairState,
         price0Cumulative: int,
         price1Cumulative: int,
         blockTimestampLast: int,
         currentTimesamp: int
     ) -> tuple[int]:
         timeElapsed = currentTimesamp - blockTimestampLast
-        reserve0, reserve1, _ = self._callGetReserves(address)
+        reserve0, reserve1 = pair.reserve0, pair.reserve1
         fixed_point_fraction0 = (reserve1 / reserve0) * (2 ** 112)
         fixed_point_fraction1 = (reserve0 / reserve1) * (2 ** 112)
         price0Cumulative += int(fixed_point_fraction0) * timeElapsed
@@ -285,13 +325,16 @@ class TWAPLPSpotPriceService(WebPriceService):
         prevPrice0CumulativeLast: int,
         prevPrice1CumulativeLast: int,
         prevBlockTimestampLast: int,
-        currency: str
+        currency: str,
+        snapshot: LPSnapshot
     ) -> tuple[int]:
-        address = self.contract_addresses[currency]
+        pair = snapshot.pair(self.contract_addresses[currency])
 
-        price0CumulativeLast, price1CumulativeLast, blockTimestampLast = self._callPricesCumulativeLast(address)
+        price0CumulativeLast = pair.price0_cumulative_last
+        price1CumulativeLast = pair.price1_cumulative_last
+        blockTimestampLast = pair.block_timestamp_last
 
-        blockTimestamp = self._get_current_block_timestamp()
+        blockTimestamp = snapshot.timestamp % 2**32
         if blockTimestamp != blockTimestampLast:
             logger.info(
                 f"""
@@ -301,7 +344,7 @@ class TWAPLPSpotPriceService(WebPriceService):
                 """
             )
             price0CumulativeLast, price1CumulativeLast = self._calculate_cumulative_price(
-                address,
+                pair,
                 price0CumulativeLast,
                 price1CumulativeLast,
                 blockTimestampLast,
@@ -338,23 +381,103 @@ class TWAPLPSpotPriceService(WebPriceService):
         )
         return twap_price
 
-    def _get_total_value_locked(self, currency: str):
-        reserve0, reserve1, _ = self._callGetReserves(self.contract_addresses[currency])
+    def _get_total_value_locked(self, currency: str, pair: PairState) -> float:
+        """Value locked in the pair in `currency` units: twice its stablecoin reserve
+
+        Same measure as the liquidity of the PulseX pair graph quotes, so
+        weights of both kinds of LP sources can be averaged together.
+        """
         token0, _ = self.lps_order[currency].split('/')
-        if "pls" not in token0.strip():
-            reserve0, reserve1 = reserve1, reserve0
+        stable_reserve = pair.reserve1 if "pls" in token0.strip() else pair.reserve0
+        decimals = 6 if currency == 'usdc' or currency == 'usdt' else 18
+        return 2 * stable_reserve / 10**decimals
+
+    def _get_twap_price(self, asset: str, currency: str, snapshot: LPSnapshot, window: int) -> tuple[float, float]:
+        """Calculate the TWAP price over `window` seconds and TVL weight from a pair snapshot"""
+        pair = snapshot.pair(self.contract_addresses[currency])
+        prevPrice0CumulativeLast, prevPrice1CumulativeLast, prevBlockTimestampLast = self.get_prev_prices_cumulative(
+            currency, snapshot, window
+        )
+
+        price0CumulativeLast, price1CumulativeLast, blockTimestampLast = self.get_currentPrices(
+            prevPrice0CumulativeLast,
+            prevPrice1CumulativeLast,
+            prevBlockTimestampLast,
+            currency,
+            snapshot
+        )
 
+        timeElapsed = blockTimestampLast - prevBlockTimestampLast
+        if timeElapsed < window:
+            logger.info(
+                f"""
+                timeElapsed < window = {timeElapsed} < {window}:
+                Calculating TWAP price with current cumulative price for remaining time
+                """
+            )
+            remaining_time = window - timeElapsed
+            price0CumulativeLast, price1CumulativeLast = self._calculate_cumulative_price(
+                pair,
+                price0CumulativeLast,
+                price1CumulativeLast,
+                blockTimestampLast,
+                blockTimestampLast + remaining_time
+            )
+            blockTimestampLast += remaining_time
+            
+        try:
+            token0, _ = self.lps_order[currency].split('/')
+            if "pls" in token0.strip():
+                logger.info("Using price0CumulativeLast")
+                twap = self.calculate_twap(
+                    price0CumulativeLast,
+                    prevPrice0CumulativeLast,
+                    blockTimestampLast,
+                    prevBlockTimestampLast,
+                )
+            else:
+                logger.info("Using price1CumulativeLast")
+                twap = self.calculate_twap(
+                    price1CumulativeLast,
+                    prevPrice1CumulativeLast,
+                    blockTimestampLast,
+                    prevBlockTimestampLast,
+                )
+        except KeyError as e:
+            logger.error(f'currency {currency} not found in the provided PLS_CURRENCY_SOURCES')
+            logger.error(e)
+
+        price = float(twap)
         if currency == 'usdc' or currency == 'usdt':
-            reserve1 = reserve1 * 1e12
+            logger.info(
+                f"""
+                Scaling price for {currency} by 1e12:
+                {price} * 1e12 = {price * 1e12}
+                """
+            )
+            price = price * 1e12
 
-        vl0 = ((1e18 * reserve1) / (reserve0 + 1e18)) * reserve0 # value locked token0 without fees
-        vl1 = ((1e18 * reserve0) / (reserve1 + 1e18)) * reserve1 # value locked token0 without fees
-        tvl = vl0 + vl1 # total value locked of the pool
-        return tvl
+        logger.info(f"""
+        TWAP LP price for {asset}-{currency}: {price}
+        LP contract address: {self.contract_addresses[currency]}
+        """)
+
+        # from the same snapshot as the price
+        weight = self._get_total_value_locked(currency, pair)
+
+        return price, weight
 
     async def get_price(self, asset: str, currency: str) -> OptionalDataPoint[float]:
         """Implement PriceServiceInterface"""
+        return await self.get_twap(asset, currency)
+
+    async def get_twap(self, asset: str, currency: str, window: Optional[int] = None) -> OptionalDataPoint[float]:
+        """TWAP price over the last `window` seconds (default `TWAP_TIMESPAN`)
 
+        The window start is looked up in the in-memory observations sampled
+        by the TWAP service, so any window they cover needs no file I/O.
+        """
+        window = window or self.period
         asset = asset.lower()
         currency = currency.lower()
 
@@ -366,74 +489,8 @@ class TWAPLPSpotPriceService(WebPriceService):
         await self.handleActivateTwapService(currency)
 
         try:
-            prevPrice0CumulativeLast, prevPrice1CumulativeLast, prevBlockTimestampLast = self.get_prev_prices_cumulative(
-                currency
-            )
-
-            price0CumulativeLast, price1CumulativeLast, blockTimestampLast = self.get_currentPrices(
-                prevPrice0CumulativeLast,
-                prevPrice1CumulativeLast,
-                prevBlockTimestampLast,
-                currency
-            )
-
-            timeElapsed = blockTimestampLast - prevBlockTimestampLast
-            if timeElapsed < self.period:
-                logger.info(
-                    f"""
-                    timeElapsed < self.period = {timeElapsed} < {self.period}:
-                    Calculating TWAP price with current cumulative price for remaining time
-                    """
-                )
-                remaining_time = self.period - timeElapsed
-                price0CumulativeLast, price1CumulativeLast = self._calculate_cumulative_price(
-                    self.contract_addresses[currency],
-                    price0CumulativeLast,
-                    price1CumulativeLast,
-                    blockTimestampLast,
-                    blockTimestampLast + remaining_time
-                )
-                blockTimestampLast += remaining_time
-                
-            try:
-                token0, _ = self.lps_order[currency].split('/')
-                if "pls" in token0.strip():
-                    logger.info("Using price0CumulativeLast")
-                    twap = self.calculate_twap(
-                        price0CumulativeLast,
-                        prevPrice0CumulativeLast,
-                        blockTimestampLast,
-                        prevBlockTimestampLast,
-                    )
-                else:
-                    logger.info("Using price1CumulativeLast")
-                    twap = self.calculate_twap(
-                        price1CumulativeLast,
-                        prevPrice1CumulativeLast,
-                        blockTimestampLast,
-                        prevBlockTimestampLast,
-                    )
-            except KeyError as e:
-                logger.error(f'currency {currency} not found in the provided PLS_CURRENCY_SOURCES')
-                logger.error(e)
-
-            price = float(twap)
-            if currency == 'usdc' or currency == 'usdt':
-                logger.info(
-                    f"""
-                    Scaling price for {currency} by 1e12:
-                    {price} * 1e12 = {price * 1e12}
-                    """
-                )
-                price = price * 1e12
-
-            logger.info(f"""
-            TWAP LP price for {asset}-{currency}: {price}
-            LP contract address: {self.contract_addresses[currency]}
-            """)
-
-            weight = self._get_total_value_locked(currency)
-
+            snapshot, _ = await self._read_pair(self.contract_addresses[currency])
+            price, weight = self._get_twap_price(asset, currency, snapshot, window)
             return price, datetime_now_utc(), float(weight)
         except Exception as e:
             logger.error(e)
@@ -2,10 +2,9 @@ from dataclasses import dataclass
 from dataclasses import field
 from typing import Any
 
-import requests
-
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.graphql_batch import get_graphql_batcher
 from telliot_feeds.pricing.price_service import WebPriceService
 from telliot_feeds.pricing.price_source import PriceSource
 from telliot_feeds.utils.log import get_logger
@@ -19,6 +18,8 @@ uniswapV3_map = {
     "dai": "0x6b175474e89094c44da98b954eedeac495271d0f",
     "fuse": "0x970b9bb2c0444f5e81e9d0efb84c8ccdcdcaf84d",
 }
+# ETH/USD leg, shared by every token priced in the same query
+BUNDLES = "bundles { id ethPriceUSD }"
 
 
 class UniswapV3PriceService(WebPriceService):
@@ -44,61 +45,42 @@ class UniswapV3PriceService(WebPriceService):
         if not token:
             raise Exception("Asset not supported: {}".format(asset))
 
-        headers = {
-            "Content-Type": "application/json",
-        }
-
-        query = "{bundles{id ethPriceUSD}token" + f'(id: "{token}")' + "{ derivedETH } }"
-
-        json_data = {"query": query}
-
-        request_url = self.url + "/subgraphs/name/uniswap/uniswap-v3"
-
-        with requests.Session() as s:
-            try:
-                r = s.post(request_url, headers=headers, json=json_data, timeout=self.timeout)
-                res = r.json()
-                data = {"response": res}
-
-            except requests.exceptions.ConnectTimeout:
-                logger.warning("Timeout Error, No prices retrieved from Uniswap")
+        # The bundle and the tokens of all UniswapV3 feeds refreshed together are one query,
+        # and results are reused until the subgraph indexes a new block. The ETH price and
+        # the token's derivedETH are always read together, so they come from the same block
+        batcher = get_graphql_batcher(self.url + "/subgraphs/name/uniswap/uniswap-v3")
+        selections = [BUNDLES] if asset == "eth" else [BUNDLES, f'token(id: "{token}") {{ derivedETH }}']
+        results = await batcher.query_together(selections)
+
+        for data in results:
+            if "error" in data:
+                if data["error"] == "Timeout Error":
+                    logger.warning("Timeout Error, No prices retrieved from Uniswap")
+                else:
+                    logger.warning("No prices retrieved from Uniswap")
                 return None, None
 
-            except Exception:
-                logger.warning("No prices retrieved from Uniswap")
+        try:
+            ethprice = float(results[0]["value"][0]["ethPriceUSD"])
+            if asset == "eth":
+                token_data = 1
+            elif currency.lower() == "eth":
+                ethprice = 1
+                token_data = results[1]["value"]["derivedETH"]
+            else:
+                token_data = results[1]["value"]["derivedETH"]
+            price = ethprice * float(token_data)
+            if price == 0.0:
+                msg = "Uniswap API not included, because price response is 0"
+                logger.warning(msg)
                 return None, None
-
-        if "error" in data:
-            logger.error(data)
+            else:
+                return price, datetime_now_utc()
+        except (KeyError, IndexError, TypeError) as e:
+            msg = "Error parsing UniswapV3 response: {}: {}".format(type(e).__name__, e)
+            logger.critical(msg)
             return None, None
 
-        elif "response" in data:
-            response = data["response"]
-
-            try:
-                ethprice = float(response["data"]["bundles"][0]["ethPriceUSD"])
-                if asset.lower() == "eth":
-                    token_data = 1
-                elif currency.lower() == "eth":
-                    ethprice = 1
-                    token_data = response["data"]["token"]["derivedETH"]
-                else:
-                    token_data = response["data"]["token"]["derivedETH"]
-                price = ethprice * float(token_data)
-                if price == 0.0:
-                    msg = "Uniswap API not included, because price response is 0"
-                    logger.warning(msg)
-                    return None, None
-                else:
-                    return price, datetime_now_utc()
-            except KeyError as e:
-                msg = "Error parsing UniswapV3 response: KeyError: {}".format(e)
-                logger.critical(msg)
-                return None, None
-
-        else:
-            raise Exception("Invalid response from get_url")
-
 
 @dataclass
 class UniswapV3PriceSource(PriceSource):
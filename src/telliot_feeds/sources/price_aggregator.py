@@ -1,15 +1,22 @@
 import asyncio
-import statistics
+import os
+import time
 from dataclasses import dataclass
 from dataclasses import field
-from typing import Callable
+from typing import Any
+from typing import Dict
 from typing import List
 from typing import Literal
+from typing import Optional
+from typing import Tuple
 
 from telliot_feeds.datasource import DataSource
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint, OptionalWeightedDataPoint
+from telliot_feeds.pricing.aggregation import aggregate
+from telliot_feeds.pricing.aggregation import ALGORITHMS
 from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.sources.source_health import SourceHealth
 from telliot_feeds.utils.log import get_logger
 
 
@@ -17,7 +24,21 @@ logger = get_logger(__name__)
 
 
 def weighted_average(distribution, weights):
-    return sum([distribution[i] * weights[i] for i in range(len(distribution))]) / sum(weights)
+    return aggregate(distribution, weights, algorithm="weighted_average").value
+
+
+def is_valid_price(value: object) -> bool:
+    """Check whether a source answer can be aggregated"""
+    return value is not None and isinstance(value, float)
+
+
+def circuit_breaker_default() -> bool:
+    return os.getenv("PRICE_CIRCUIT_BREAKER", "false").lower() in ("1", "true", "yes")
+
+
+def source_label(source: PriceSource) -> str:
+    return f"{type(source).__name__}({source.asset}/{source.currency})"
+
 
 @dataclass
 class PriceAggregator(DataSource[float]):
@@ -28,22 +49,52 @@ class PriceAggregator(DataSource[float]):
     #: Currency of returned price
     currency: str = ""
 
-    #: Callable algorithm that accepts an iterable of floats
-    algorithm: Literal["median", "mean", "weighted_average"] = "median"
+    #: Aggregation algorithm (weighted ones use the weights returned by LP sources)
+    algorithm: Literal["median", "mean", "weighted_average", "weighted_median", "trimmed_mean"] = "median"
+
+    #: Leave out prices more than this many scaled median absolute deviations
+    #: from the median before aggregating (None keeps every price)
+    max_deviation: Optional[float] = None
+
+    #: Proportion of the lowest and of the highest prices left out by `trimmed_mean`
+    trim: float = 0.1
 
-    #: Private storage for actual algorithm function
-    _algorithm: Callable[..., float] = field(default=statistics.median, init=False, repr=False)
+    #: Sources whose price was left out of the last update, with the reason
+    rejected_sources: List[Tuple[PriceSource, str]] = field(default_factory=list, init=False, repr=False)
 
     #: Data feed sources
     sources: List[PriceSource] = field(default_factory=list)
 
+    #: Seconds to wait for sources before aggregating the prices received so far
+    #: (None waits for every source)
+    deadline: Optional[float] = None
+
+    #: Aggregate as soon as this many sources returned a valid price
+    #: (None waits for every source)
+    quorum: Optional[int] = None
+
+    #: Sources that missed the deadline or quorum during the last update
+    late_sources: List[PriceSource] = field(default_factory=list, init=False, repr=False)
+
+    #: Skip sources that keep failing until a probe request succeeds (opt-in,
+    #: as the price is then aggregated from fewer sources)
+    circuit_breaker: bool = field(default_factory=circuit_breaker_default)
+
+    #: Consecutive failures that open a source's circuit breaker
+    failure_threshold: int = 3
+
+    #: Seconds before a skipped source is probed again
+    recovery_timeout: float = 60.0
+
+    #: Sources skipped by an open circuit breaker during the last update
+    skipped_sources: List[PriceSource] = field(default_factory=list, init=False, repr=False)
+
+    #: Private storage for per-source health, keyed by source id
+    _health: Dict[int, SourceHealth] = field(default_factory=dict, init=False, repr=False)
+
     def __post_init__(self) -> None:
-        if self.algorithm == "median":
-            self._algorithm = statistics.median
-        elif self.algorithm == "mean":
-            self._algorithm = statistics.mean
-        elif self.algorithm == "weighted_average":
-            self._algorithm = weighted_average
+        if self.algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown aggregation algorithm: {self.algorithm}")
 
     def __str__(self) -> str:
         """Human-readable representation."""
@@ -52,22 +103,141 @@ class PriceAggregator(DataSource[float]):
         symbol = asset + "/" + currency
         return f"PriceAggregator {symbol} {self.algorithm}"
 
+    def source_health(self, source: PriceSource) -> SourceHealth:
+        """Health statistics and circuit breaker of a source"""
+        health = self._health.get(id(source))
+        if health is None:
+            health = SourceHealth(failure_threshold=self.failure_threshold, recovery_timeout=self.recovery_timeout)
+            self._health[id(source)] = health
+        return health
+
+    def source_scores(self) -> List[Dict[str, Any]]:
+        """Health report for every source, e.g. to see why one was excluded"""
+        return [{"source": source_label(s), **self.source_health(s).report()} for s in self.sources]
+
     async def update_sources(self) -> List[OptionalWeightedDataPoint[float]]:
         """Update data feed sources
 
+        Sources with an open circuit breaker are skipped and recorded in
+        `skipped_sources` (unless all of them are open, then all are tried).
+
+        If a `deadline` or `quorum` is set, sources still pending when the
+        deadline expires or the quorum of valid prices is reached are
+        cancelled, recorded in `late_sources` and reported as `(None, None)`.
+
         Returns:
             Dictionary of updated source values, mapping data source UID
             to the time-stamped answer for that data source
         """
 
-        async def gather_inputs() -> List[OptionalWeightedDataPoint[float]]:
-            sources = self.sources
-            datapoints = await asyncio.gather(*[source.fetch_new_datapoint() for source in sources])
+        async def gather_inputs(sources: List[PriceSource]) -> List[OptionalWeightedDataPoint[float]]:
+            datapoints = await asyncio.gather(*[self._fetch_source(source) for source in sources])
             return datapoints
 
-        inputs = await gather_inputs()
+        sources = self.sources
+        if self.circuit_breaker:
+            now = time.monotonic()
+            sources = [s for s in self.sources if self.source_health(s).allow_request(now)]
+            if not sources:
+                logger.warning(f"{self}: all circuit breakers are open, trying every source")
+                sources = self.sources
+        active = {id(s) for s in sources}
+        self.skipped_sources = [s for s in self.sources if id(s) not in active]
+        if self.skipped_sources:
+            skipped = ", ".join(source_label(s) for s in self.skipped_sources)
+            logger.info(f"{self}: skipping sources with open circuit breaker: {skipped}")
 
-        return inputs
+        if self.deadline is None and self.quorum is None:
+            self.late_sources = []
+            datapoints = await gather_inputs(sources)
+        else:
+            datapoints = await self._gather_until_quorum_or_deadline(sources)
+
+        by_source = {id(s): datapoint for s, datapoint in zip(sources, datapoints)}
+        return [by_source.get(id(s), (None, None)) for s in self.sources]  # type: ignore
+
+    async def _fetch_source(self, source: PriceSource) -> OptionalWeightedDataPoint[float]:
+        """Fetch a datapoint from a source, recording its latency and failures"""
+        health = self.source_health(source)
+        start = time.monotonic()
+        try:
+            datapoint = await source.fetch_new_datapoint()
+        except asyncio.CancelledError:
+            health.abort_probe()
+            raise
+        except Exception as e:
+            self.record_source_result(source, None, time.monotonic() - start, error=e)
+            raise
+
+        self.record_source_result(source, datapoint, time.monotonic() - start)
+        return datapoint
+
+    def record_source_result(
+        self,
+        source: PriceSource,
+        datapoint: Optional[OptionalWeightedDataPoint[float]],
+        latency: float,
+        error: Optional[Exception] = None,
+    ) -> None:
+        """Record a source's answer (or failure) in its health statistics"""
+        if error is not None:
+            self._record_failure(source, latency, repr(error))
+        elif datapoint is not None and is_valid_price(datapoint[0]):
+            self.source_health(source).record_success(latency)
+        else:
+            self._record_failure(source, latency, "no price")
+
+    def _record_failure(self, source: PriceSource, latency: float, reason: str) -> None:
+        health = self.source_health(source)
+        if health.record_failure(latency, reason) and self.circuit_breaker:
+            logger.warning(
+                f"{self}: circuit breaker opened for {source_label(source)} after "
+                f"{health.consecutive_failures} failures (last: {reason}), "
+                f"retrying in {health.recovery_timeout} seconds"
+            )
+
+    async def _gather_until_quorum_or_deadline(
+        self, sources: List[PriceSource]
+    ) -> List[OptionalWeightedDataPoint[float]]:
+        """Collect source datapoints until the quorum is met or the deadline expires"""
+        loop = asyncio.get_running_loop()
+        tasks = [asyncio.ensure_future(self._fetch_source(source)) for source in sources]
+        end = None if self.deadline is None else loop.time() + self.deadline
+        pending = set(tasks)
+        valid = 0
+
+        while pending and (self.quorum is None or valid < self.quorum):
+            timeout = None if end is None else max(end - loop.time(), 0)
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                break
+            for task in done:
+                if task.exception() is None and is_valid_price(task.result()[0]):
+                    valid += 1
+
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self.late_sources = [source for source, task in zip(sources, tasks) if task in pending]
+        if self.late_sources:
+            late = ", ".join(source_label(s) for s in self.late_sources)
+            logger.warning(f"{self}: excluded late sources: {late}")
+            if end is not None and loop.time() >= end:
+                for source in self.late_sources:
+                    self._record_failure(source, self.deadline, "missed deadline")  # type: ignore
+
+        datapoints: List[OptionalWeightedDataPoint[float]] = []
+        for source, task in zip(sources, tasks):
+            if task in pending:
+                datapoints.append((None, None))  # type: ignore
+            elif task.exception() is not None:
+                logger.error(f"{self}: source {source_label(source)} failed: {task.exception()}")
+                datapoints.append((None, None))  # type: ignore
+            else:
+                datapoints.append(task.result())
+        return datapoints
 
     async def fetch_new_datapoint(self) -> OptionalWeightedDataPoint[float]:
         """Update current value with time-stamped value fetched from source
@@ -80,36 +250,53 @@ class PriceAggregator(DataSource[float]):
             Current time-stamped value
         """
         datapoints = await self.update_sources()
+        return self.combine(datapoints)
+
+    def combine(self, datapoints: List[OptionalWeightedDataPoint[float]]) -> OptionalWeightedDataPoint[float]:
+        """Aggregate and store the datapoints fetched from each of the sources
+
+        Args:
+            datapoints: Answer of each source, in the order of `sources`
 
+        Returns:
+            Aggregated time-stamped value
+        """
+        sources = []
         prices = []
         weights = []
-        for datapoint in datapoints:
+        for source, datapoint in zip(self.sources, datapoints):
             # Ignore input timestamps
             v = datapoint[0]
             w = datapoint[2] if len(datapoint) == 3 else None
-            # Check for valid answers
-            if v is not None and isinstance(v, float):
+            # Check for valid answers, keeping each weight with its price
+            if is_valid_price(v):
+                sources.append(source)
                 prices.append(v)
-            # Check for valid answers
-            if w is not None and isinstance(w, float):
-                weights.append(w)
+                weights.append(w if isinstance(w, (int, float)) else None)
 
+        self.rejected_sources = []
         if not prices:
             logger.warning(f"No prices retrieved for {self}.")
             return None, None
 
         # Run the algorithm on all valid prices
-        logger.info(f"Running {self.algorithm} on {prices}")
+        logger.info(f"Running {self.algorithm} on {prices} with weights {weights}")
+        aggregated = aggregate(prices, weights, self.algorithm, max_deviation=self.max_deviation, trim=self.trim)
+        result = aggregated.value
+
+        self.rejected_sources = [(sources[i], reason) for i, reason in sorted(aggregated.rejected.items())]
+        if self.rejected_sources:
+            rejected = ", ".join(f"{source_label(s)}: {reason}" for s, reason in self.rejected_sources)
+            logger.warning(f"{self}: left out prices of {rejected}")
+
+        for source, source_datapoint in zip(self.sources, datapoints):
+            if is_valid_price(source_datapoint[0]):
+                self.source_health(source).record_deviation(source_datapoint[0], result)
 
-        if len(weights) > 0:
-            logger.info(f"Running {self.algorithm} using weights {weights}")
-            result = self._algorithm(prices, weights)
-        else:
-            result = self._algorithm(prices)
         datapoint = (result, datetime_now_utc())
         self.store_datapoint(datapoint)
 
         logger.info("Feed Price: {} reported at time {}".format(datapoint[0], datapoint[1]))
-        logger.info("Number of sources used in aggregate: {}".format(len(prices)))
+        logger.info("Number of sources used in aggregate: {}".format(len(prices) - len(self.rejected_sources)))
 
         return datapoint
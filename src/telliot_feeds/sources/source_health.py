@@ -0,0 +1,122 @@
+"""Health tracking and circuit breaking for aggregated price sources."""
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+from typing import Dict
+from typing import Optional
+
+
+# Weight of the newest observation in the moving averages
+EWMA_ALPHA = 0.2
+
+# Relative deviation from consensus that halves a source's score
+DEVIATION_HALF_SCORE = 0.01
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+def ewma(current: Optional[float], observation: float) -> float:
+    if current is None:
+        return observation
+    return EWMA_ALPHA * observation + (1 - EWMA_ALPHA) * current
+
+
+@dataclass
+class SourceHealth:
+    """Running health statistics and circuit breaker for one source
+
+    The breaker opens after `failure_threshold` consecutive failures.
+    While open, the source is skipped; after `recovery_timeout` seconds a
+    single probe request is let through (half-open). A successful probe
+    closes the breaker, a failed one opens it again.
+    """
+
+    failure_threshold: int = 3
+    recovery_timeout: float = 60.0
+
+    state: CircuitState = CircuitState.CLOSED
+    opened_at: float = 0.0
+    consecutive_failures: int = 0
+
+    #: Moving averages of request latency (s), failure ratio and
+    #: relative deviation from the aggregated price
+    latency: Optional[float] = None
+    error_rate: float = 0.0
+    deviation: Optional[float] = None
+
+    requests: int = 0
+    failures: int = 0
+    last_error: str = ""
+
+    @property
+    def score(self) -> float:
+        """Health score in [0, 1]: success ratio, halved per 1% average deviation"""
+        deviation = self.deviation or 0.0
+        return (1 - self.error_rate) / (1 + deviation / DEVIATION_HALF_SCORE)
+
+    def allow_request(self, now: Optional[float] = None) -> bool:
+        """Whether the source should be queried now"""
+        if self.state == CircuitState.CLOSED:
+            return True
+        if self.state == CircuitState.OPEN:
+            now = time.monotonic() if now is None else now
+            if now - self.opened_at >= self.recovery_timeout:
+                self.state = CircuitState.HALF_OPEN
+                return True
+        # Half-open: the probe is already in flight
+        return False
+
+    def record_success(self, latency: float) -> None:
+        self.requests += 1
+        self.latency = ewma(self.latency, latency)
+        self.error_rate = ewma(self.error_rate, 0.0)
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+
+    def record_failure(self, latency: float, reason: str = "") -> bool:
+        """Record a failed request
+
+        Returns:
+            True if this failure opened the breaker
+        """
+        self.requests += 1
+        self.failures += 1
+        self.latency = ewma(self.latency, latency)
+        self.error_rate = ewma(self.error_rate, 1.0)
+        self.consecutive_failures += 1
+        self.last_error = reason
+        if self.state == CircuitState.HALF_OPEN or (
+            self.state == CircuitState.CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            self.state = CircuitState.OPEN
+            self.opened_at = time.monotonic()
+            return True
+        return False
+
+    def abort_probe(self) -> None:
+        """Allow a new probe when a half-open request was cancelled without an answer"""
+        if self.state == CircuitState.HALF_OPEN:
+            self.state = CircuitState.OPEN
+
+    def record_deviation(self, price: float, consensus: float) -> None:
+        if consensus:
+            self.deviation = ewma(self.deviation, abs(price - consensus) / abs(consensus))
+
+    def report(self) -> Dict[str, Any]:
+        """Health statistics for operators"""
+        return {
+            "state": self.state.value,
+            "score": round(self.score, 4),
+            "latency": self.latency,
+            "error_rate": round(self.error_rate, 4),
+            "deviation": self.deviation,
+            "consecutive_failures": self.consecutive_failures,
+            "requests": self.requests,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
@@ -5,8 +5,10 @@ import binascii
 from typing import Any
 from typing import Callable
 from typing import Optional
+from typing import Sequence
 
 import eth_abi
+import numpy as np
 from eth_utils.conversions import to_bytes
 from telliot_core.utils.response import error_status
 from telliot_core.utils.response import ResponseStatus
@@ -98,6 +100,60 @@ def decode_submit_value_bytes(
         )
 
 
+def _uint256_limbs(values: Sequence[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """Big-endian 64-bit limbs of ABI-encoded uint256 values, and which values are valid
+
+    Values shorter than 32 bytes are left-padded. Empty and longer values
+    are invalid and decode to zero limbs.
+    """
+    valid = np.ones(len(values), dtype=bool)
+    if not all(len(v) == 32 for v in values):
+        padded = []
+        for i, v in enumerate(values):
+            if not 0 < len(v) <= 32:
+                valid[i] = False
+                v = b""
+            padded.append(bytes(v).rjust(32, b"\0"))
+        values = padded
+    limbs = np.frombuffer(b"".join(values), dtype=">u8").reshape(-1, 4)
+    return limbs, valid
+
+
+def decode_uint256_floats(values: Sequence[bytes], decimals: int = 18) -> np.ndarray:
+    """Decode ABI-encoded uint256 values to floats divided by `10**decimals`, in one pass
+
+    Values below 2**53 are converted exactly in one vectorised pass, so
+    the division is the only rounding. Larger values (or more than 22
+    decimals, where `10.0**decimals` is inexact) are divided as Python
+    ints, which is correctly rounded too. Values that are empty or longer
+    than 32 bytes decode to NaN.
+    """
+    limbs, valid = _uint256_limbs(values)
+    result = limbs[:, 3].astype(np.float64) / 10.0**decimals
+    inexact = limbs[:, :3].any(axis=1) | (limbs[:, 3] >= 2**53)
+    if decimals > 22:
+        inexact[:] = True
+    for i in np.flatnonzero(inexact):
+        result[i] = int.from_bytes(limbs[i].tobytes(), "big") / 10**decimals
+    result[~valid] = np.nan
+    return result
+
+
+def decode_uint256_ints(values: Sequence[bytes]) -> np.ndarray:
+    """Decode ABI-encoded uint256 values exactly
+
+    Returns a `uint64` array when every value fits in 64 bits, otherwise an
+    object array of Python ints (values beyond float precision stay exact).
+    Raises ValueError for values that are empty or longer than 32 bytes.
+    """
+    limbs, valid = _uint256_limbs(values)
+    if not valid.all():
+        raise ValueError(f"Not a uint256 value: {values[int(np.argmin(valid))]!r}")
+    if not limbs[:, :3].any():
+        return limbs[:, 3].astype(np.uint64)
+    return np.array([int.from_bytes(bytes(v).rjust(32, b"\0"), "big") for v in values], dtype=object)
+
+
 def query_from_type_string(type_string: str) -> OracleQuery:
     """Get query from type string."""
     for entry in query_catalog._entries.values():
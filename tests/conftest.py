@@ -25,6 +25,7 @@ from telliot_core.apps.telliot_config import TelliotConfig
 from telliot_feeds.datasource import DataSource
 from telliot_feeds.dtypes.datapoint import datetime_now_utc
 from telliot_feeds.dtypes.datapoint import OptionalDataPoint
+from telliot_feeds.pricing.price_cache import reset_price_cache
 from telliot_feeds.reporters.fetch_flex import FetchFlexReporter
 
 
@@ -40,6 +41,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def price_cache():
+    """Prices cached for profitability checks do not leak between tests"""
+    reset_price_cache()
+    yield
+    reset_price_cache()
+
+
 @pytest.fixture(scope="module", autouse=True)
 def mumbai_cfg():
     """Return a test telliot configuration for use on polygon-mumbai
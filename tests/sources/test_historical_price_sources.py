@@ -1,4 +1,5 @@
 from datetime import datetime
+from unittest import mock
 
 import pytest
 
@@ -188,3 +189,15 @@ async def test_cryptowatch_get_candles():
     assert len(candles) > 0
     assert isfloat(candles[-1][4])
     # print("# btc/usd candles in six hour window:", len(candles))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "service", [CryptowatchHistoricalPriceService, KrakenHistoricalPriceService, PoloniexHistoricalPriceService]
+)
+async def test_get_url_is_awaitable(service):
+    """Historical services override the async `WebPriceService.get_url` with an async method"""
+    with mock.patch("requests.Session.get") as get:
+        get.return_value.json.return_value = {"result": []}
+        assert await service().get_url("ohlc") == {"response": {"result": []}}
+    assert get.call_args.args[0].endswith("ohlc")
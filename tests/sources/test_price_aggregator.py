@@ -0,0 +1,193 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from dataclasses import field
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.pricing.price_service import WebPriceService
+from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.sources.price_aggregator import PriceAggregator
+
+
+class DelayedPriceService(WebPriceService):
+    """Returns a fixed price after a delay"""
+
+    def __init__(self, price=None, delay=0.0, weight=None, **kwargs):
+        self.price = price
+        self.delay = delay
+        self.weight = weight
+        super().__init__(name="Delayed Price Service", url="", **kwargs)
+
+    async def get_price(self, asset, currency):
+        await asyncio.sleep(self.delay)
+        if self.price is None:
+            return None, None
+        if self.weight is not None:
+            return self.price, datetime_now_utc(), self.weight
+        return self.price, datetime_now_utc()
+
+
+@dataclass
+class DelayedPriceSource(PriceSource):
+    asset: str = "eth"
+    currency: str = "usd"
+    service: DelayedPriceService = field(default_factory=DelayedPriceService)
+
+
+def delayed(price, delay, weight=None):
+    return DelayedPriceSource(service=DelayedPriceService(price=price, delay=delay, weight=weight))
+
+
+@pytest.mark.asyncio
+async def test_default_waits_for_all_sources():
+    agg = PriceAggregator(asset="eth", currency="usd", sources=[delayed(1.0, 0), delayed(3.0, 0.2)])
+    v, _ = await agg.fetch_new_datapoint()
+    assert v == 2.0
+    assert agg.late_sources == []
+
+
+@pytest.mark.asyncio
+async def test_quorum_returns_early_and_cancels_stragglers():
+    slow = delayed(100.0, 5)
+    agg = PriceAggregator(
+        asset="eth",
+        currency="usd",
+        quorum=2,
+        sources=[delayed(1.0, 0), delayed(None, 0), delayed(3.0, 0.05), slow],
+    )
+
+    start = time.monotonic()
+    v, _ = await agg.fetch_new_datapoint()
+    assert time.monotonic() - start < 1
+    assert v == 2.0
+    assert agg.late_sources == [slow]
+    assert slow.depth == 0
+
+
+@pytest.mark.asyncio
+async def test_deadline_aggregates_available_prices(caplog):
+    slow = delayed(100.0, 5)
+    agg = PriceAggregator(asset="eth", currency="usd", deadline=0.2, sources=[delayed(1.0, 0), slow])
+
+    start = time.monotonic()
+    v, _ = await agg.fetch_new_datapoint()
+    assert time.monotonic() - start < 1
+    assert v == 1.0
+    assert agg.late_sources == [slow]
+    assert "excluded late sources: DelayedPriceSource(eth/usd)" in caplog.text
+
+    # nothing arrives before the deadline
+    agg = PriceAggregator(asset="eth", currency="usd", deadline=0.05, sources=[slow])
+    assert await agg.fetch_new_datapoint() == (None, None)
+
+
+class FlakyPriceService(DelayedPriceService):
+    """Fails until `healthy` is set"""
+
+    def __init__(self, **kwargs):
+        self.healthy = False
+        self.calls = 0
+        super().__init__(**kwargs)
+
+    async def get_price(self, asset, currency):
+        self.calls += 1
+        if not self.healthy:
+            raise Exception("connection refused")
+        return await super().get_price(asset, currency)
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_skips_failing_source(caplog):
+    flaky_service = FlakyPriceService(price=2.0)
+    flaky = DelayedPriceSource(service=flaky_service)
+    good = delayed(1.0, 0)
+    agg = PriceAggregator(
+        asset="eth",
+        currency="usd",
+        quorum=1,
+        circuit_breaker=True,
+        failure_threshold=2,
+        recovery_timeout=0.1,
+        sources=[good, flaky],
+    )
+
+    for _ in range(2):
+        assert (await agg.fetch_new_datapoint())[0] == 1.0
+    assert "circuit breaker opened for DelayedPriceSource(eth/usd)" in caplog.text
+
+    # open: skipped without being called
+    assert (await agg.fetch_new_datapoint())[0] == 1.0
+    assert flaky_service.calls == 2
+    assert agg.skipped_sources == [flaky]
+
+    scores = agg.source_scores()
+    assert scores[0]["state"] == "closed"
+    assert scores[0]["score"] > scores[1]["score"]
+    assert scores[1]["state"] == "open"
+    assert scores[1]["last_error"] == "Exception('connection refused')"
+
+    # half-open probe fails: opened again
+    await asyncio.sleep(0.1)
+    await agg.fetch_new_datapoint()
+    assert flaky_service.calls == 3
+    assert agg.source_health(flaky).state == "open"
+
+    # successful probe closes the breaker
+    await asyncio.sleep(0.1)
+    flaky_service.healthy = True
+    agg.quorum = None
+    assert (await agg.fetch_new_datapoint())[0] == 1.5
+    assert agg.source_health(flaky).state == "closed"
+    assert agg.skipped_sources == []
+    assert agg.source_health(good).deviation > 0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_tries_all_sources_when_all_open():
+    service = FlakyPriceService(price=2.0)
+    agg = PriceAggregator(
+        asset="eth",
+        currency="usd",
+        circuit_breaker=True,
+        failure_threshold=1,
+        deadline=1,
+        sources=[DelayedPriceSource(service=service)],
+    )
+    assert await agg.fetch_new_datapoint() == (None, None)
+    service.healthy = True
+    assert (await agg.fetch_new_datapoint())[0] == 2.0
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_is_opt_in():
+    no_price = delayed(None, 0)
+    agg = PriceAggregator(asset="eth", currency="usd", failure_threshold=1, sources=[delayed(1.0, 0), no_price])
+    assert not agg.circuit_breaker
+
+    # a source without a price is still asked each time, and aggregated as soon as it has one again
+    for _ in range(3):
+        assert (await agg.fetch_new_datapoint())[0] == 1.0
+        assert agg.skipped_sources == []
+    no_price.service.price = 2.0
+    assert (await agg.fetch_new_datapoint())[0] == 1.5
+
+    with mock.patch.dict("os.environ", {"PRICE_CIRCUIT_BREAKER": "true"}):
+        assert PriceAggregator(asset="eth", currency="usd").circuit_breaker
+
+
+@pytest.mark.asyncio
+async def test_weighted_median_rejects_manipulated_pool():
+    unweighted = delayed(2.1, 0)
+    manipulated = delayed(3.0, 0, weight=1e6)
+    sources = [delayed(2.0, 0, weight=1e4), delayed(2.02, 0, weight=2e4), unweighted, manipulated]
+    agg = PriceAggregator(asset="eth", currency="usd", algorithm="weighted_median", max_deviation=5, sources=sources)
+
+    v, _ = await agg.fetch_new_datapoint()
+
+    assert v == 2.02
+    assert agg.rejected_sources == [(unweighted, "no weight"), (manipulated, "outlier")]
+    with pytest.raises(ValueError):
+        PriceAggregator(algorithm="mode")
@@ -1,15 +1,16 @@
 """ Unit tests for pricing module
 
 """
+import asyncio
 import os
 from datetime import datetime
 from unittest import mock
 
 import pytest
-from requests import Response
 from requests.exceptions import JSONDecodeError
 from telliot_core.apps.telliot_config import TelliotConfig
 
+from telliot_feeds.pricing.response_cache import get_response_cache
 from telliot_feeds.sources.price.spot import coingecko
 from telliot_feeds.sources.price.spot.bitfinex import BitfinexSpotPriceService
 from telliot_feeds.sources.price.spot.bittrex import BittrexSpotPriceService
@@ -134,12 +135,12 @@ async def test_coinmarketcap(caplog, coinmarketcap_key):
         v, t = await get_price("bct", "usd", service["coinmarketcap"])
         validate_price(v, t)
 
-        def bad_status(*args, **kwargs):
-            r = Response()
-            r.status_code = 404
-            return r
+        async def bad_status(*args, **kwargs):
+            return {"response": {}, "status": 404}
 
-        with mock.patch("requests.Session.get", side_effect=bad_status):
+        get_response_cache().clear()
+
+        with mock.patch("telliot_feeds.pricing.http_transport.HTTPTransport.get", side_effect=bad_status):
 
             v, t = await get_price("bct", "usd", service["coinmarketcap"])
             assert v is None
@@ -198,7 +199,7 @@ async def test_gemini(caplog, monkeypatch):
         validate_price(v, t)
 
     # mock GeminiSpotPriceService.get_url() to return None
-    def mock_get_url(*args, **kwargs):
+    async def mock_get_url(*args, **kwargs):
         return None
 
     monkeypatch.setattr(GeminiSpotPriceService, "get_url", mock_get_url)
@@ -270,7 +271,7 @@ async def test_pulsechain_subgraph():
 
 @pytest.mark.asyncio
 async def test_coingecko_price_service_rate_limit(caplog):
-    def mock_get_url(self, url):
+    async def mock_get_url(self, url):
         return {
             "error": "<class 'requests.exceptions.JSONDecodeError'>",
             "exception": JSONDecodeError(
@@ -289,6 +290,30 @@ async def test_coingecko_price_service_rate_limit(caplog):
     assert "CoinGecko API rate limit exceeded" in caplog.text
 
 
+@pytest.mark.asyncio
+async def test_coingecko_batched_requests():
+    """Concurrent CoinGecko lookups are resolved by a single request"""
+    requested = []
+
+    async def mock_get_url(self, url):
+        requested.append(url)
+        return {"response": {"ethereum": {"usd": 1500.0, "eur": 1400.0}, "bitcoin": {"usd": 20000.0}}}
+
+    with mock.patch.object(CoinGeckoSpotPriceService, "get_url", mock_get_url):
+        results = await asyncio.gather(
+            CoinGeckoSpotPriceService().get_price("eth", "usd"),
+            CoinGeckoSpotPriceService().get_price("btc", "usd"),
+            CoinGeckoSpotPriceService().get_price("eth", "eur"),
+        )
+
+        assert [v for v, _ in results] == [1500.0, 20000.0, 1400.0]
+        assert requested == ["/simple/price?ids=bitcoin%2Cethereum&vs_currencies=eur%2Cusd"]
+
+        v, _ = await CoinGeckoSpotPriceService(batch_window=0).get_price("eth", "usd")
+        assert v == 1500.0
+        assert requested[-1] == "/simple/price?ids=ethereum&vs_currencies=usd"
+
+
 @pytest.mark.asyncio
 async def test_failed_price_service_request():
     """Assert web price service catches failed requests"""
@@ -0,0 +1,112 @@
+import re
+from decimal import Decimal
+from unittest import mock
+
+import pytest
+from eth_abi import encode_abi
+
+from telliot_feeds.pricing.rolling_window import RollingMean
+from telliot_feeds.sources.price.spot.twap import TWAPSpotPriceService
+
+NOW = 1700000000
+
+
+def report(n, time, asset, value):
+    query_data = encode_abi(["string", "bytes"], ["SpotPrice", encode_abi(["string", "string"], [asset, "usd"])])
+    return {
+        "id": f"0x{n:06x}",
+        "_time": str(time),
+        "_queryData": "0x" + query_data.hex(),
+        "_value": "0x" + encode_abi(["uint256"], [int(value * 10**18)]).hex(),
+    }
+
+
+class FakeSubgraph:
+    """`newReportEntities` with the filters, ordering and page size of a subgraph"""
+
+    def __init__(self):
+        self.reports = []
+        self.queries = 0
+
+    async def post_url(self, url="", json_data=None, headers=None):
+        self.queries += 1
+        query = json_data["query"]
+        where = re.search(r"where: \{(.*?)\}", query).group(1)
+        order_by = re.search(r"orderBy: (\w+)", query).group(1)
+        first = int(re.search(r"first: (\d+)", query).group(1))
+        rows = self.reports
+        for field, op, value in re.findall(r"(\w+?)(_gte|_gt|)\: \"?(\w+)\"?", where):
+            key = (lambda r: r[field]) if field == "id" else (lambda r: int(r[field]))
+            value = value if field == "id" else int(value)
+            if op == "_gte":
+                rows = [r for r in rows if key(r) >= value]
+            elif op == "_gt":
+                rows = [r for r in rows if key(r) > value]
+            else:
+                rows = [r for r in rows if key(r) == value]
+        rows = sorted(rows, key=lambda r: (r["id"],) if order_by == "id" else (int(r[order_by]), r["id"]))
+        return {"response": {"data": {"newReportEntities": rows[:first]}}, "status": 200}
+
+
+@pytest.fixture
+def subgraph():
+    subgraph = FakeSubgraph()
+    with mock.patch.object(TWAPSpotPriceService, "post_url", subgraph.post_url):
+        yield subgraph
+
+
+@pytest.fixture
+def service():
+    service = TWAPSpotPriceService()
+    service.timespan = 3600
+    service.page_size = 3
+    service._get_current_timestamp = lambda: NOW
+    return service
+
+
+def test_rolling_mean_expires_old_values():
+    window = RollingMean(60)
+    assert window.mean() is None
+    for t, value in ((0, "1.1"), (30, "2.2"), (60, "3.3")):
+        window.add(NOW + t, Decimal(value))
+    assert window.mean() == Decimal("2.2")
+
+    window.expire(NOW + 89)
+    assert len(window) == 2 and window.mean() == Decimal("2.75")
+    window.expire(NOW + 1000)
+    assert window.mean() is None and window.total == 0
+    window.add(NOW + 61, Decimal(1))
+    with pytest.raises(ValueError):
+        window.add(NOW, Decimal(1))
+
+
+@pytest.mark.asyncio
+async def test_reports_paged_past_ties(subgraph, service):
+    # seven reports in the same second are more than two pages
+    subgraph.reports = [report(n, NOW - 100, "pls", 0.01 * (n + 1)) for n in range(7)]
+    subgraph.reports.append(report(7, NOW - 50, "pls", 0.08))
+    subgraph.reports.append(report(8, NOW - 4000, "pls", 100))
+
+    price, _ = await service.get_price("pls", "usd")
+
+    assert price == pytest.approx(0.045)
+    assert service.cursor == (NOW - 50, "0x000007")
+
+
+@pytest.mark.asyncio
+async def test_only_new_reports_fetched(subgraph, service):
+    subgraph.reports = [report(n, NOW - 3000 + n, "pls", 0.05) for n in range(5)]
+    assert (await service.get_price("pls", "usd"))[0] == pytest.approx(0.05)
+
+    queries = subgraph.queries
+    assert (await service.get_price("pls", "usd"))[0] == pytest.approx(0.05)
+    assert subgraph.queries == queries + 1
+
+    # totals are not accumulated across calls, old reports expire
+    subgraph.reports.append(report(5, NOW + 500, "pls", 0.11))
+    service._get_current_timestamp = lambda: NOW + 500
+    assert (await service.get_price("pls", "usd"))[0] == pytest.approx(0.06)
+
+    service._get_current_timestamp = lambda: NOW + 4000
+    assert (await service.get_price("pls", "usd"))[0] == pytest.approx(0.11)
+    assert await service.get_price("plsx", "usd") == (None, None)
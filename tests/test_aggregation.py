@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from telliot_feeds.pricing.aggregation import aggregate
+from telliot_feeds.pricing.aggregation import outliers
+from telliot_feeds.pricing.aggregation import weighted_median
+
+
+def test_weighted_median():
+    assert weighted_median(np.array([3.0, 1.0, 2.0]), np.array([1.0, 1.0, 1.0])) == 2.0
+    assert weighted_median(np.array([1.0, 2.0, 3.0, 4.0]), np.ones(4)) == 2.5
+    # the deep pool outweighs two shallow ones
+    assert weighted_median(np.array([0.05, 0.07, 0.08]), np.array([1e6, 1e3, 1e3])) == 0.05
+
+
+def test_weights_stay_with_their_prices():
+    # the second source has no weight, previously 10 got the weight of 0.05
+    result = aggregate([0.05, 10.0, 0.06], [1e5, None, 1e5], "weighted_average")
+    assert result.value == pytest.approx(0.055)
+    assert result.rejected == {1: "no weight"}
+
+    # without any weight, prices are averaged
+    assert aggregate([1.0, 2.0], [None, None], "weighted_average").value == 1.5
+    with pytest.raises(ValueError):
+        aggregate([1.0], [], "median")
+    with pytest.raises(ValueError):
+        aggregate([1.0], [None], "mode")
+
+
+def test_outliers_rejected():
+    prices = [100.0, 101.0, 99.5, 100.5, 150.0]
+    assert list(outliers(np.array(prices), 5)) == [False, False, False, False, True]
+    # identical prices do not make the smallest difference an outlier
+    assert not outliers(np.array([1.0, 1.0, 1.0, 1.00005]), 3).any()
+
+    result = aggregate(prices, [1.0] * 5, "mean", max_deviation=5)
+    assert result.value == pytest.approx(100.25)
+    assert result.rejected == {4: "outlier"}
+
+    # the manipulated pool is also the deepest one
+    weights = [1e3, 1e3, 1e3, 1e3, 1e6]
+    assert aggregate(prices, weights, "weighted_median").value == 150.0
+    assert aggregate(prices, weights, "weighted_median", max_deviation=5).value == pytest.approx(100.25)
+
+
+def test_trimmed_mean():
+    prices = [1.0, 2.0, 3.0, 4.0, 100.0]
+    assert aggregate(prices, [None] * 5, "trimmed_mean", trim=0.2).value == 3.0
+    assert aggregate(prices, [None] * 5, "trimmed_mean", trim=0.0).value == 22.0
+    assert aggregate([], [], "median").value is None
@@ -0,0 +1,95 @@
+from collections import Counter
+from dataclasses import dataclass
+from dataclasses import field
+
+import pytest
+
+from telliot_feeds.batch_refresh import BatchRefresh
+from telliot_feeds.batch_refresh import source_key
+from telliot_feeds.datafeed import DataFeed
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.pricing.price_service import WebPriceService
+from telliot_feeds.pricing.price_source import PriceSource
+from telliot_feeds.queries.price.spot_price import SpotPrice
+from telliot_feeds.sources.price_aggregator import PriceAggregator
+
+PRICES = {("eth", "usd"): 2000.0, ("btc", "usd"): 30000.0, ("fetch", "usd"): 0.5}
+CALLS: Counter = Counter()
+
+
+class CountingPriceService(WebPriceService):
+    """Fixed prices, counting the calls made for each pair"""
+
+    def __init__(self, offset=0.0, **kwargs):
+        self.offset = offset
+        super().__init__(name=f"Counting Price Service {offset}", url=f"https://prices/{offset}", **kwargs)
+
+    async def get_price(self, asset, currency):
+        CALLS[(type(self), self.url, asset, currency)] += 1
+        if asset == "fail":
+            raise Exception("connection refused")
+        return PRICES[(asset, currency)] + self.offset, datetime_now_utc()
+
+
+class OtherPriceService(CountingPriceService):
+    pass
+
+
+@dataclass
+class CountingPriceSource(PriceSource):
+    service: CountingPriceService = field(default_factory=CountingPriceService)
+
+
+def source(asset, offset=0.0, service=CountingPriceService):
+    return CountingPriceSource(asset=asset, currency="usd", service=service(offset=offset))
+
+
+def median_feed(asset, *sources):
+    aggregator = PriceAggregator(asset=asset, currency="usd", algorithm="median", sources=list(sources))
+    return DataFeed(query=SpotPrice(asset=asset.upper(), currency="USD"), source=aggregator)
+
+
+@pytest.fixture(autouse=True)
+def calls():
+    CALLS.clear()
+    return CALLS
+
+
+@pytest.mark.asyncio
+async def test_shared_sources_fetched_once(calls):
+    eth = median_feed("eth", source("eth"), source("eth", 2.0), source("eth", service=OtherPriceService))
+    # same pairs on the same services as the ETH feed, in other source objects
+    eth_too = median_feed("eth", source("ETH"), source("eth", 2.0))
+    failing = source("fail")
+    fetch = median_feed("fetch", source("fetch"), source("fetch", 0.1), failing)
+    # an aggregator of aggregators, and a feed repeated
+    eth_btc = median_feed("eth", eth.source, median_feed("btc", source("btc")).source)
+    feeds = [eth, eth_too, fetch, eth_btc, fetch]
+
+    batch = BatchRefresh(feeds)
+    datapoints = await batch.refresh()
+
+    assert [v for v, _ in datapoints] == [2000.0, 2001.0, 0.55, 16000.0, 0.55]
+    assert batch.fetches == 7
+    assert set(calls.values()) == {1}
+    # every copy of a shared source has the datapoint
+    assert [s.latest[0] for s in eth_too.source.sources] == [2000.0, 2002.0]
+
+    health = fetch.source.source_health(failing)
+    assert health.consecutive_failures == 1
+    assert fetch.source.source_health(fetch.source.sources[0]).consecutive_failures == 0
+
+
+@pytest.mark.asyncio
+async def test_sources_with_other_parameters_not_shared(calls):
+    noon, one, noon_too, latest = source("eth"), source("eth"), source("eth"), source("eth")
+    noon.service.ts, one.service.ts, noon_too.service.ts = 1700000000, 1700003600, 1700000000
+    # services keeping state of their own are never shared
+    stateful, stateful_too = source("btc"), source("btc")
+    stateful.service.window, stateful_too.service.window = [], []
+
+    batch = BatchRefresh([median_feed("eth", noon, one, noon_too, latest), median_feed("btc", stateful, stateful_too)])
+    await batch.refresh()
+
+    assert batch.fetches == len(batch.leaves) == 5
+    assert batch.leaves[source_key(noon)] == [noon, noon_too]
@@ -2,7 +2,10 @@
 
 """
 from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
 
+import numpy as np
 import pytest
 
 from telliot_feeds.datasource import RandomSource
@@ -26,3 +29,56 @@ async def test_random_source():
 
     latest_values = s.get_all_datapoints()
     assert len(latest_values) == 2
+
+
+@pytest.mark.asyncio
+async def test_compact_history():
+    s = RandomSource(max_datapoints=4, compact_history=True)
+    assert s.latest == (None, None)
+    assert len(s.get_history_arrays()) == 0
+
+    datapoints = [await s.fetch_new_datapoint() for _ in range(10)]
+
+    assert s.depth == 4
+    assert s.latest == datapoints[-1]
+    assert s.get_all_datapoints() == datapoints[-4:]
+
+    arrays = s.get_history_arrays(start=datapoints[7][1])
+    assert list(arrays.values) == [v for v, _ in datapoints[7:]]
+    assert np.isnan(arrays.weights).all()
+    # views of the stored arrays, not copies
+    assert np.shares_memory(arrays.values, s._history.arrays().values)
+    assert not arrays.values.flags.writeable
+
+
+def test_compact_history_weights_and_memory():
+    s = RandomSource(compact_history=True)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    for i in range(1000):
+        s.store_datapoint((0.05 + i, start + timedelta(seconds=i)), weight=None if i % 2 else 1e5)
+
+    arrays = s.get_history_arrays(end=start + timedelta(seconds=745))
+    assert len(arrays) == 2 and arrays.values[0] == 744.05
+    assert arrays.weights[0] == 1e5 and np.isnan(arrays.weights[1])
+    assert s.get_history_arrays().timestamps[-1] == int((start + timedelta(seconds=999)).timestamp()) * 10**9
+    # three 8-byte columns with some spare room, instead of tuples of objects
+    assert s._history.nbytes() < 30 * s.max_datapoints
+
+    # non-float values are kept in a deque
+    s.store_datapoint(("1", start + timedelta(seconds=1000)))
+    assert s.depth == s.max_datapoints
+    assert s.latest[0] == "1"
+    assert s.get_all_datapoints()[-2] == (999.05, start + timedelta(seconds=999))
+
+
+@pytest.mark.parametrize("compact", [True, False])
+def test_history_of_block_timestamped_datapoints(compact):
+    """PulseX LP services timestamp their prices with the int block timestamp"""
+    s = RandomSource(compact_history=compact)
+    s.store_datapoint((0.05, 1700000000))
+    s.store_datapoint((0.06, 1700000012))
+
+    assert s.latest == (0.06, 1700000012)
+    arrays = s.get_history_arrays()
+    assert list(arrays.values) == [0.05, 0.06]
+    assert list(arrays.timestamps) == [1700000000 * 10**9, 1700000012 * 10**9]
@@ -0,0 +1,140 @@
+import asyncio
+import re
+from contextlib import asynccontextmanager
+from unittest import mock
+
+import pytest
+from aiohttp import web
+
+from telliot_feeds.pricing import graphql_batch
+from telliot_feeds.pricing.graphql_batch import GraphQLBatcher
+from telliot_feeds.pricing.http_transport import HTTPTransport
+from telliot_feeds.sources.price.spot import pulsex_subgraph
+from telliot_feeds.sources.price.spot.pulsex_subgraph import PulseXSupgraphService
+from telliot_feeds.sources.price.spot.uniswapV3 import BUNDLES
+from telliot_feeds.sources.price.spot.uniswapV3 import uniswapV3_map
+from telliot_feeds.sources.price.spot.uniswapV3 import UniswapV3PriceService
+from tests.test_price_service import start_server
+
+PATH = "/subgraphs/name/pulsechain/pulsex"
+UNISWAP_PATH = "/subgraphs/name/uniswap/uniswap-v3"
+PRICES = {"pls": "0.00005", "plsx": "0.00002", "dai": "0.99", "usdc": "1.01", "fetch": "0.3"}
+TOKENS = {asset: f"0x{i:040x}" for i, asset in enumerate(PRICES, 1)}
+
+
+class FakeSubgraph:
+    """Answers aliased `token(id: ...)` and `bundles` fields like PulseX and UniswapV3 subgraphs"""
+
+    def __init__(self):
+        self.queries = []
+        self.block = 100
+
+    async def handle(self, request):
+        query = (await request.json())["query"]
+        self.queries.append(query)
+        data = {"_meta": {"block": {"number": self.block}}}
+        errors = []
+        for alias in re.findall(r"(\w+): bundles", query):
+            data[alias] = [{"id": "1", "ethPriceUSD": "2000"}]
+        for alias, field, argument in re.findall(r'(\w+): (\w+)\(id: "(\w+)"\)', query):
+            if field != "token":
+                errors.append({"message": f"Type `Query` has no field `{field}`", "path": [alias]})
+                continue
+            prices = {TOKENS[asset]: price for asset, price in PRICES.items()}
+            if argument in prices:
+                data[alias] = {"derivedUSD": prices[argument]}
+            elif argument in uniswapV3_map.values():
+                data[alias] = {"derivedETH": "0.5"}
+            else:
+                data[alias] = None
+        return web.json_response({"data": data, "errors": errors} if errors else {"data": data})
+
+
+@asynccontextmanager
+async def serve():
+    fake = FakeSubgraph()
+    runner, url = await start_server([web.post(PATH, fake.handle), web.post(UNISWAP_PATH, fake.handle)])
+    transport = HTTPTransport()
+    fake.url = url
+    fake.batcher = GraphQLBatcher(url + PATH, transport=transport)
+    batchers = {url + PATH: fake.batcher, url + UNISWAP_PATH: GraphQLBatcher(url + UNISWAP_PATH, transport=transport)}
+    with mock.patch.dict(graphql_batch._batchers, batchers, clear=True):
+        with mock.patch.dict(pulsex_subgraph.pulsex_subgraph_supporten_tokens, TOKENS):
+            try:
+                yield fake
+            finally:
+                await transport.close()
+                await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_token_prices_in_one_request():
+    async with serve() as subgraph:
+        await check_token_prices(subgraph)
+
+
+async def check_token_prices(subgraph):
+    service = PulseXSupgraphService()
+    service.url = subgraph.url
+
+    datapoints = await asyncio.gather(*(service.get_price(asset, "usd") for asset in PRICES))
+
+    assert len(subgraph.queries) == 1
+    assert "_meta" in subgraph.queries[0]
+    assert [price for price, _ in datapoints] == [float(p) for p in PRICES.values()]
+
+    # served from the cache of the block
+    assert (await service.get_price("dai", "usd"))[0] == 0.99
+    assert len(subgraph.queries) == 1
+
+
+@pytest.mark.asyncio
+async def test_block_cache_and_field_errors():
+    async with serve() as subgraph:
+        await check_block_cache(subgraph)
+
+
+async def check_block_cache(subgraph):
+    batcher = subgraph.batcher
+    token = 'token(id: "' + TOKENS["dai"] + '") { derivedUSD }'
+    missing = 'token(id: "0x' + "f" * 40 + '") { derivedUSD }'
+    bad = 'pair(id: "0x1") { reserveUSD }'
+
+    dai, unknown, error = await asyncio.gather(batcher.query(token), batcher.query(missing), batcher.query(bad))
+    assert dai == {"value": {"derivedUSD": "0.99"}, "block": 100}
+    assert unknown == {"value": None, "block": 100}
+    assert error["error"] == "GraphQL Error"
+    assert batcher.requests == 1
+
+    # results of an older block are dropped once a newer block is seen
+    batcher.cache_ttl = 0
+    subgraph.block = 101
+    assert (await batcher.query(missing))["block"] == 101
+    assert token not in batcher._results
+
+
+@pytest.mark.asyncio
+async def test_uniswap_v3_feeds_share_the_eth_price():
+    async with serve() as subgraph:
+        service = UniswapV3PriceService()
+        service.url = subgraph.url
+
+        wbtc, dai, eth, dai_eth = await asyncio.gather(
+            service.get_price("wbtc", "usd"),
+            service.get_price("dai", "usd"),
+            service.get_price("eth", "usd"),
+            service.get_price("dai", "eth"),
+        )
+        assert (wbtc[0], dai[0], eth[0], dai_eth[0]) == (1000, 1000, 2000, 0.5)
+        assert len(subgraph.queries) == 1
+        assert subgraph.queries[0].count("bundles") == 1
+
+        assert (await service.get_price("wbtc", "usd"))[0] == 1000
+        assert len(subgraph.queries) == 1
+
+        # a token not cached yet is read with a new bundle, not the cached one of an older block
+        subgraph.block = 101
+        batcher = graphql_batch._batchers[subgraph.url + UNISWAP_PATH]
+        matic = await batcher.query_together([BUNDLES, 'token(id: "' + uniswapV3_map["matic"] + '") { derivedETH }'])
+        assert [result["block"] for result in matic] == [101, 101]
+        assert len(subgraph.queries) == 2
@@ -0,0 +1,87 @@
+import statistics
+from datetime import datetime
+from datetime import timedelta
+from datetime import timezone
+
+import numpy as np
+import pytest
+
+from telliot_feeds.datasource import DataSource
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.dtypes.history import HistoryArrays
+from telliot_feeds.pricing.history_stats import EMA
+from telliot_feeds.pricing.history_stats import percentiles
+from telliot_feeds.pricing.history_stats import returns_stdev
+from telliot_feeds.pricing.history_stats import rolling_returns_stdev
+from telliot_feeds.pricing.history_stats import time_weighted_average
+from telliot_feeds.pricing.history_stats import volume_weighted_average
+from telliot_feeds.sources.history_statistic import HistoryStatisticSource
+from telliot_feeds.utils.stdev_calculator import stdev_calculator
+
+START = datetime(2023, 1, 1, tzinfo=timezone.utc)
+
+
+def history(*points):
+    """HistoryArrays of `(seconds after START, value, weight)` points"""
+    return HistoryArrays(
+        np.array([v for _, v, _ in points], dtype=np.float64),
+        np.array([int((START + timedelta(seconds=s)).timestamp()) * 10**9 for s, _, _ in points], dtype=np.int64),
+        np.array([np.nan if w is None else w for _, _, w in points], dtype=np.float64),
+    )
+
+
+def test_time_and_volume_weighted_averages():
+    h = history((0, 1.0, 10.0), (10, 2.0, None), (40, 4.0, 30.0))
+
+    assert time_weighted_average(h) == pytest.approx((1 * 10 + 2 * 30) / 40)
+    # 4.0 is held until the end, 1.0 was in effect at the start
+    assert time_weighted_average(h, START + timedelta(seconds=5), START + timedelta(seconds=60)) == pytest.approx(
+        (1 * 5 + 2 * 30 + 4 * 20) / 55
+    )
+    assert time_weighted_average(h, START + timedelta(seconds=100), START + timedelta(seconds=200)) == 4.0
+    assert time_weighted_average(history()) is None
+
+    assert volume_weighted_average(h) == pytest.approx((1 * 10 + 4 * 30) / 40)
+    assert volume_weighted_average(history((0, 1.0, None))) is None
+
+
+def test_returns_stdev_and_percentiles():
+    prices = [100.0, 102.0, 99.0, 0.0, 101.0, 104.0, 103.0]
+    changes = [0.02, -3 / 102, -1.0, 3 / 101, -1 / 104]
+
+    assert returns_stdev(prices) == pytest.approx(statistics.stdev(changes))
+    assert stdev_calculator(prices[:3]) == pytest.approx(statistics.stdev(changes[:2]))
+    assert returns_stdev([1.0, 2.0]) is None
+    assert rolling_returns_stdev(prices, 3) == pytest.approx(
+        [statistics.stdev(changes[i : i + 3]) for i in range(3)]  # noqa: E203
+    )
+    assert list(percentiles(prices, [0, 50, 100])) == [0.0, 101.0, 104.0]
+
+
+def test_ema_updates_incrementally():
+    ema = EMA(halflife=10)
+    h = history((0, 1.0, None), (10, 3.0, None))
+    assert ema.update_from(h) == pytest.approx(2.0)
+    # values already included are skipped
+    assert ema.update_from(h) == pytest.approx(2.0)
+    assert ema.update(2.0, h.timestamps[-1] + 20 * 10**9) == pytest.approx(2.0)
+    with pytest.raises(ValueError):
+        EMA(0)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compact", [True, False])
+async def test_history_statistic_source(compact):
+    prices = DataSource(compact_history=compact)
+    now = datetime_now_utc()
+    for seconds, price, volume in ((-7200, 100.0, 1.0), (-1800, 1.0, 1.0), (-900, 2.0, 3.0)):
+        prices.store_datapoint((price, now + timedelta(seconds=seconds)), weight=volume)
+
+    twap, _ = await HistoryStatisticSource(source=prices, statistic="twap").fetch_new_datapoint()
+    vwap, _ = await HistoryStatisticSource(source=prices, statistic="vwap").fetch_new_datapoint()
+    volatility = HistoryStatisticSource(source=prices, statistic="volatility", window=1000)
+
+    assert twap == pytest.approx((100 * 1800 + 1 * 900 + 2 * 900) / 3600, rel=1e-3)
+    assert vwap == pytest.approx(1.75)
+    assert await volatility.fetch_new_datapoint() == (None, None)
+    assert volatility.depth == 0
@@ -0,0 +1,154 @@
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.feeds.pls_usd_vwap import get_sources_objs
+from telliot_feeds.pricing import pair_graph
+from telliot_feeds.pricing import reserve_tracker
+from telliot_feeds.pricing.lp_snapshot import LPSnapshotReader
+from telliot_feeds.sources.price.spot import pulsechain_pulsex
+from telliot_feeds.sources.price.spot.pulsechain_pulsex import PulsechainPulseXService
+from telliot_feeds.sources.price.spot.twap_lp import TWAPLPSpotPriceService
+from telliot_feeds.sources.price_aggregator import PriceAggregator
+from tests.utils.rpc_stand_in import StandInChain
+
+USDT_PAIR = "0x322Df7921F28F1146Cdf62aFdaC0D6bC0Ab80711"
+USDC_PAIR = "0x6753560538ECa67617A9Ce605178F788bE7E524E"
+DAI_PAIR = "0xE56043671df55dE5CDf8459710433C10324DE0aE"
+MISSING = "0x0000000000000000000000000000000000000001"
+WPLS = "0xA1077a294dDE1B09bB078844df40758a5D0f9a27"
+DAI = "0xefD766cCb38EaF1dfd701853BFCe31359239F305"
+USDT = "0x0Cb6F5a34ad42ec934882A05265A7d5F59b51A2f"
+USDC = "0x15D38573d2feeb82e7ad5187aB8c1D52810B1f07"
+PERIOD = 1800
+
+
+@pytest.fixture
+def chain():
+    with StandInChain(block_number=123, timestamp=1700000000) as chain:
+        # 0.05 USD per PLS in each pair (6 decimals for USDT and USDC)
+        for token, decimals in ((WPLS, 18), (DAI, 18), (USDT, 6), (USDC, 6)):
+            chain.add_token(token, decimals)
+        price1 = PERIOD * 2**112 * 5 * 10**10 // 10**24
+        chain.add_pair(USDT_PAIR, 5 * 10**10, 10**24, price1=price1, tokens=(USDT, WPLS))
+        chain.add_pair(USDC_PAIR, 5 * 10**10, 10**24, price1=price1, tokens=(USDC, WPLS))
+        chain.add_pair(DAI_PAIR, 10**24, 5 * 10**22, price0=PERIOD * 2**112 // 20, tokens=(WPLS, DAI))
+        yield chain
+
+
+@pytest.fixture
+def reader(chain):
+    reader = LPSnapshotReader(chain.url)
+    with mock.patch("telliot_feeds.pricing.reserve_tracker.get_lp_reader", return_value=reader):
+        with mock.patch.dict(reserve_tracker._trackers, clear=True), mock.patch.dict(pair_graph._graphs, clear=True):
+            with mock.patch.dict(pair_graph._pair_tokens, clear=True):
+                with mock.patch.dict(pair_graph._decimals, clear=True):
+                    yield reader
+
+
+def test_snapshot_reads_all_pairs_in_one_call(chain, reader):
+    snapshot = reader.read_sync([DAI_PAIR.lower(), USDT_PAIR, MISSING])
+    assert chain.calls.count("eth_call") == 1
+    assert snapshot.block_number == 123
+    assert snapshot.timestamp == 1700000000
+    assert snapshot.pair(DAI_PAIR).reserve0 == 10**24
+    assert snapshot.pair(USDT_PAIR).price1_cumulative_last == PERIOD * 2**112 * 5 * 10**10 // 10**24
+    with pytest.raises(KeyError, match="missing from snapshot of block 123"):
+        snapshot.pair(MISSING)
+
+
+@pytest.mark.asyncio
+async def test_lp_sources_share_one_multicall(chain, reader, tmp_path):
+    pulsex = PulsechainPulseXService()
+    twap = TWAPLPSpotPriceService()
+    pulsex.url = twap.url = chain.url
+    twap.period = PERIOD
+    twap.prevPricesPath = tmp_path / "prevPricesCumulative.json"
+    twap.state_dir = tmp_path
+    twap.prevPricesPath.write_text(
+        json.dumps(
+            {
+                key: {"price0CumulativeLast": "0", "price1CumulativeLast": "0", "blockTimestampLast": "1699998200"}
+                for key in ("USDT/WPLS", "WPLS/DAI")
+            }
+        )
+    )
+    twap.isSourceInitialized = twap.isTwapServiceActive = True
+    twap.contract_addresses = {"usdt": USDT_PAIR, "usdc": USDC_PAIR, "dai": DAI_PAIR}
+    twap.lps_order = {"usdt": "usdt/wpls", "usdc": "usdc/wpls", "dai": "wpls/dai"}
+
+    with mock.patch.dict(pulsechain_pulsex.addrs, twap.contract_addresses):
+        with mock.patch.dict(pulsechain_pulsex.pls_lps_order, twap.lps_order):
+            # tokens and decimals of the pairs are read once, in two multicalls
+            await pair_graph.get_pair_graph(chain.url, pulsechain_pulsex.addrs.values()).load()
+            assert chain.calls.count("eth_call") == 2
+            datapoints = await asyncio.gather(
+                pulsex.get_price("pls", "usdt"),
+                pulsex.get_price("pls", "usdc"),
+                pulsex.get_price("pls", "dai"),
+                twap.get_price("pls", "usdt"),
+                twap.get_price("pls", "dai"),
+            )
+
+    for tracker in reserve_tracker._trackers.values():
+        tracker.close()
+    await asyncio.sleep(0)
+
+    assert chain.calls.count("eth_call") == 3
+    assert reader.calls == 1
+    for price, _, weight in datapoints[:3]:
+        assert price == pytest.approx(0.05, rel=1e-2)
+        # USD value locked, whatever the decimals of the stablecoin
+        assert weight == pytest.approx(10**5, rel=1e-2)
+    for price, _, weight in datapoints[3:]:
+        assert price == pytest.approx(0.05)
+        # same measure as the pair graph liquidity, from the same snapshot
+        assert weight == pytest.approx(10**5, rel=1e-2)
+
+
+@pytest.mark.asyncio
+async def test_pls_usd_vwap_refresh_rpc_calls(chain, reader, tmp_path):
+    """Benchmark: RPC calls per refresh of the pls_usd_vwap_feed aggregator"""
+    env = {
+        "PLS_CURRENCY_SOURCES": "usdt,usdc,dai",
+        "PLS_ADDR_SOURCES": ",".join((USDT_PAIR, USDC_PAIR, DAI_PAIR)),
+        "PLS_LPS_ORDER": "USDT/WPLS,USDC/WPLS,WPLS/DAI",
+        "LP_PULSE_NETWORK_URL": chain.url,
+        "TWAP_TIMESPAN": str(PERIOD),
+        "TWAP_STATE_DIR": str(tmp_path),
+        "RESERVE_POLL_INTERVAL": "3600",
+    }
+    # one Sync per pair and minute over the TWAP period, at 0.05 USD per PLS
+    for _ in range(PERIOD // 60 + 1):
+        chain.mine(seconds=60)
+        for address in (USDT_PAIR, USDC_PAIR):
+            chain.sync(address, 5 * 10**10, 10**24)
+        chain.sync(DAI_PAIR, 10**24, 5 * 10**22)
+
+    # the backfills of the three pairs start together and share one multicall, the
+    # reserve tracker reads each pair on its own, however far apart the backfills end
+    reader.batch_window = 0
+
+    with mock.patch.dict("os.environ", env):
+        feed = PriceAggregator(asset="pls", currency="usd", algorithm="weighted_average", sources=get_sources_objs())
+        for source in feed.sources:
+            # only the price reads are benchmarked, not the background sampling
+            source.service.isTwapServiceActive = True
+
+        startup, _ = await feed.fetch_new_datapoint()
+        calls = len(chain.calls)
+        price, _ = await feed.fetch_new_datapoint()
+        refresh_calls = len(chain.calls) - calls
+
+    for tracker in reserve_tracker._trackers.values():
+        tracker.close()
+    await asyncio.sleep(0)
+
+    assert startup == pytest.approx(0.05, rel=1e-3)
+    assert price == pytest.approx(0.05, rel=1e-3)
+    # one multicall for the backfills, then one per pair as the reserve tracker
+    # starts following it, later refreshes are served from memory
+    assert chain.calls.count("eth_call") == len(feed.sources) + 1
+    assert refresh_calls == 0
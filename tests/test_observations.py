@@ -0,0 +1,149 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.pricing import reserve_tracker
+from telliot_feeds.pricing.lp_snapshot import LPSnapshotReader
+from telliot_feeds.pricing.observation_journal import ObservationJournal
+from telliot_feeds.pricing.observation_journal import RECORD_SIZE
+from telliot_feeds.pricing.observations import Observation
+from telliot_feeds.pricing.observations import ObservationRing
+from telliot_feeds.sources.price.spot.twap_lp import TWAPLPSpotPriceService
+from tests.utils.rpc_stand_in import StandInChain
+
+DAI_PAIR = "0xE56043671df55dE5CDf8459710433C10324DE0aE"
+NOW = 1700000000
+Q112 = 2**112
+
+
+def test_ring_overwrites_oldest_observations():
+    ring = ObservationRing(3)
+    assert ring.latest() is None and ring.nearest(NOW) is None
+
+    for t in range(5):
+        assert ring.append(NOW + t * 10, t, -t)
+    assert not ring.append(NOW + 40, 0, 0)
+
+    assert len(ring) == 3
+    assert [o.timestamp for o in ring] == [NOW + 20, NOW + 30, NOW + 40]
+    assert ring.oldest() == Observation(NOW + 20, 2, -2)
+    assert ring.latest() == Observation(NOW + 40, 4, -4)
+
+
+def test_ring_nearest_observation():
+    ring = ObservationRing(8)
+    for t in (0, 10, 20, 60):
+        ring.append(NOW + t, t, t)
+
+    assert ring.nearest(NOW - 100).timestamp == NOW
+    assert ring.nearest(NOW + 14).timestamp == NOW + 10
+    assert ring.nearest(NOW + 15).timestamp == NOW + 10
+    assert ring.nearest(NOW + 16).timestamp == NOW + 20
+    assert ring.nearest(NOW + 45).timestamp == NOW + 60
+    assert ring.nearest(NOW + 1000).timestamp == NOW + 60
+
+
+@pytest.mark.asyncio
+async def test_twap_windows_served_from_observations(tmp_path):
+    # 0.2 USD per PLS for the first half hour, then 0.05
+    latest = 10 * 3600 * Q112
+    half_hour_ago = latest - 1800 * Q112 // 20
+    hour_ago = half_hour_ago - 1800 * Q112 // 5
+
+    with StandInChain(timestamp=NOW) as chain:
+        chain.add_pair(DAI_PAIR, 10**24, 5 * 10**22, price0=latest)
+        reader = LPSnapshotReader(chain.url)
+
+        twap = TWAPLPSpotPriceService()
+        twap.prevPricesPath = tmp_path / "prevPricesCumulative.json"
+        twap.state_dir = tmp_path
+        twap.isSourceInitialized = twap.isTwapServiceActive = True
+        twap.contract_addresses = {"dai": DAI_PAIR}
+        twap.lps_order = {"dai": "wpls/dai"}
+        ring = twap._get_observations("WPLS/DAI")
+        ring.append(NOW - 3600, hour_ago, 0)
+        ring.append(NOW - 1800, half_hour_ago, 0)
+
+        with mock.patch("telliot_feeds.pricing.reserve_tracker.get_lp_reader", return_value=reader):
+            with mock.patch.dict(reserve_tracker._trackers, clear=True):
+                half_hour, _, _ = await twap.get_twap("pls", "dai", 1800)
+                hour, _, _ = await twap.get_twap("pls", "dai", 3600)
+                for tracker in reserve_tracker._trackers.values():
+                    tracker.close()
+                await asyncio.sleep(0)
+
+    assert half_hour == pytest.approx(0.05)
+    assert hour == pytest.approx(0.125)
+    assert not twap.prevPricesPath.exists()
+
+
+def test_journal_survives_torn_and_corrupt_records(tmp_path):
+    path = tmp_path / "pair.twap"
+    journal = ObservationJournal(path)
+    observations = [Observation(NOW + t, t * Q112, 2**255 + t) for t in range(4)]
+    for observation in observations:
+        journal.append(observation)
+    journal.close()
+
+    # crash in the middle of writing a record
+    with open(path, "ab") as f:
+        f.write(b"\x00" * (RECORD_SIZE // 2))
+    assert ObservationJournal(path).load() == observations
+    assert path.stat().st_size == 8 + 4 * RECORD_SIZE
+
+    # flipped bit in the third record
+    data = bytearray(path.read_bytes())
+    data[8 + 2 * RECORD_SIZE + 5] ^= 1
+    path.write_bytes(bytes(data))
+    journal = ObservationJournal(path)
+    assert journal.load() == observations[:2]
+    assert journal.records == 2
+
+
+def test_journal_synced_once_per_batch(tmp_path):
+    journal = ObservationJournal(tmp_path / "pair.twap", max_records=3)
+    with mock.patch("os.fsync") as fsync:
+        for t in range(3):
+            journal.append(Observation(NOW + t, t, t))
+        assert fsync.call_count == 0
+        journal.sync()
+        journal.sync()
+        assert fsync.call_count == 1
+        assert journal.unsynced == 0
+
+        # the compacted file, then the directory it was renamed into
+        journal.compact([Observation(NOW + 2, 2, 2)])
+        assert fsync.call_count == 3
+
+
+def test_journal_compaction(tmp_path):
+    path = tmp_path / "pair.twap"
+    journal = ObservationJournal(path, max_records=3)
+    for t in range(4):
+        journal.append(Observation(NOW + t, t, t))
+    assert journal.needs_compaction()
+
+    journal.compact([Observation(NOW + 3, 3, 3)])
+    assert not journal.needs_compaction()
+    assert not (tmp_path / "pair.twap.tmp").exists()
+    journal.append(Observation(NOW + 4, 4, 4))
+    assert ObservationJournal(path).load() == [Observation(NOW + 3, 3, 3), Observation(NOW + 4, 4, 4)]
+
+
+def test_observations_reloaded_after_restart(tmp_path):
+    def service():
+        twap = TWAPLPSpotPriceService()
+        twap.state_dir = tmp_path
+        twap.max_observations = 4
+        twap.contract_addresses = {"dai": DAI_PAIR}
+        twap.lps_order = {"dai": "wpls/dai"}
+        return twap
+
+    twap = service()
+    for t in range(10):
+        twap._add_observation("WPLS/DAI", Observation(NOW + t, t, t))
+    assert twap._get_journal("WPLS/DAI").records <= 8
+
+    restarted = service()
+    assert [o.timestamp for o in restarted._get_observations("WPLS/DAI")] == [NOW + t for t in range(6, 10)]
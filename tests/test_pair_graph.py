@@ -0,0 +1,115 @@
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.pricing import pair_graph
+from telliot_feeds.pricing.lp_snapshot import LPSnapshotReader
+from telliot_feeds.pricing.pair_graph import get_amount_out
+from telliot_feeds.pricing.pair_graph import PairGraph
+from telliot_feeds.pricing.reserve_tracker import ReserveTracker
+from telliot_feeds.sources.price.spot import pulsex_graph
+from telliot_feeds.sources.price.spot.pulsex_graph import PulseXGraphService
+from tests.utils.rpc_stand_in import StandInChain
+
+WPLS = "0xA1077a294dDE1B09bB078844df40758a5D0f9a27"
+DAI = "0xefD766cCb38EaF1dfd701853BFCe31359239F305"
+USDC = "0x15D38573d2feeb82e7ad5187aB8c1D52810B1f07"
+PLSX = "0x95B303987A60C71504D99Aa1b13B4DA07b0790ab"
+HEX = "0x2b591e99afE9f32eAA6214f7B7629768c40Eeb39"
+
+WPLS_DAI = "0xE56043671df55dE5CDf8459710433C10324DE0aE"
+USDC_WPLS = "0x6753560538ECa67617A9Ce605178F788bE7E524E"
+PLSX_WPLS = "0x1b45b9148791d3a104184Cd5DFE5CE57193a3ee9"
+PLSX_DAI = "0xB2893ceA8080bF43b7b60B589EDaAb5211D98F23"
+HEX_PLSX = "0x19BB45a7270177e303DEe6eAA6F5Ad700812bA98"
+NOT_A_PAIR = "0x0000000000000000000000000000000000000001"
+PAIRS = [WPLS_DAI, USDC_WPLS, PLSX_WPLS, PLSX_DAI, HEX_PLSX, NOT_A_PAIR]
+
+
+@pytest.fixture
+def chain():
+    with StandInChain() as chain:
+        for token, decimals in ((WPLS, 18), (DAI, 18), (USDC, 6), (PLSX, 18), (HEX, 8)):
+            chain.add_token(token, decimals)
+        # 0.05 DAI per PLS, 0.01 PLS per PLSX, 10000 PLSX per HEX
+        chain.add_pair(WPLS_DAI, 10**24, 5 * 10**22, tokens=(WPLS, DAI))
+        chain.add_pair(USDC_WPLS, 10**9, 2 * 10**22, tokens=(USDC, WPLS))
+        chain.add_pair(PLSX_WPLS, 10**26, 10**24, tokens=(PLSX, WPLS))
+        chain.add_pair(HEX_PLSX, 10**11, 10**25, tokens=(HEX, PLSX))
+        # shallow pair quoting PLSX at twice its price
+        chain.add_pair(PLSX_DAI, 10**22, 10**19, tokens=(PLSX, DAI))
+        yield chain
+
+
+@pytest.fixture
+def tracker(chain, event_loop):
+    reader = LPSnapshotReader(chain.url, batch_window=0)
+    tracker = ReserveTracker(chain.url, poll_interval=3600)
+    with mock.patch("telliot_feeds.pricing.reserve_tracker.get_lp_reader", return_value=reader):
+        with mock.patch.object(pair_graph, "get_reserve_tracker", return_value=tracker):
+            with mock.patch.dict(pair_graph._pair_tokens, clear=True):
+                with mock.patch.dict(pair_graph._decimals, clear=True):
+                    yield tracker
+    tracker.close()
+
+
+def test_get_amount_out():
+    assert get_amount_out(10**18, 10**24, 5 * 10**22) == pytest.approx(0.05 * 0.997 * 10**18, rel=1e-5)
+    with pytest.raises(ValueError):
+        get_amount_out(10**18, 0, 10**18)
+
+
+@pytest.mark.asyncio
+async def test_prices_along_most_liquid_paths(chain, tracker):
+    snapshot = await PairGraph(chain.url, PAIRS).snapshot()
+    # tokens, decimals, then reserves
+    assert chain.calls.count("eth_call") == 3
+    assert NOT_A_PAIR not in snapshot.lp_snapshot.pairs
+
+    quotes = snapshot.best_quotes(DAI)
+    assert quotes[WPLS].price == pytest.approx(0.05, rel=1e-2)
+    assert quotes[USDC].price == pytest.approx(1.0, rel=1e-2)
+    assert quotes[USDC].liquidity == pytest.approx(2000, rel=1e-2)
+    assert quotes[PLSX].path == (PLSX_WPLS, WPLS_DAI)
+    assert quotes[PLSX].price == pytest.approx(0.0005, rel=1e-2)
+    assert quotes[PLSX].liquidity == pytest.approx(10**5, rel=1e-2)
+    assert quotes[HEX].path == (HEX_PLSX, PLSX_WPLS, WPLS_DAI)
+    assert quotes[HEX].price == pytest.approx(5, rel=2e-2)
+    assert snapshot.price(PLSX, DAI) is quotes[PLSX]
+
+    # metadata is not read again
+    snapshot = await PairGraph(chain.url, PAIRS).snapshot()
+    assert chain.calls.count("eth_call") == 3
+
+
+@pytest.mark.asyncio
+async def test_quote_along_route(chain, tracker):
+    graph = PairGraph(chain.url, PAIRS, max_hops=2)
+    snapshot = await graph.snapshot()
+
+    assert snapshot.quote([PLSX, DAI]).price == pytest.approx(0.001, rel=1e-2)
+    assert snapshot.quote([PLSX, WPLS, DAI]).path == (PLSX_WPLS, WPLS_DAI)
+    assert snapshot.quote([WPLS, PLSX]).price == pytest.approx(100, rel=1e-2)
+    assert graph.label_tokens(USDC_WPLS, "USDC/WPLS") == {"usdc": USDC, "wpls": WPLS}
+    with pytest.raises(KeyError):
+        snapshot.quote([USDC, DAI])
+    # PLSX is reached in two hops through WPLS, HEX only in two through the shallow PLSX/DAI pair
+    assert snapshot.price(PLSX, DAI).path == (PLSX_WPLS, WPLS_DAI)
+    hex_dai = snapshot.price(HEX, DAI)
+    assert hex_dai.path == (HEX_PLSX, PLSX_DAI)
+    assert hex_dai.price == pytest.approx(10, rel=2e-2)
+
+
+@pytest.mark.asyncio
+async def test_graph_source_prices_configured_tokens(chain, tracker):
+    service = PulseXGraphService()
+    service.url = chain.url
+    with mock.patch.object(pulsex_graph, "pairs", PAIRS):
+        with mock.patch.dict(pulsex_graph.tokens, {"hex": HEX, "dai": DAI}):
+            price, timestamp, liquidity = await service.get_price("HEX", "DAI")
+            assert await service.get_price("plsx", "dai") == (None, None)
+
+    assert price == pytest.approx(5, rel=2e-2)
+    assert timestamp == chain.timestamp
+    # HEX/PLSX is the shallowest pair of the path
+    assert liquidity == pytest.approx(10**4, rel=1e-2)
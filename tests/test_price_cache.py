@@ -0,0 +1,82 @@
+import asyncio
+from dataclasses import dataclass
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.datafeed import DataFeed
+from telliot_feeds.datasource import DataSource
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.pricing.price_cache import get_price_cache
+from telliot_feeds.pricing.price_cache import parse_max_ages
+from telliot_feeds.pricing.price_cache import PriceCache
+from telliot_feeds.pricing.price_cache import reset_price_cache
+from telliot_feeds.queries.price.spot_price import SpotPrice
+
+
+@dataclass
+class CountingSource(DataSource[float]):
+    """Returns 1.0, 2.0, ... or None while `fail` is set"""
+
+    fetches: int = 0
+    fail: bool = False
+
+    async def fetch_new_datapoint(self):
+        self.fetches += 1
+        await asyncio.sleep(0.01)
+        if self.fail:
+            return None, None
+        return float(self.fetches), datetime_now_utc()
+
+
+def feed(asset="ETH"):
+    return DataFeed(query=SpotPrice(asset=asset, currency="USD"), source=CountingSource())
+
+
+def test_parse_max_ages(caplog):
+    assert parse_max_ages(" PLS/usd=30, fetch/usd=120.5,") == {"pls/usd": 30.0, "fetch/usd": 120.5}
+    assert PriceCache(max_age=5, max_ages={"eth/usd": 1}).max_age_of(feed()) == 1
+    assert PriceCache(max_age=5, max_ages={}).max_age_of(feed("FETCH")) == 5
+    # zero disables caching rather than falling back to the default
+    assert PriceCache(max_age=0, max_ages={}).max_age_of(feed()) == 0
+
+    # malformed entries are logged and skipped instead of failing profitability checks
+    with mock.patch.dict(
+        "os.environ", {"PRICE_CACHE_MAX_AGES": "pls/usd=30,eth/usd,btc/usd=soon", "PRICE_CACHE_MAX_AGE": "x"}
+    ):
+        cache = PriceCache()
+    assert (cache.max_ages, cache.max_age) == ({"pls/usd": 30.0}, 60.0)
+    assert "'eth/usd'" in caplog.text and "'btc/usd=soon'" in caplog.text and "'x'" in caplog.text
+
+
+def test_reset_price_cache():
+    cache = get_price_cache()
+    assert get_price_cache() is cache
+    reset_price_cache()
+    assert get_price_cache() is not cache
+
+
+@pytest.mark.asyncio
+async def test_cached_price_refreshed_ahead_and_expired():
+    eth = feed()
+    cache = PriceCache(max_age=0.3, max_ages={}, refresh_ahead=0.5)
+
+    # concurrent callers share one fetch
+    assert await asyncio.gather(cache.price(eth), cache.price(eth), cache.price(eth)) == [1.0, 1.0, 1.0]
+    assert await cache.price(eth) == 1.0
+    assert eth.source.fetches == 1
+    assert (cache.hits, cache.misses) == (1, 3)
+
+    # past the refresh-ahead age, the cached price is returned and fetched again in the background
+    await asyncio.sleep(0.2)
+    assert await cache.price(eth) == 1.0
+    await asyncio.sleep(0.05)
+    assert eth.source.fetches == 2
+    assert await cache.price(eth) == 2.0
+
+    # a failed refresh keeps the price until it expires
+    eth.source.fail = True
+    await asyncio.sleep(0.2)
+    assert await cache.price(eth) == 2.0
+    await asyncio.sleep(0.15)
+    assert await cache.price(eth) is None
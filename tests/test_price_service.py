@@ -1,28 +1,265 @@
-from unittest import mock
+import asyncio
+import time
 
 import pytest
-import requests
+from aiohttp import web
 
+from telliot_feeds.pricing.http_transport import HTTPTransport
 from telliot_feeds.pricing.price_service import WebPriceService
+from telliot_feeds.pricing.rate_limit import parse_rate_limits
+from telliot_feeds.pricing.rate_limit import parse_retry_after
+from telliot_feeds.pricing.rate_limit import RateLimiter
+from telliot_feeds.pricing.response_cache import ResponseCache
+
+
+class FakePriceService(WebPriceService):
+    """Must implement get_price or NotImplementedError will be raised"""
+
+    async def get_price(self, asset, currency):
+        return None, None
+
+
+async def start_server(routes):
+    """Start a local HTTP server and return its runner and base url"""
+    app = web.Application()
+    app.add_routes(routes)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+async def slow(request):
+    await asyncio.sleep(0.3)
+    return web.json_response({"price": 1.0})
+
+
+async def bad_json(request):
+    return web.Response(text="<html>not json</html>")
+
+
+async def echo(request):
+    return web.json_response({"body": await request.json(), "peer": request.transport.get_extra_info("peername")})
 
 
 @pytest.mark.asyncio
 async def test_webpriceservice_errors(caplog):
     """ "Test failures of WebPriceService class"""
+    runner, url = await start_server([web.get("/bad", bad_json), web.get("/slow", slow)])
+    transport = HTTPTransport()
+    try:
+        wsp = FakePriceService(name="FakePriceService", url=url, timeout=0.1, transport=transport)
 
-    class FakePriceService(WebPriceService):
-        """Must implement get_price or NotImplementedError will be raised"""
+        result = await wsp.get_url("/bad")
+        assert "error" in result
+        assert "JSON Decode Error" == result["error"]
+        assert result["status"] == 200
 
-        async def get_price(self, asset, currency):
-            return None, None
+        result = await wsp.get_url("/slow")
+        assert "Timeout Error" == result["error"]
 
-    def json_decode_error(*args, **kwargs):
-        """Override get method and raise JSONDecodeError"""
-        raise requests.exceptions.JSONDecodeError("JSON Decode Error", "", 0)
+        wsp.url = "http://127.0.0.1:1"
+        result = await wsp.get_url("/")
+        assert "error" in result
+        assert "exception" in result
+    finally:
+        await transport.close()
+        await runner.cleanup()
 
-    with mock.patch("requests.Session.get", side_effect=json_decode_error):
-        wsp = FakePriceService(name="FakePriceService", url="https://fakeurl.xyz")
-        result = wsp.get_url()
 
-        assert "error" in result
-        assert "JSON Decode Error" == result["error"]
+@pytest.mark.asyncio
+async def test_webpriceservice_concurrent_pooled_requests():
+    """Gathered requests run concurrently and reuse pooled connections"""
+    runner, url = await start_server([web.get("/slow", slow), web.post("/echo", echo)])
+    transport = HTTPTransport()
+    try:
+        services = [
+            FakePriceService(name=f"svc{i}", url=url, transport=transport, cache_ttl=0, cache=ResponseCache())
+            for i in range(5)
+        ]
+
+        start = time.monotonic()
+        results = await asyncio.gather(*[s.get_url(f"/slow?i={i}") for i, s in enumerate(services)])
+        elapsed = time.monotonic() - start
+
+        assert all(r["response"] == {"price": 1.0} for r in results)
+        # five 0.3s requests cost one round-trip, not the sum
+        assert elapsed < 1.0
+
+        first = await services[0].post_url("/echo", json_data={"query": "q"})
+        second = await services[1].post_url("/echo", json_data={"query": "q"})
+        assert first["response"]["body"] == {"query": "q"}
+        # same keep-alive connection
+        assert first["response"]["peer"] == second["response"]["peer"]
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_webpriceservice_cache_and_coalescing():
+    """Identical requests share one in-flight fetch and are served from cache"""
+    calls = []
+
+    async def counted(request):
+        calls.append(request.path)
+        await asyncio.sleep(0.1)
+        return web.json_response({"price": len(calls)})
+
+    async def limited(request):
+        return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "0"})
+
+    runner, url = await start_server(
+        [web.get("/price", counted), web.get("/bad", bad_json), web.get("/limited", limited)]
+    )
+    transport = HTTPTransport(max_retries=0)
+    cache = ResponseCache(maxsize=2)
+    try:
+        a = FakePriceService(name="a", url=url, transport=transport, cache=cache, cache_ttl=60)
+        b = FakePriceService(name="b", url=url, transport=transport, cache=cache, cache_ttl=60)
+
+        results = await asyncio.gather(a.get_url("/price"), b.get_url("/price"), a.get_url("/price"))
+        assert len(calls) == 1
+        assert all(r["response"] == {"price": 1} for r in results)
+        assert cache.stats["misses"] == 1
+        assert cache.stats["coalesced"] == 2
+
+        assert (await b.get_url("/price"))["response"] == {"price": 1}
+        assert len(calls) == 1
+        assert cache.stats["hits"] == 1
+
+        # callers get their own copy
+        results[0]["response"]["price"] = 100
+        assert (await b.get_url("/price"))["response"] == {"price": 1}
+
+        # errors and non-2xx responses are not cached
+        await a.get_url("/bad")
+        await a.get_url("/bad")
+        assert cache.stats["misses"] == 3
+        assert (await a.get_url("/limited"))["status"] == 429
+        assert (await a.get_url("/limited"))["status"] == 429
+        assert cache.stats["misses"] == 5
+
+        # LRU eviction
+        await a.get_url("/price?x=1")
+        await a.get_url("/price?x=2")
+        assert len(cache) == 2
+        await a.get_url("/price")
+        assert len(calls) == 4
+
+        # expired entries are fetched again
+        a.cache_ttl = 0
+        await a.get_url("/price?x=3")
+        await a.get_url("/price?x=3")
+        assert len(calls) == 6
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_pacing():
+    """Requests beyond the burst are paced at the configured rate"""
+    limiter = RateLimiter({"api.example.com": (5, 0.5)})
+
+    start = time.monotonic()
+    await asyncio.gather(*[limiter.acquire("api.example.com") for _ in range(10)])
+    elapsed = time.monotonic() - start
+
+    # 5 burst tokens, then 5 more at 10 per second
+    assert 0.4 < elapsed < 1.0
+    stats = limiter.stats["api.example.com"]
+    assert stats["acquired"] == 10
+    assert stats["max_queue_depth"] == 5
+    assert stats["throttled"] == 5
+    assert stats["queued"] == 0
+
+    # unlisted hosts are not paced
+    await asyncio.gather(*[limiter.acquire("other.example.com") for _ in range(100)])
+    assert limiter.stats["other.example.com"]["throttled"] == 0
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits("a.com=30/60, b.com=5/1") == {"a.com": (30.0, 60.0), "b.com": (5.0, 1.0)}
+    assert parse_rate_limits("") == {}
+    with pytest.raises(ValueError):
+        parse_rate_limits("a.com:30")
+
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+
+
+@pytest.mark.asyncio
+async def test_transport_retry_after():
+    """A 429 blocks the host for its Retry-After delay and is retried within the deadline"""
+    calls = []
+
+    async def limited(request):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            return web.json_response({"error": "slow down"}, status=429, headers={"Retry-After": "0.3"})
+        return web.json_response({"price": 1.0})
+
+    runner, url = await start_server([web.get("/price", limited)])
+    limiter = RateLimiter({})
+    transport = HTTPTransport(rate_limiter=limiter)
+    try:
+        result = await transport.get(url + "/price", timeout=2.0)
+        assert result["response"] == {"price": 1.0}
+        assert len(calls) == 2
+        assert calls[1] - calls[0] >= 0.3
+        assert limiter.stats["127.0.0.1"]["rate_limited"] == 1
+
+        # the retry does not fit in the deadline: the 429 response is returned
+        calls.clear()
+        result = await transport.get(url + "/price", timeout=0.2)
+        assert result["status"] == 429
+        assert len(calls) == 1
+    finally:
+        await transport.close()
+        await runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesced_request_survives_cancelled_leader():
+    """Callers sharing a fetch are not cancelled with the caller that started it"""
+    cache = ResponseCache()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return {"response": len(calls)}
+
+    leader = asyncio.ensure_future(cache.get_or_fetch("key", 0, fetch))
+    await asyncio.sleep(0)
+    follower = asyncio.ensure_future(cache.get_or_fetch("key", 0, fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+
+    assert await follower == {"response": 2}
+    assert leader.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_cache_coalesced_request_isolated_from_leader():
+    """The caller that started a fetch modifying its response does not change what waiters see"""
+    cache = ResponseCache()
+
+    async def fetch():
+        await asyncio.sleep(0.1)
+        return {"response": {"price": 1}}
+
+    async def leader():
+        result = await cache.get_or_fetch("key", 60, fetch)
+        result["response"]["price"] = 100
+        return result
+
+    results = await asyncio.gather(leader(), cache.get_or_fetch("key", 60, fetch))
+    assert results[0]["response"] == {"price": 100}
+    assert results[1]["response"] == {"price": 1}
+    assert (await cache.get_or_fetch("key", 60, fetch))["response"] == {"price": 1}
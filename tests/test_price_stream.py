@@ -0,0 +1,158 @@
+import asyncio
+import json
+from unittest import mock
+
+import pytest
+import websockets
+
+from telliot_feeds.dtypes.datapoint import datetime_now_utc
+from telliot_feeds.sources.price.spot.binance import BinanceSpotPriceService
+from telliot_feeds.sources.price.spot.binance import BinanceStreamingPriceService
+from telliot_feeds.sources.price.spot.binance import BinanceStreamingPriceSource
+from telliot_feeds.sources.price.spot.coinbase import CoinbaseStreamingPriceService
+from telliot_feeds.sources.price.spot.gemini import GeminiStreamingPriceService
+from telliot_feeds.sources.price.spot.kraken import KrakenStreamingPriceService
+
+
+class StandInExchange:
+    """Local WebSocket server recording subscriptions and pushing messages"""
+
+    def __init__(self, on_subscribe=()):
+        self.on_subscribe = list(on_subscribe)
+        self.subscriptions = []
+        self.connections = []
+
+    async def handler(self, ws, path):
+        self.connections.append(ws)
+        async for raw in ws:
+            self.subscriptions.append(json.loads(raw))
+            if ws is self.connections[0]:
+                for message in self.on_subscribe:
+                    await ws.send(json.dumps(message))
+
+    async def push(self, message):
+        await self.connections[-1].send(json.dumps(message))
+        await asyncio.sleep(0.05)
+
+    async def __aenter__(self):
+        self.server = await websockets.serve(self.handler, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self
+
+    async def __aexit__(self, *exc):
+        self.server.close()
+        await self.server.wait_closed()
+
+
+def trade(price):
+    return {"e": "trade", "s": "ETHUSDT", "p": price}
+
+
+@pytest.mark.asyncio
+async def test_streamed_prices_are_read_from_book():
+    async with StandInExchange(on_subscribe=[{"result": None, "id": 1}, trade("1800.50")]) as exchange:
+        service = BinanceStreamingPriceService(ws_url=exchange.url, rest_fallback=False, reconnect_delay=0.01)
+        source = BinanceStreamingPriceSource(asset="eth", currency="usdt")
+        source.service = service
+        try:
+            v, t = await source.fetch_new_datapoint()
+            assert v == 1800.5
+            assert t is not None
+            assert exchange.subscriptions == [{"method": "SUBSCRIBE", "params": ["ethusdt@trade"], "id": 1}]
+
+            await exchange.push(trade("1801"))
+            assert (await source.fetch_new_datapoint())[0] == 1801.0
+            assert len(exchange.subscriptions) == 1
+
+            # subscribing to another market reuses the connection
+            await exchange.push({"e": "trade", "s": "BTCUSDT", "p": "30000"})
+            btc = asyncio.ensure_future(service.get_price("btc", "usdt"))
+            await asyncio.sleep(0.05)
+            await exchange.push({"e": "trade", "s": "BTCUSDT", "p": "30001"})
+            assert (await btc)[0] == 30001.0
+            assert exchange.subscriptions[-1]["params"] == ["btcusdt@trade"]
+            assert len(exchange.connections) == 1
+
+            # resubscribes after a dropped connection
+            await exchange.connections[0].close()
+            await asyncio.sleep(0.2)
+            assert service.reconnects == 1
+            assert exchange.subscriptions[-1]["params"] == ["btcusdt@trade", "ethusdt@trade"]
+            await exchange.push(trade("1802"))
+            assert (await source.fetch_new_datapoint())[0] == 1802.0
+        finally:
+            await service.close()
+
+
+@pytest.mark.asyncio
+async def test_stale_stream_falls_back_to_rest():
+    async def rest_price(self, asset, currency):
+        return 1700.0, datetime_now_utc()
+
+    async with StandInExchange(on_subscribe=[trade("1800")]) as exchange:
+        service = BinanceStreamingPriceService(ws_url=exchange.url, max_age=0.1, rest_fallback=False)
+        try:
+            assert (await service.get_price("eth", "usdt"))[0] == 1800.0
+            await asyncio.sleep(0.15)
+            assert await service.get_price("eth", "usdt") == (None, None)
+
+            service.rest_fallback = True
+            with mock.patch.object(BinanceSpotPriceService, "get_price", rest_price):
+                assert (await service.get_price("eth", "usdt"))[0] == 1700.0
+        finally:
+            await service.close()
+
+    # nothing streamed during warm-up
+    async with StandInExchange() as exchange:
+        service = BinanceStreamingPriceService(ws_url=exchange.url, warmup_timeout=0.1)
+        try:
+            with mock.patch.object(BinanceSpotPriceService, "get_price", rest_price):
+                assert (await service.get_price("eth", "usdt"))[0] == 1700.0
+        finally:
+            await service.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "service_class, pair, subscription, message, price",
+    [
+        (
+            CoinbaseStreamingPriceService,
+            ("eth", "usd"),
+            {"type": "subscribe", "product_ids": ["ETH-USD"], "channels": ["ticker"]},
+            {"type": "ticker", "product_id": "ETH-USD", "price": "1800.01"},
+            1800.01,
+        ),
+        (
+            KrakenStreamingPriceService,
+            ("xbt", "usd"),
+            {"event": "subscribe", "pair": ["XBT/USD"], "subscription": {"name": "ticker"}},
+            [340, {"a": ["30001", 0, "1"], "b": ["29999", 0, "1"], "c": ["30000.5", "0.1"]}, "ticker", "XBT/USD"],
+            30000.5,
+        ),
+        (
+            GeminiStreamingPriceService,
+            ("eth", "usd"),
+            {"type": "subscribe", "subscriptions": [{"name": "l2", "symbols": ["ETHUSD"]}]},
+            {
+                "type": "l2_updates",
+                "symbol": "ETHUSD",
+                "changes": [],
+                "trades": [
+                    {"type": "trade", "symbol": "ETHUSD", "price": "1799", "timestamp": 2},
+                    {"type": "trade", "symbol": "ETHUSD", "price": "1798", "timestamp": 1},
+                ],
+            },
+            1799.0,
+        ),
+    ],
+)
+async def test_exchange_stream_formats(service_class, pair, subscription, message, price):
+    async with StandInExchange(on_subscribe=[{"event": "heartbeat"}, message]) as exchange:
+        service = service_class(ws_url=exchange.url, rest_fallback=False)
+        try:
+            assert (await service.get_price(*pair))[0] == price
+            assert exchange.subscriptions == [subscription]
+        finally:
+            await service.close()
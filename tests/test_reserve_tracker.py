@@ -0,0 +1,137 @@
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.pricing import pair_graph
+from telliot_feeds.pricing import reserve_tracker
+from telliot_feeds.pricing.lp_snapshot import LPSnapshotReader
+from telliot_feeds.pricing.reserve_tracker import ReserveTracker
+from telliot_feeds.pricing.web3_pool import Web3Pool
+from telliot_feeds.sources.price.spot import pulsechain_pulsex
+from telliot_feeds.sources.price.spot.pulsechain_pulsex import PulsechainPulseXService
+from tests.utils.rpc_stand_in import StandInChain
+
+DAI_PAIR = "0xE56043671df55dE5CDf8459710433C10324DE0aE"
+USDT_PAIR = "0x322Df7921F28F1146Cdf62aFdaC0D6bC0Ab80711"
+WPLS = "0xA1077a294dDE1B09bB078844df40758a5D0f9a27"
+DAI = "0xefD766cCb38EaF1dfd701853BFCe31359239F305"
+
+
+@pytest.fixture
+def chain():
+    with StandInChain(block_number=200, timestamp=1700000000) as chain:
+        chain.add_token(WPLS)
+        chain.add_token(DAI)
+        chain.add_pair(DAI_PAIR, 10**24, 5 * 10**22, tokens=(WPLS, DAI))
+        chain.add_pair(USDT_PAIR, 5 * 10**10, 10**24)
+        yield chain
+
+
+@pytest.fixture
+def tracker(chain, event_loop):
+    reader = LPSnapshotReader(chain.url, batch_window=0)
+    tracker = ReserveTracker(chain.url, poll_interval=3600)
+    with mock.patch("telliot_feeds.pricing.reserve_tracker.get_lp_reader", return_value=reader):
+        yield tracker
+    tracker.close()
+
+
+def assert_tracks(chain, snapshot, address):
+    reserve0, reserve1, timestamp = chain.pairs[address]["reserves"]
+    pair = snapshot.pair(address)
+    assert (pair.reserve0, pair.reserve1, pair.block_timestamp_last) == (reserve0, reserve1, timestamp)
+    assert pair.price0_cumulative_last == chain.pairs[address]["price0"]
+    assert pair.price1_cumulative_last == chain.pairs[address]["price1"]
+
+
+@pytest.mark.asyncio
+async def test_tracker_applies_sync_events(chain, tracker):
+    await tracker.snapshot([DAI_PAIR, USDT_PAIR])
+    assert chain.calls.count("eth_call") == 1
+
+    for i in range(3):
+        chain.mine()
+        chain.sync(DAI_PAIR, 10**24 + i * 10**20, 5 * 10**22 - i * 10**18)
+        chain.mine()
+        chain.sync(USDT_PAIR, 5 * 10**10 + i, 10**24 - i)
+        chain.sync(USDT_PAIR, 5 * 10**10 + 2 * i, 10**24 - 2 * i)
+        await tracker.poll()
+    chain.mine(blocks=3)
+    await tracker.poll()
+
+    calls = len(chain.calls)
+    snapshot = await tracker.snapshot([DAI_PAIR, USDT_PAIR])
+    assert len(chain.calls) == calls
+    assert chain.calls.count("eth_call") == 1
+    assert (snapshot.block_number, snapshot.timestamp) == (chain.block_number, chain.timestamp)
+    assert_tracks(chain, snapshot, DAI_PAIR)
+    assert_tracks(chain, snapshot, USDT_PAIR)
+
+
+@pytest.mark.asyncio
+async def test_tracker_reads_again_after_reorg_or_gap(chain, tracker):
+    await tracker.snapshot([DAI_PAIR])
+    chain.mine()
+    await tracker.poll()
+    assert tracker.resyncs == 1
+
+    chain.reorg()
+    chain.sync(DAI_PAIR, 2 * 10**24, 10**22)
+    chain.mine()
+    await tracker.poll()
+    assert tracker.resyncs == 2
+    assert_tracks(chain, await tracker.snapshot([DAI_PAIR]), DAI_PAIR)
+
+    chain.mine(blocks=tracker.max_gap + 1)
+    await tracker.poll()
+    assert tracker.resyncs == 3
+    assert tracker.block_number == chain.block_number
+
+
+@pytest.mark.asyncio
+async def test_poll_dropped_when_pairs_read_meanwhile(chain, tracker):
+    await tracker.snapshot([DAI_PAIR])
+    reader = reserve_tracker.get_lp_reader(chain.url)
+    # The USDT pair, read at the same block by a resync that ends while the poll waits for logs
+    late = await reader.read([USDT_PAIR])
+    chain.mine()
+    chain.sync(USDT_PAIR, 6 * 10**10, 9 * 10**23)
+
+    run = Web3Pool.run
+
+    async def resync_before_logs(pool, url, fn, *args):
+        if args and isinstance(args[0], dict) and "topics" in args[0]:
+            with mock.patch.object(reader, "read", mock.AsyncMock(return_value=late)):
+                await tracker.resync()
+        return await run(pool, url, fn, *args)
+
+    with mock.patch.object(Web3Pool, "run", resync_before_logs):
+        await tracker.poll()
+    assert tracker.block_number == late.block_number
+
+    await tracker.poll()
+    snapshot = await tracker.snapshot([DAI_PAIR, USDT_PAIR])
+    assert snapshot.block_number == chain.block_number
+    assert_tracks(chain, snapshot, DAI_PAIR)
+    assert_tracks(chain, snapshot, USDT_PAIR)
+
+
+@pytest.mark.asyncio
+async def test_pulsex_prices_served_from_memory(chain, tracker):
+    pulsex = PulsechainPulseXService()
+    pulsex.url = chain.url
+    with mock.patch.object(pair_graph, "get_reserve_tracker", return_value=tracker):
+        with mock.patch.dict(pair_graph._pair_tokens, clear=True), mock.patch.dict(pair_graph._decimals, clear=True):
+            with mock.patch.dict(pulsechain_pulsex.addrs, {"dai": DAI_PAIR}):
+                with mock.patch.dict(pulsechain_pulsex.pls_lps_order, {"dai": "wpls/dai"}):
+                    price, _, _ = await pulsex.get_price("pls", "dai")
+                    assert price == pytest.approx(0.05, rel=1e-2)
+
+                    chain.mine()
+                    chain.sync(DAI_PAIR, 10**24, 10**23)
+                    await tracker.poll()
+                    calls = len(chain.calls)
+                    price, _, _ = await pulsex.get_price("pls", "dai")
+
+    assert price == pytest.approx(0.1, rel=1e-2)
+    assert len(chain.calls) == calls
@@ -0,0 +1,81 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from telliot_feeds.pricing.lp_snapshot import LPSnapshotReader
+from telliot_feeds.pricing.observations import Observation
+from telliot_feeds.pricing.sync_backfill import SyncBackfill
+from telliot_feeds.sources.price.spot.twap_lp import TWAPLPSpotPriceService
+from tests.utils.rpc_stand_in import StandInChain
+
+DAI_PAIR = "0xE56043671df55dE5CDf8459710433C10324DE0aE"
+OTHER_PAIR = "0x6753560538ECa67617A9Ce605178F788bE7E524E"
+PERIOD = 3600
+
+
+@pytest.fixture
+def chain():
+    with StandInChain(block_number=5000, timestamp=1700000000) as chain:
+        chain.add_pair(DAI_PAIR, 10**24, 5 * 10**22)
+        chain.add_pair(OTHER_PAIR, 10**24, 10**24)
+        chain.history = []
+        # two hours of trades, one every 50 blocks (500 seconds)
+        for i in range(15):
+            chain.mine(blocks=50)
+            chain.sync(DAI_PAIR, 10**24 + i * 10**21, 5 * 10**22 - i * 10**20)
+            if i % 2:
+                chain.sync(OTHER_PAIR, 10**24, 10**24 + i)
+            pair = chain.pairs[DAI_PAIR]
+            chain.history.append(Observation(chain.timestamp, pair["price0"], pair["price1"]))
+        chain.mine(blocks=20)
+        with mock.patch("telliot_feeds.pricing.sync_backfill.get_lp_reader", return_value=LPSnapshotReader(chain.url)):
+            yield chain
+
+
+@pytest.mark.asyncio
+async def test_backfill_rebuilds_exact_cumulative_prices(chain):
+    chain.max_log_range = 64
+    backfill = SyncBackfill(chain.url, chunk_size=1000)
+
+    observations = await backfill.observations(DAI_PAIR, PERIOD)
+
+    assert observations[0].timestamp <= chain.timestamp - PERIOD
+    assert observations == [o for o in chain.history if o.timestamp >= observations[0].timestamp]
+    assert len(observations) < len(chain.history)
+
+
+@pytest.mark.asyncio
+async def test_backfill_looks_further_back_for_quiet_pairs(chain):
+    observations = await SyncBackfill(chain.url).observations(DAI_PAIR, 4 * PERIOD)
+    assert observations == chain.history
+
+
+@pytest.mark.asyncio
+async def test_twap_available_right_after_startup(chain, tmp_path, monkeypatch):
+    monkeypatch.setenv("PLS_CURRENCY_SOURCES", "dai")
+    monkeypatch.setenv("PLS_ADDR_SOURCES", DAI_PAIR)
+    monkeypatch.setenv("PLS_LPS_ORDER", "WPLS/DAI")
+    twap = TWAPLPSpotPriceService()
+    twap.url = chain.url
+    twap.period = PERIOD
+    twap.prevPricesPath = tmp_path / "prevPricesCumulative.json"
+    twap.state_dir = tmp_path
+
+    reader = LPSnapshotReader(chain.url)
+    with mock.patch("telliot_feeds.pricing.reserve_tracker.get_lp_reader", return_value=reader):
+        with mock.patch.dict("telliot_feeds.pricing.reserve_tracker._trackers", clear=True):
+            price, _, _ = await asyncio.wait_for(twap.get_price("pls", "dai"), 5)
+
+    for task in asyncio.all_tasks():
+        if task is not asyncio.current_task():
+            task.cancel()
+
+    start = twap.observations["WPLS/DAI"].nearest(chain.timestamp - PERIOD)
+    latest = chain.pairs[DAI_PAIR]
+    reserve0, reserve1, _ = latest["reserves"]
+    # exact average over the window, the current reserves filling the time since the last trade
+    expected = (latest["price0"] - start.price0_cumulative) / 2**112 + (chain.timestamp - latest["reserves"][2]) * (
+        reserve1 / reserve0
+    )
+    assert price == pytest.approx(expected / (chain.timestamp - start.timestamp), rel=1e-9)
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+import pytest
+
+from telliot_feeds.pricing.web3_pool import Web3Pool
+from tests.utils.rpc_stand_in import StandInChain
+
+PAIR = "0x322Df7921F28F1146Cdf62aFdaC0D6bC0Ab80711"
+ABI = [
+    {
+        "inputs": [],
+        "name": "getReserves",
+        "outputs": [
+            {"name": "reserve0", "type": "uint112"},
+            {"name": "reserve1", "type": "uint112"},
+            {"name": "blockTimestampLast", "type": "uint32"},
+        ],
+        "stateMutability": "view",
+        "type": "function",
+    }
+]
+
+
+@pytest.fixture
+def chain():
+    with StandInChain() as chain:
+        chain.add_pair(PAIR, 10**24, 5 * 10**22, 1700000000)
+        yield chain
+
+
+def test_pool_reuses_connections_and_contracts(chain):
+    pool = Web3Pool()
+
+    contracts = [pool.contract(chain.url, PAIR, ABI) for _ in range(3)]
+    assert contracts[0] is contracts[1] is contracts[2]
+    assert pool.web3(chain.url) is pool.web3(chain.url)
+
+    for contract in contracts:
+        assert contract.functions.getReserves().call() == [10**24, 5 * 10**22, 1700000000]
+
+    stats = pool.stats()
+    # one eth_chainId, then eth_call only
+    assert chain.calls == ["eth_chainId", "eth_call", "eth_call", "eth_call"]
+    assert stats["endpoints"][chain.url] == {"requests": 4, "connections": 1, "reused": 3}
+    assert stats["contracts"] == 1
+    assert stats["contract_hits"] == 2
+    assert stats["contract_misses"] == 1
+
+    pool.clear()
+    assert pool.stats()["endpoints"] == {}
+
+
+@pytest.mark.asyncio
+async def test_blocking_calls_run_concurrently(chain):
+    async def gather_calls(pool):
+        contract = pool.contract(chain.url, PAIR, ABI)
+        # warm up the chain id cache
+        await pool.run(chain.url, contract.functions.getReserves().call)
+
+        chain.delay = 0.3
+        start = time.monotonic()
+        results = await asyncio.gather(*[pool.run(chain.url, contract.functions.getReserves().call) for _ in range(3)])
+        elapsed = time.monotonic() - start
+        chain.delay = 0.0
+        assert all(r[0] == 10**24 for r in results)
+        pool.clear()
+        return elapsed
+
+    assert await gather_calls(Web3Pool()) < 0.6
+    # limited to one call in flight per endpoint
+    assert await gather_calls(Web3Pool(max_concurrency=1)) >= 0.9
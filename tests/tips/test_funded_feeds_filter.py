@@ -0,0 +1,49 @@
+from eth_abi import encode_single
+
+from telliot_feeds.reporters.tips.listener.dtypes import FeedDetails
+from telliot_feeds.reporters.tips.listener.dtypes import QueryIdandFeedDetails
+from telliot_feeds.reporters.tips.listener.dtypes import Values
+from telliot_feeds.reporters.tips.listener.funded_feeds_filter import FundedFeedFilter
+
+
+def feed_with_prices(prices, timestamps, price_threshold):
+    """Build a feed with an hourly 60 second window and the given submissions"""
+    params = FeedDetails(
+        reward=1,
+        balance=10,
+        startTime=0,
+        interval=3600,
+        window=60,
+        priceThreshold=price_threshold,
+        rewardIncreasePerSecond=0,
+    )
+    entries = [Values(encode_single("uint256", int(p * 10**18)), t) for p, t in zip(prices, timestamps)]
+    return QueryIdandFeedDetails(params=params, queryid_timestamps_values_list=list(entries)), entries
+
+
+def test_filter_historical_submissions_price_change():
+    """Test submissions outside the window are kept only when the price change meets the threshold"""
+    feed, entries = feed_with_prices([1.0, 1.01, 1.2, 1.21], [100, 110, 120, 130], price_threshold=500)
+
+    (feed,) = FundedFeedFilter().filter_historical_submissions([feed])
+
+    # changes of 1% are dropped, the 18.8% change is eligible
+    assert feed.queryid_timestamps_values_list == [entries[0], entries[2]]
+
+
+def test_filter_historical_submissions_in_window():
+    """Test the first submission in a window is kept whatever the price change"""
+    feed, entries = feed_with_prices([1.0, 1.001], [100, 3610], price_threshold=500)
+
+    (feed,) = FundedFeedFilter().filter_historical_submissions([feed])
+
+    assert feed.queryid_timestamps_values_list == entries
+
+
+def test_filter_historical_submissions_no_threshold():
+    """Test submissions outside the window are dropped when the feed has no price threshold"""
+    feed, entries = feed_with_prices([1.0, 2.0, 2.0], [100, 110, 3610], price_threshold=0)
+
+    (feed,) = FundedFeedFilter().filter_historical_submissions([feed])
+
+    assert feed.queryid_timestamps_values_list == [entries[0], entries[2]]
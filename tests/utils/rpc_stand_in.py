@@ -0,0 +1,211 @@
+# JSON-RPC stand-in for on-chain price source tests
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+from eth_abi import decode_abi
+from eth_abi import encode_abi
+from web3 import Web3
+
+from telliot_feeds.pricing.lp_snapshot import AGGREGATE3
+from telliot_feeds.pricing.lp_snapshot import GET_BLOCK_NUMBER
+from telliot_feeds.pricing.lp_snapshot import GET_CURRENT_BLOCK_TIMESTAMP
+from telliot_feeds.pricing.lp_snapshot import GET_RESERVES
+from telliot_feeds.pricing.lp_snapshot import PRICE0_CUMULATIVE_LAST
+from telliot_feeds.pricing.lp_snapshot import PRICE1_CUMULATIVE_LAST
+from telliot_feeds.pricing.pair_graph import DECIMALS
+from telliot_feeds.pricing.pair_graph import TOKEN0
+from telliot_feeds.pricing.pair_graph import TOKEN1
+from telliot_feeds.pricing.sync_backfill import SYNC_TOPIC
+from telliot_feeds.pricing.sync_backfill import uq112_price
+
+MULTICALL3 = "0xcA11bde05977b3631167028862bE2a173976CA11"
+
+
+class RPCError(Exception):
+    pass
+
+
+class Reverted(RPCError):
+    def __init__(self):
+        super().__init__("execution reverted")
+
+
+class StandInChain:
+    """Local chain with Uniswap V2 pairs and Multicall3, served over HTTP JSON-RPC"""
+
+    def __init__(self, chain_id=369, block_number=100, timestamp=1700000000):
+        self.chain_id = chain_id
+        self.block_number = block_number
+        self.timestamp = timestamp
+        self.blocks = {block_number: timestamp}
+        self.pairs = {}
+        self.tokens = {}
+        self.logs = []
+        self.calls = []
+        self.delay = 0.0
+        # bumped by `reorg`, changing every block hash
+        self.fork = 0
+        # widest eth_getLogs range served
+        self.max_log_range = None
+
+    def add_pair(self, address, reserve0, reserve1, block_timestamp_last=None, price0=0, price1=0, tokens=None):
+        """Add a pair of `tokens`, two addresses registered with `add_token`"""
+        self.pairs[Web3.toChecksumAddress(address)] = {
+            "reserves": (reserve0, reserve1, block_timestamp_last or self.timestamp),
+            "price0": price0,
+            "price1": price1,
+            "tokens": tuple(Web3.toChecksumAddress(t) for t in tokens) if tokens else None,
+        }
+
+    def add_token(self, address, decimals=18):
+        self.tokens[Web3.toChecksumAddress(address)] = decimals
+
+    def mine(self, seconds=10, blocks=1):
+        """Advance the chain by `blocks` blocks, `seconds` apart"""
+        for _ in range(blocks):
+            self.block_number += 1
+            self.timestamp += seconds
+            self.blocks[self.block_number] = self.timestamp
+
+    def reorg(self):
+        """Replace every block with a sibling of the same height and timestamp"""
+        self.fork += 1
+        for log in self.logs:
+            log["blockHash"] = self.block_hash(int(log["blockNumber"], 16))
+
+    def block_hash(self, number):
+        return Web3.keccak(text=f"{self.fork}/{number}").hex()
+
+    def sync(self, address, reserve0, reserve1):
+        """Update the reserves of a pair in the current block, like `UniswapV2Pair._update`"""
+        pair = self.pairs[Web3.toChecksumAddress(address)]
+        old0, old1, last = pair["reserves"]
+        elapsed = self.timestamp - last
+        if elapsed > 0 and old0 and old1:
+            pair["price0"] = (pair["price0"] + uq112_price(old1, old0) * elapsed) % 2**256
+            pair["price1"] = (pair["price1"] + uq112_price(old0, old1) * elapsed) % 2**256
+        pair["reserves"] = (reserve0, reserve1, self.timestamp)
+        self.logs.append(
+            {
+                "address": Web3.toChecksumAddress(address),
+                "topics": [SYNC_TOPIC],
+                "data": "0x" + encode_abi(["uint112", "uint112"], [reserve0, reserve1]).hex(),
+                "blockNumber": hex(self.block_number),
+                "blockHash": self.block_hash(self.block_number),
+                "transactionHash": "0x" + len(self.logs).to_bytes(32, "big").hex(),
+                "transactionIndex": "0x0",
+                "logIndex": hex(len(self.logs)),
+                "removed": False,
+            }
+        )
+
+    def get_logs(self, params):
+        start, end = int(params["fromBlock"], 16), int(params["toBlock"], 16)
+        if self.max_log_range is not None and end - start + 1 > self.max_log_range:
+            raise RPCError("block range too large")
+        addresses = params["address"] if isinstance(params["address"], list) else [params["address"]]
+        addresses = {Web3.toChecksumAddress(a) for a in addresses}
+        return [
+            log
+            for log in self.logs
+            if log["address"] in addresses
+            and log["topics"][0] in params["topics"]
+            and start <= int(log["blockNumber"], 16) <= end
+        ]
+
+    def get_block(self, number):
+        number = self.block_number if number == "latest" else int(number, 16)
+        first = min(self.blocks)
+        # blocks before the chain stand-in started are 10 seconds apart
+        timestamp = self.blocks.get(number, self.blocks[first] - (first - number) * 10)
+        return {
+            "number": hex(number),
+            "timestamp": hex(timestamp),
+            "hash": self.block_hash(number),
+            "parentHash": self.block_hash(number - 1),
+        }
+
+    def call(self, to, data):
+        """Execute a contract call"""
+        to = Web3.toChecksumAddress(to)
+        sig, args = data[:4], data[4:]
+        if to == MULTICALL3:
+            if sig == AGGREGATE3:
+                (calls,) = decode_abi(["(address,bool,bytes)[]"], args)
+                results = []
+                for target, allow_failure, calldata in calls:
+                    try:
+                        results.append((True, self.call(target, calldata)))
+                    except Reverted:
+                        if not allow_failure:
+                            raise
+                        results.append((False, b""))
+                return encode_abi(["(bool,bytes)[]"], [results])
+            if sig == GET_BLOCK_NUMBER:
+                return encode_abi(["uint256"], [self.block_number])
+            if sig == GET_CURRENT_BLOCK_TIMESTAMP:
+                return encode_abi(["uint256"], [self.timestamp])
+        elif to in self.pairs:
+            pair = self.pairs[to]
+            if sig == GET_RESERVES:
+                return encode_abi(["uint112", "uint112", "uint32"], pair["reserves"])
+            if sig == PRICE0_CUMULATIVE_LAST:
+                return encode_abi(["uint256"], [pair["price0"]])
+            if sig == PRICE1_CUMULATIVE_LAST:
+                return encode_abi(["uint256"], [pair["price1"]])
+            if sig in (TOKEN0, TOKEN1) and pair["tokens"]:
+                return encode_abi(["address"], [pair["tokens"][sig == TOKEN1]])
+        elif to in self.tokens:
+            if sig == DECIMALS:
+                return encode_abi(["uint8"], [self.tokens[to]])
+        raise Reverted()
+
+    def handle(self, method, params):
+        self.calls.append(method)
+        if method == "eth_chainId":
+            return hex(self.chain_id)
+        if method == "eth_blockNumber":
+            return hex(self.block_number)
+        if method == "eth_getLogs":
+            return self.get_logs(params[0])
+        if method == "eth_getBlockByNumber":
+            return self.get_block(params[0])
+        if method == "eth_call":
+            time.sleep(self.delay)
+            return "0x" + self.call(params[0]["to"], bytes.fromhex(params[0]["data"][2:])).hex()
+        raise NotImplementedError(method)
+
+    def __enter__(self):
+        chain = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                response = {"jsonrpc": "2.0", "id": request["id"]}
+                try:
+                    response["result"] = chain.handle(request["method"], request["params"])
+                except RPCError as e:
+                    response["error"] = {"code": -32000, "message": str(e)}
+                body = json.dumps(response).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -1,4 +1,11 @@
+import math
+
+import pytest
+from eth_abi import encode_single
+
 from telliot_feeds.utils.decode import bytes_from_string
+from telliot_feeds.utils.decode import decode_uint256_floats
+from telliot_feeds.utils.decode import decode_uint256_ints
 
 
 def test_bytes_from_string():
@@ -28,3 +35,30 @@ def test_bytes_from_string_fail(capfd):
     assert result is None
     assert "Error('Non-hexadecimal digit found')" in status.error
     assert "bazinga" in capfd.readouterr().out
+
+
+def test_decode_uint256_floats():
+    """Test decoding many uint256 values at once"""
+    ints = [0, 1, 5 * 10**16, 2**53 + 1, 2**64 - 1, 2**64 + 1, 3 * 10**25, 2**256 - 1]
+    values = [encode_single("uint256", i) for i in ints]
+
+    floats = decode_uint256_floats(values)
+    assert floats.tolist() == [i / 10**18 for i in ints]
+    assert decode_uint256_floats(values, decimals=0)[1] == 1.0
+    assert decode_uint256_floats(values, decimals=30).tolist() == [i / 10**30 for i in ints]
+
+    floats = decode_uint256_floats([b"", b"\x01" * 33, b"\x02"])
+    assert math.isnan(floats[0]) and math.isnan(floats[1])
+    assert floats[2] == 2e-18
+
+
+def test_decode_uint256_ints():
+    """Test exact decoding falls back to Python ints beyond 64 bits"""
+    small = decode_uint256_ints([encode_single("uint256", i) for i in (1, 2**64 - 1)])
+    assert small.dtype.name == "uint64"
+    assert small.tolist() == [1, 2**64 - 1]
+
+    big = decode_uint256_ints([encode_single("uint256", i) for i in (1, 2**200 + 3)])
+    assert big.tolist() == [1, 2**200 + 3]
+    with pytest.raises(ValueError):
+        decode_uint256_ints([b""])